@@ -1,7 +1,11 @@
 from __future__ import unicode_literals
+import base64
+import binascii
 import inspect
+import os
 import random
 import re
+import threading
 import six
 
 from flask import request
@@ -35,13 +39,72 @@ def method_names_from_class(clazz):
     return [x[0] for x in inspect.getmembers(clazz, predicate=predicate)]
 
 
+class IdGenerator(object):
+    """
+    Random bytes for resource ids, read from os.urandom a pool at a time
+    rather than once per id. Seeding switches to a seeded random.Random so
+    that tests can get the same ids on every run.
+    """
+    pool_size = 4096
+
+    def __init__(self, seed=None):
+        self._lock = threading.Lock()
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        with self._lock:
+            self._random = random.Random(seed) if seed is not None else None
+            self._pool = b''
+            self._offset = 0
+
+    def _fill(self, size):
+        if self._random is None:
+            return os.urandom(size)
+        return binascii.unhexlify('{0:0{1}x}'.format(self._random.getrandbits(size * 8), size * 2))
+
+    def random_bytes(self, count):
+        with self._lock:
+            if self._offset + count > len(self._pool):
+                self._pool = self._fill(max(self.pool_size, count))
+                self._offset = 0
+            start = self._offset
+            self._offset += count
+            return self._pool[start:self._offset]
+
+    def hex(self, length):
+        encoded = binascii.hexlify(self.random_bytes((length + 1) // 2))
+        return encoded[:length].decode('ascii')
+
+    def urlsafe(self, length):
+        encoded = base64.urlsafe_b64encode(self.random_bytes((length * 3 + 3) // 4))
+        return encoded[:length].decode('ascii')
+
+
+id_generator = IdGenerator()
+
+
+def seed_random_ids(seed=None):
+    """
+    Makes generated ids repeatable for the given seed, or random again if
+    the seed is None.
+    """
+    id_generator.seed(seed)
+
+
 def get_random_hex(length=8):
-    chars = list(range(10)) + ['a', 'b', 'c', 'd', 'e', 'f']
-    return ''.join(six.text_type(random.choice(chars)) for x in range(length))
+    return id_generator.hex(length)
+
+
+def get_random_string(length):
+    """
+    A random string of URL-safe base64 characters
+    """
+    return id_generator.urlsafe(length)
 
 
 def get_random_message_id():
-    return '{0}-{1}-{2}-{3}-{4}'.format(get_random_hex(8), get_random_hex(4), get_random_hex(4), get_random_hex(4), get_random_hex(12))
+    value = id_generator.hex(32)
+    return '{0}-{1}-{2}-{3}-{4}'.format(value[:8], value[8:12], value[12:16], value[16:20], value[20:])
 
 
 def convert_regex_to_flask_path(url_path):
@@ -4,6 +4,8 @@ import six
 
 from moto.core.responses import BaseResponse
 from moto.core.utils import camelcase_to_underscores
+from moto.dynamodb2.exceptions import ProvisionedThroughputExceeded
+from moto.dynamodb2.utils import read_capacity_units, write_capacity_units
 from .models import dynamodb_backend, dynamo_json_dump
 
 
@@ -59,7 +61,11 @@ class DynamoHandler(BaseResponse):
         endpoint = self.get_endpoint_name(self.headers)
         if endpoint:
             endpoint = camelcase_to_underscores(endpoint)
-            response = getattr(self, endpoint)()
+            try:
+                response = getattr(self, endpoint)()
+            except ProvisionedThroughputExceeded as e:
+                er = 'com.amazonaws.dynamodb.v20111205#ProvisionedThroughputExceededException'
+                return self.error(er, status=e.status_code)
             if isinstance(response, six.string_types):
                 return 200, self.response_headers, response
 
@@ -72,20 +78,11 @@ class DynamoHandler(BaseResponse):
 
     def list_tables(self):
         body = self.body
-        limit = body.get('Limit')
-        if body.get("ExclusiveStartTableName"):
-            last = body.get("ExclusiveStartTableName")
-            start = list(dynamodb_backend.tables.keys()).index(last) + 1
-        else:
-            start = 0
-        all_tables = list(dynamodb_backend.tables.keys())
-        if limit:
-            tables = all_tables[start:start + limit]
-        else:
-            tables = all_tables[start:]
+        tables, last_evaluated_name = dynamodb_backend.list_tables(
+            body.get('Limit'), body.get("ExclusiveStartTableName"))
         response = {"TableNames": tables}
-        if limit and len(all_tables) > start + limit:
-            response["LastEvaluatedTableName"] = tables[-1]
+        if last_evaluated_name:
+            response["LastEvaluatedTableName"] = last_evaluated_name
         return dynamo_json_dump(response)
 
     def create_table(self):
@@ -148,7 +145,7 @@ class DynamoHandler(BaseResponse):
         result = dynamodb_backend.put_item(name, item)
         if result:
             item_dict = result.to_json()
-            item_dict['ConsumedCapacityUnits'] = 1
+            item_dict['ConsumedCapacityUnits'] = write_capacity_units(result.size())
             return dynamo_json_dump(item_dict)
         else:
             er = 'com.amazonaws.dynamodb.v20111205#ResourceNotFoundException'
@@ -157,30 +154,18 @@ class DynamoHandler(BaseResponse):
     def batch_write_item(self):
         table_batches = self.body['RequestItems']
 
-        for table_name, table_requests in table_batches.items():
-            for table_request in table_requests:
-                request_type = table_request.keys()[0]
-                request = table_request.values()[0]
-
-                if request_type == 'PutRequest':
-                    item = request['Item']
-                    dynamodb_backend.put_item(table_name, item)
-                elif request_type == 'DeleteRequest':
-                    key = request['Key']
-                    hash_key = key['HashKeyElement']
-                    range_key = key.get('RangeKeyElement')
-                    item = dynamodb_backend.delete_item(table_name, hash_key, range_key)
+        try:
+            consumed_capacity, unprocessed_items = dynamodb_backend.batch_write_item(table_batches)
+        except ValueError:
+            er = 'com.amazon.coral.validate#ValidationException'
+            return self.error(er, status=400)
 
         response = {
-            "Responses": {
-                "Thread": {
-                    "ConsumedCapacityUnits": 1.0
-                },
-                "Reply": {
-                    "ConsumedCapacityUnits": 1.0
-                }
-            },
-            "UnprocessedItems": {}
+            "Responses": dict(
+                (table_name, {"ConsumedCapacityUnits": units})
+                for table_name, units in consumed_capacity.items()
+            ),
+            "UnprocessedItems": unprocessed_items
         }
 
         return dynamo_json_dump(response)
@@ -188,17 +173,16 @@ class DynamoHandler(BaseResponse):
     def get_item(self):
         name = self.body['TableName']
         key = self.body['Key']
-        hash_key = key['HashKeyElement']
-        range_key = key.get('RangeKeyElement')
         attrs_to_get = self.body.get('AttributesToGet')
+        consistent_read = self.body.get('ConsistentRead', False)
         try:
-            item = dynamodb_backend.get_item(name, hash_key, range_key)
+            item = dynamodb_backend.get_item(name, key, consistent_read)
         except ValueError:
             er = 'com.amazon.coral.validate#ValidationException'
             return self.error(er, status=400)
         if item:
             item_dict = item.describe_attrs(attrs_to_get)
-            item_dict['ConsumedCapacityUnits'] = 0.5
+            item_dict['ConsumedCapacityUnits'] = read_capacity_units(item.size(), consistent_read)
             return dynamo_json_dump(item_dict)
         else:
             # Item not found
@@ -208,24 +192,24 @@ class DynamoHandler(BaseResponse):
     def batch_get_item(self):
         table_batches = self.body['RequestItems']
 
+        try:
+            responses, consumed_capacity, unprocessed_keys = dynamodb_backend.batch_get_item(table_batches)
+        except ValueError:
+            er = 'com.amazon.coral.validate#ValidationException'
+            return self.error(er, status=400)
+
         results = {
             "Responses": {
-                "UnprocessedKeys": {}
+                "UnprocessedKeys": unprocessed_keys
             }
         }
 
-        for table_name, table_request in table_batches.items():
-            items = []
-            keys = table_request['Keys']
-            attributes_to_get = table_request.get('AttributesToGet')
-            for key in keys:
-                hash_key = key["HashKeyElement"]
-                range_key = key.get("RangeKeyElement")
-                item = dynamodb_backend.get_item(table_name, hash_key, range_key)
-                if item:
-                    item_describe = item.describe_attrs(attributes_to_get)
-                    items.append(item_describe)
-            results["Responses"][table_name] = {"Items": items, "ConsumedCapacityUnits": 1}
+        for table_name, items in responses.items():
+            attributes_to_get = table_batches[table_name].get('AttributesToGet')
+            results["Responses"][table_name] = {
+                "Items": [item.describe_attrs(attributes_to_get) for item in items],
+                "ConsumedCapacityUnits": consumed_capacity.get(table_name, 0),
+            }
         return dynamo_json_dump(results)
 
     def query(self):
@@ -239,7 +223,16 @@ class DynamoHandler(BaseResponse):
             range_comparison = None
             range_values = []
 
-        items, last_page = dynamodb_backend.query(name, hash_key, range_comparison, range_values)
+        try:
+            items, consumed, last_evaluated_key = dynamodb_backend.query(
+                name, hash_key, range_comparison, range_values,
+                limit=self.body.get('Limit'),
+                exclusive_start_key=self.body.get('ExclusiveStartKey'),
+                reverse=self.body.get('ScanIndexForward') == False,
+            )
+        except ValueError:
+            er = 'com.amazon.coral.validate#ValidationException'
+            return self.error(er, status=400)
 
         if items is None:
             er = 'com.amazonaws.dynamodb.v20111205#ResourceNotFoundException'
@@ -248,15 +241,10 @@ class DynamoHandler(BaseResponse):
         result = {
             "Count": len(items),
             "Items": [item.attrs for item in items],
-            "ConsumedCapacityUnits": 1,
+            "ConsumedCapacityUnits": consumed,
         }
-
-        # Implement this when we do pagination
-        # if not last_page:
-        #     result["LastEvaluatedKey"] = {
-        #         "HashKeyElement": items[-1].hash_key,
-        #         "RangeKeyElement": items[-1].range_key,
-        #     }
+        if last_evaluated_key:
+            result["LastEvaluatedKey"] = last_evaluated_key
         return dynamo_json_dump(result)
 
     def scan(self):
@@ -270,7 +258,15 @@ class DynamoHandler(BaseResponse):
             comparison_values = scan_filter.get("AttributeValueList", [])
             filters[attribute_name] = (comparison_operator, comparison_values)
 
-        items, scanned_count, last_page = dynamodb_backend.scan(name, filters)
+        try:
+            items, scanned_count, consumed, last_evaluated_key = dynamodb_backend.scan(
+                name, filters,
+                limit=self.body.get('Limit'),
+                exclusive_start_key=self.body.get('ExclusiveStartKey'),
+            )
+        except ValueError:
+            er = 'com.amazon.coral.validate#ValidationException'
+            return self.error(er, status=400)
 
         if items is None:
             er = 'com.amazonaws.dynamodb.v20111205#ResourceNotFoundException'
@@ -279,31 +275,28 @@ class DynamoHandler(BaseResponse):
         result = {
             "Count": len(items),
             "Items": [item.attrs for item in items],
-            "ConsumedCapacityUnits": 1,
+            "ConsumedCapacityUnits": consumed,
             "ScannedCount": scanned_count
         }
-
-        # Implement this when we do pagination
-        # if not last_page:
-        #     result["LastEvaluatedKey"] = {
-        #         "HashKeyElement": items[-1].hash_key,
-        #         "RangeKeyElement": items[-1].range_key,
-        #     }
+        if last_evaluated_key:
+            result["LastEvaluatedKey"] = last_evaluated_key
         return dynamo_json_dump(result)
 
     def delete_item(self):
         name = self.body['TableName']
         key = self.body['Key']
-        hash_key = key['HashKeyElement']
-        range_key = key.get('RangeKeyElement')
         return_values = self.body.get('ReturnValues', '')
-        item = dynamodb_backend.delete_item(name, hash_key, range_key)
+        try:
+            item = dynamodb_backend.delete_item(name, key)
+        except ValueError:
+            er = 'com.amazon.coral.validate#ValidationException'
+            return self.error(er, status=400)
         if item:
             if return_values == 'ALL_OLD':
                 item_dict = item.to_json()
             else:
                 item_dict = {'Attributes': []}
-            item_dict['ConsumedCapacityUnits'] = 0.5
+            item_dict['ConsumedCapacityUnits'] = write_capacity_units(item.size())
             return dynamo_json_dump(item_dict)
         else:
             er = 'com.amazonaws.dynamodb.v20111205#ResourceNotFoundException'
@@ -1,4 +1,6 @@
 from __future__ import unicode_literals
+from decimal import Decimal
+
 # TODO add tests for all of these
 COMPARISON_FUNCS = {
     'EQ': lambda item_value, test_value: item_value == test_value,
@@ -12,10 +14,75 @@ COMPARISON_FUNCS = {
     'CONTAINS': lambda item_value, test_value: test_value in item_value,
     'NOT_CONTAINS': lambda item_value, test_value: test_value not in item_value,
     'BEGINS_WITH': lambda item_value, test_value: item_value.startswith(test_value),
-    'IN': lambda item_value, test_value: item_value in test_value,
+    'IN': lambda item_value, *test_values: item_value in test_values,
     'BETWEEN': lambda item_value, lower_test_value, upper_test_value: lower_test_value <= item_value <= upper_test_value,
 }
 
+# Comparisons which only make sense between values of the same Dynamo type.
+# Anything else (CONTAINS on a set, NULL checks) is type-agnostic.
+TYPED_COMPARISONS = set(['EQ', 'NE', 'LE', 'LT', 'GE', 'GT', 'BEGINS_WITH', 'IN', 'BETWEEN'])
+
 
 def get_comparison_func(range_comparison):
     return COMPARISON_FUNCS.get(range_comparison)
+
+
+def cast_value(dynamo_type, value):
+    """
+    Decodes a wire value into something that compares the way DynamoDB
+    does: numbers become Decimals and sets become frozensets.
+    """
+    if dynamo_type == 'N':
+        return Decimal(value)
+    elif dynamo_type == 'NS':
+        return frozenset(Decimal(number) for number in value)
+    elif dynamo_type in ('SS', 'BS'):
+        return frozenset(value)
+    return value
+
+
+def compile_condition(comparison_operator, comparison_objs):
+    """
+    Compiles a comparison operator and its DynamoType arguments into a
+    predicate taking a single DynamoType (or None for a missing attribute).
+
+    The comparison values are decoded once here so that evaluating the
+    predicate against each item does no lookups or conversions.
+    """
+    comparison_func = get_comparison_func(comparison_operator)
+    if comparison_func is None:
+        raise ValueError("Unknown comparison operator: {0}".format(comparison_operator))
+
+    if comparison_operator == 'NULL':
+        return lambda attribute: attribute is None
+    elif comparison_operator == 'NOT_NULL':
+        return lambda attribute: attribute is not None
+
+    if comparison_operator == 'BEGINS_WITH' and any(obj.type not in ('S', 'B') for obj in comparison_objs):
+        raise ValueError("Invalid BEGINS_WITH operand: only strings and binary values have a prefix")
+
+    test_values = tuple(obj.cast_value for obj in comparison_objs)
+    if comparison_operator in TYPED_COMPARISONS and comparison_objs:
+        test_type = comparison_objs[0].type
+        # DynamoDB never matches across types, except for NE which always does
+        type_mismatch = comparison_operator == 'NE'
+    else:
+        test_type = None
+
+    if len(test_values) == 1:
+        test_value = test_values[0]
+
+        def predicate(attribute):
+            if attribute is None:
+                return False
+            if test_type is not None and attribute.type != test_type:
+                return type_mismatch
+            return comparison_func(attribute.cast_value, test_value)
+    else:
+        def predicate(attribute):
+            if attribute is None:
+                return False
+            if test_type is not None and attribute.type != test_type:
+                return type_mismatch
+            return comparison_func(attribute.cast_value, *test_values)
+    return predicate
@@ -0,0 +1,19 @@
+from __future__ import unicode_literals
+
+
+class ProvisionedThroughputExceeded(Exception):
+    error_type = 'com.amazonaws.dynamodb.v20120810#ProvisionedThroughputExceededException'
+    description = "The level of configured provisioned throughput for the table was exceeded."
+    status_code = 400
+
+
+class ConditionalCheckFailed(Exception):
+    error_type = 'com.amazonaws.dynamodb.v20120810#ConditionalCheckFailedException'
+    description = "The conditional request failed"
+    status_code = 400
+
+
+class TrimmedDataAccess(Exception):
+    error_type = 'com.amazonaws.dynamodb.v20120810#TrimmedDataAccessException'
+    description = "The records requested have been trimmed from the stream."
+    status_code = 400
@@ -0,0 +1,584 @@
+from __future__ import unicode_literals
+import copy
+import re
+
+from .comparisons import cast_value
+
+# Compiled expressions are cached by their text, since clients typically
+# reuse a handful of expressions with different attribute values.
+EXPRESSION_CACHE_SIZE = 1000
+_expression_cache = {}
+
+TOKEN_REGEX = re.compile(r"""
+    \s*(?:
+        (?P<value>:[A-Za-z0-9_]+) |
+        (?P<name>\#?[A-Za-z_][A-Za-z0-9_]*) |
+        (?P<number>[0-9]+) |
+        (?P<operator><>|<=|>=|[=<>(),.\[\]+\-])
+    )""", re.VERBOSE)
+
+KEYWORDS = set(['SET', 'REMOVE', 'ADD', 'DELETE', 'AND', 'OR', 'NOT', 'BETWEEN', 'IN'])
+COMPARATORS = {
+    '=': lambda a, b: a == b,
+    '<>': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+}
+
+
+class ExpressionAttributes(object):
+    """
+    The ExpressionAttributeNames and ExpressionAttributeValues of a request
+    """
+
+    def __init__(self, names=None, values=None):
+        self.names = names or {}
+        self.values = values or {}
+
+    def name(self, name):
+        if not name.startswith('#'):
+            return name
+        try:
+            return self.names[name]
+        except KeyError:
+            raise ValueError("An expression attribute name used in the document path is not defined; attribute name: {0}".format(name))
+
+    def value(self, value):
+        try:
+            return self.values[value]
+        except KeyError:
+            raise ValueError("An expression attribute value used in expression is not defined; attribute value: {0}".format(value))
+
+
+def _operand(value):
+    """Rejects the operands that refer to attributes missing from the item"""
+    if value is None:
+        raise ValueError("The provided expression refers to an attribute that does not exist in the item")
+    return value
+
+
+def _typed(value):
+    """Splits a wire-format value into its Dynamo type and decoded value"""
+    dynamo_type, raw_value = list(_operand(value).items())[0]
+    return dynamo_type, cast_value(dynamo_type, raw_value)
+
+
+def _number(value):
+    dynamo_type, number = _typed(value)
+    if dynamo_type != 'N':
+        raise ValueError("An operand in the update expression has an incorrect data type")
+    return number
+
+
+def _list(value):
+    dynamo_type, elements = list(_operand(value).items())[0]
+    if dynamo_type != 'L':
+        raise ValueError("An operand in the update expression has an incorrect data type")
+    return elements
+
+
+def _format_number(number):
+    return '{0:f}'.format(number) if number == number.to_integral_value() else str(number)
+
+
+def get_path(item, path, attributes):
+    """Returns the wire-format value at a document path, or None if it is missing"""
+    value = item.get(attributes.name(path[0][1]))
+    for kind, key in path[1:]:
+        if value is None:
+            return None
+        if kind == 'name':
+            container = value.get('M')
+            value = container.get(attributes.name(key)) if container is not None else None
+        else:
+            container = value.get('L')
+            value = container[key] if container is not None and key < len(container) else None
+    return value
+
+
+def _get_parent(item, path, attributes):
+    if len(path) == 1:
+        return item, attributes.name(path[0][1])
+    parent = get_path(item, path[:-1], attributes)
+    kind, key = path[-1]
+    if parent is not None and kind == 'name' and 'M' in parent:
+        return parent['M'], attributes.name(key)
+    elif parent is not None and kind == 'index' and 'L' in parent:
+        return parent['L'], key
+    raise ValueError("The document path provided in the update expression is invalid for update")
+
+
+def set_path(item, path, value, attributes):
+    container, key = _get_parent(item, path, attributes)
+    if isinstance(container, list) and key >= len(container):
+        container.append(value)
+    else:
+        container[key] = value
+
+
+def remove_path(item, path, attributes):
+    container, key = _get_parent(item, path, attributes)
+    if isinstance(container, list):
+        if key < len(container):
+            container.pop(key)
+    else:
+        container.pop(key, None)
+
+
+def _value_size(value):
+    dynamo_type, raw_value = list(value.items())[0]
+    if dynamo_type == 'B':
+        return len(raw_value) * 3 // 4
+    return len(raw_value)
+
+
+def _add(existing, value):
+    _operand(value)
+    if existing is None:
+        return value
+    existing_type = list(existing.keys())[0]
+    value_type = list(value.keys())[0]
+    if existing_type != value_type:
+        raise ValueError("An operand in the update expression has an incorrect data type")
+    if value_type == 'N':
+        return {'N': _format_number(_number(existing) + _number(value))}
+    elif value_type in ('SS', 'NS', 'BS'):
+        added = [element for element in value[value_type] if element not in existing[existing_type]]
+        return {value_type: existing[existing_type] + added}
+    raise ValueError("An operand in the update expression has an incorrect data type")
+
+
+def _delete(existing, value):
+    _operand(value)
+    if existing is None:
+        return None
+    existing_type = list(existing.keys())[0]
+    value_type = list(value.keys())[0]
+    if existing_type != value_type or value_type not in ('SS', 'NS', 'BS'):
+        raise ValueError("An operand in the update expression has an incorrect data type")
+    remaining = [element for element in existing[existing_type] if element not in value[value_type]]
+    # Sets can't be empty, so deleting every element removes the attribute
+    return {value_type: remaining} if remaining else None
+
+
+class ExpressionParser(object):
+    """
+    Recursive descent parser turning expression text into closures taking
+    the item (a dict of attribute name to wire-format value) and the
+    ExpressionAttributes of the request.
+    """
+
+    def __init__(self, expression):
+        self.expression = expression
+        self.tokens = self.tokenize(expression)
+        self.position = 0
+
+    def tokenize(self, expression):
+        tokens = []
+        position = 0
+        expression = expression.rstrip()
+        while position < len(expression):
+            match = TOKEN_REGEX.match(expression, position)
+            if not match or match.end() == position:
+                raise ValueError("Invalid expression: syntax error near \"{0}\"".format(expression[position:].strip()))
+            kind = match.lastgroup
+            text = match.group(kind)
+            if kind == 'name' and text.upper() in KEYWORDS:
+                kind, text = 'keyword', text.upper()
+            tokens.append((kind, text))
+            position = match.end()
+        return tokens
+
+    def peek(self, offset=0):
+        if self.position + offset < len(self.tokens):
+            return self.tokens[self.position + offset]
+        return (None, None)
+
+    def next(self):
+        token = self.peek()
+        if token[0] is None:
+            raise ValueError("Invalid expression: unexpected end of expression: {0}".format(self.expression))
+        self.position += 1
+        return token
+
+    def accept(self, text):
+        if self.peek()[1] == text:
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, text):
+        if not self.accept(text):
+            raise ValueError("Invalid expression: expected \"{0}\" in {1}".format(text, self.expression))
+
+    def expect_end(self):
+        if self.peek()[0] is not None:
+            raise ValueError("Invalid expression: syntax error near \"{0}\"".format(self.peek()[1]))
+
+    def parse_path(self):
+        kind, text = self.next()
+        if kind != 'name':
+            raise ValueError("Invalid expression: expected an attribute name, found \"{0}\"".format(text))
+        path = [('name', text)]
+        while True:
+            if self.accept('.'):
+                kind, text = self.next()
+                if kind != 'name':
+                    raise ValueError("Invalid expression: expected an attribute name, found \"{0}\"".format(text))
+                path.append(('name', text))
+            elif self.accept('['):
+                kind, text = self.next()
+                if kind != 'number':
+                    raise ValueError("Invalid expression: expected a list index, found \"{0}\"".format(text))
+                path.append(('index', int(text)))
+                self.expect(']')
+            else:
+                return tuple(path)
+
+    def parse_function(self, argument_parsers):
+        self.next()
+        self.expect('(')
+        arguments = []
+        for index, argument_parser in enumerate(argument_parsers):
+            if index:
+                self.expect(',')
+            arguments.append(argument_parser())
+        self.expect(')')
+        return arguments
+
+    def parse_path_operand(self):
+        path = self.parse_path()
+        return lambda item, attributes: get_path(item, path, attributes)
+
+    def parse_operand(self):
+        kind, text = self.peek()
+        if kind == 'value':
+            self.next()
+            return lambda item, attributes: attributes.value(text)
+        if kind == 'name' and self.peek(1)[1] == '(':
+            function = text.lower()
+            if function == 'if_not_exists':
+                path, default = self.parse_function([self.parse_path, self.parse_operand])
+                return lambda item, attributes: get_path(item, path, attributes) or default(item, attributes)
+            elif function == 'list_append':
+                first, second = self.parse_function([self.parse_operand, self.parse_operand])
+                return lambda item, attributes: {'L': _list(first(item, attributes)) + _list(second(item, attributes))}
+            elif function == 'size':
+                path, = self.parse_function([self.parse_path])
+
+                def size(item, attributes):
+                    value = get_path(item, path, attributes)
+                    return {'N': str(_value_size(value))} if value is not None else None
+                return size
+            raise ValueError("Invalid function name; function: {0}".format(text))
+        return self.parse_path_operand()
+
+    def parse_set_value(self):
+        first = self.parse_operand()
+        if self.accept('+'):
+            second = self.parse_operand()
+            return lambda item, attributes: {'N': _format_number(
+                _number(first(item, attributes)) + _number(second(item, attributes)))}
+        elif self.accept('-'):
+            second = self.parse_operand()
+            return lambda item, attributes: {'N': _format_number(
+                _number(first(item, attributes)) - _number(second(item, attributes)))}
+        return first
+
+    def parse_update(self):
+        actions = []
+        while self.peek()[0] is not None:
+            kind, clause = self.next()
+            if kind != 'keyword' or clause not in ('SET', 'REMOVE', 'ADD', 'DELETE'):
+                raise ValueError("Invalid UpdateExpression: syntax error near \"{0}\"".format(clause))
+            while True:
+                path = self.parse_path()
+                if clause == 'SET':
+                    self.expect('=')
+                    actions.append((clause, path, self.parse_set_value()))
+                elif clause == 'REMOVE':
+                    actions.append((clause, path, None))
+                else:
+                    actions.append((clause, path, self.parse_operand()))
+                if not self.accept(','):
+                    break
+        if not actions:
+            raise ValueError("Invalid UpdateExpression: the expression can not be empty")
+        return actions
+
+    def parse_condition(self):
+        condition = self.parse_and()
+        while self.accept('OR'):
+            first, second = condition, self.parse_and()
+            condition = self._or(first, second)
+        return condition
+
+    def _or(self, first, second):
+        return lambda item, attributes: first(item, attributes) or second(item, attributes)
+
+    def _and(self, first, second):
+        return lambda item, attributes: first(item, attributes) and second(item, attributes)
+
+    def parse_and(self):
+        condition = self.parse_not()
+        while self.accept('AND'):
+            first, second = condition, self.parse_not()
+            condition = self._and(first, second)
+        return condition
+
+    def parse_not(self):
+        if self.accept('NOT'):
+            condition = self.parse_not()
+            return lambda item, attributes: not condition(item, attributes)
+        return self.parse_primary()
+
+    def parse_primary(self):
+        if self.accept('('):
+            condition = self.parse_condition()
+            self.expect(')')
+            return condition
+
+        kind, text = self.peek()
+        function = text.lower() if kind == 'name' and self.peek(1)[1] == '(' else None
+        if function in ('attribute_exists', 'attribute_not_exists'):
+            path, = self.parse_function([self.parse_path])
+            exists = function == 'attribute_exists'
+            return lambda item, attributes: (get_path(item, path, attributes) is not None) == exists
+        elif function == 'attribute_type':
+            path, expected_type = self.parse_function([self.parse_path, self.parse_operand])
+
+            def attribute_type(item, attributes):
+                value = get_path(item, path, attributes)
+                wanted = _typed(expected_type(item, attributes))[1]
+                return value is not None and list(value.keys())[0] == wanted
+            return attribute_type
+        elif function in ('begins_with', 'contains'):
+            path, operand = self.parse_function([self.parse_path, self.parse_operand])
+            return self._function_condition(function, path, operand)
+
+        first = self.parse_operand()
+        kind, text = self.peek()
+        if text in COMPARATORS:
+            self.next()
+            return self._comparison(COMPARATORS[text], text == '<>', first, self.parse_operand())
+        elif text == 'BETWEEN':
+            self.next()
+            lower = self.parse_operand()
+            self.expect('AND')
+            upper = self.parse_operand()
+            return self._between(first, lower, upper)
+        elif text == 'IN':
+            self.next()
+            self.expect('(')
+            candidates = [self.parse_operand()]
+            while self.accept(','):
+                candidates.append(self.parse_operand())
+            self.expect(')')
+            return self._in(first, candidates)
+        raise ValueError("Invalid ConditionExpression: syntax error near \"{0}\"".format(text))
+
+    def _function_condition(self, function, path, operand):
+        def condition(item, attributes):
+            value = get_path(item, path, attributes)
+            if value is None:
+                return False
+            value_type, item_value = _typed(value)
+            test_type, test_value = _typed(operand(item, attributes))
+            if function == 'begins_with':
+                return value_type == test_type and value_type in ('S', 'B') and item_value.startswith(test_value)
+            if value_type in ('SS', 'NS', 'BS'):
+                return test_value in item_value
+            if value_type == 'L':
+                return operand(item, attributes) in item_value
+            return value_type == test_type and value_type in ('S', 'B') and test_value in item_value
+        return condition
+
+    def _comparison(self, comparator, mismatch, first, second):
+        def condition(item, attributes):
+            first_value = first(item, attributes)
+            second_value = second(item, attributes)
+            if first_value is None or second_value is None:
+                return mismatch
+            first_type, first_value = _typed(first_value)
+            second_type, second_value = _typed(second_value)
+            if first_type != second_type:
+                return mismatch
+            return comparator(first_value, second_value)
+        return condition
+
+    def _between(self, operand, lower, upper):
+        def condition(item, attributes):
+            values = [operand(item, attributes), lower(item, attributes), upper(item, attributes)]
+            if None in values:
+                return False
+            typed = [_typed(value) for value in values]
+            if len(set(dynamo_type for dynamo_type, _ in typed)) != 1:
+                return False
+            return typed[1][1] <= typed[0][1] <= typed[2][1]
+        return condition
+
+    def _in(self, operand, candidates):
+        def condition(item, attributes):
+            value = operand(item, attributes)
+            if value is None:
+                return False
+            typed = _typed(value)
+            return any(
+                candidate_value is not None and _typed(candidate_value) == typed
+                for candidate_value in (candidate(item, attributes) for candidate in candidates)
+            )
+        return condition
+
+    def parse_projection(self):
+        paths = [self.parse_path()]
+        while self.accept(','):
+            paths.append(self.parse_path())
+        return paths
+
+
+def _compile(expression_class, expression):
+    key = (expression_class, expression)
+    compiled = _expression_cache.get(key)
+    if compiled is None:
+        if len(_expression_cache) >= EXPRESSION_CACHE_SIZE:
+            _expression_cache.clear()
+        compiled = _expression_cache[key] = expression_class(expression)
+    return compiled
+
+
+class UpdateExpression(object):
+    """
+    A parsed UpdateExpression made of SET, REMOVE, ADD and DELETE clauses
+    """
+
+    def __init__(self, expression):
+        parser = ExpressionParser(expression)
+        self.actions = parser.parse_update()
+        parser.expect_end()
+
+    @classmethod
+    def compile(cls, expression):
+        return _compile(cls, expression)
+
+    def updated_names(self, attributes):
+        return set(attributes.name(path[0][1]) for _, path, _ in self.actions)
+
+    def apply(self, item, attributes):
+        """
+        Returns a copy of the item with the update applied. All operands are
+        evaluated against the original item, as DynamoDB does.
+        """
+        values = [
+            operand(item, attributes) if operand is not None else None
+            for _, _, operand in self.actions
+        ]
+        updated = copy.deepcopy(item)
+        for (clause, path, _), value in zip(self.actions, values):
+            if clause == 'SET':
+                set_path(updated, path, _operand(value), attributes)
+            elif clause == 'REMOVE':
+                remove_path(updated, path, attributes)
+            else:
+                existing = get_path(updated, path, attributes)
+                if clause == 'ADD':
+                    result = _add(existing, value)
+                else:
+                    result = _delete(existing, value)
+                if result is None:
+                    remove_path(updated, path, attributes)
+                else:
+                    set_path(updated, path, result, attributes)
+        return updated
+
+
+class AttributeUpdates(object):
+    """
+    The legacy AttributeUpdates parameter, applied like an UpdateExpression
+    """
+
+    def __init__(self, attribute_updates):
+        self.attribute_updates = attribute_updates
+
+    def updated_names(self, attributes):
+        return set(self.attribute_updates)
+
+    def apply(self, item, attributes):
+        updated = copy.deepcopy(item)
+        for name, update in self.attribute_updates.items():
+            action = update.get('Action', 'PUT')
+            value = update.get('Value')
+            if action == 'PUT':
+                updated[name] = value
+            elif action == 'ADD':
+                updated[name] = _add(updated.get(name), value)
+            elif action == 'DELETE':
+                result = _delete(updated.get(name), value) if value else None
+                if result is None:
+                    updated.pop(name, None)
+                else:
+                    updated[name] = result
+            else:
+                raise ValueError("Unknown AttributeUpdates action: {0}".format(action))
+        return updated
+
+
+class ConditionExpression(object):
+    """
+    A parsed ConditionExpression
+    """
+
+    def __init__(self, expression):
+        parser = ExpressionParser(expression)
+        self.condition = parser.parse_condition()
+        parser.expect_end()
+
+    @classmethod
+    def compile(cls, expression):
+        return _compile(cls, expression)
+
+    def evaluate(self, item, attributes):
+        return self.condition(item, attributes)
+
+
+class ProjectionExpression(object):
+    """
+    A parsed ProjectionExpression
+    """
+
+    def __init__(self, expression):
+        parser = ExpressionParser(expression)
+        self.paths = parser.parse_projection()
+        parser.expect_end()
+
+    @classmethod
+    def compile(cls, expression):
+        return _compile(cls, expression)
+
+    def project(self, item, attributes):
+        projected = {}
+        for path in self.paths:
+            value = get_path(item, path, attributes)
+            if value is None:
+                continue
+            if len(path) == 1:
+                projected[attributes.name(path[0][1])] = value
+                continue
+            # Rebuild the nested maps and lists leading to the value
+            target = projected
+            for (kind, key), (next_kind, _) in zip(path, path[1:]):
+                key = attributes.name(key) if kind == 'name' else key
+                container_type = 'M' if next_kind == 'name' else 'L'
+                if kind == 'name':
+                    target = target.setdefault(key, {container_type: {} if container_type == 'M' else []})
+                else:
+                    target.append({container_type: {} if container_type == 'M' else []})
+                    target = target[-1]
+                target = target[container_type]
+            kind, key = path[-1]
+            if kind == 'name':
+                target[attributes.name(key)] = value
+            else:
+                target.append(value)
+        return projected
@@ -1,7 +1,9 @@
 from __future__ import unicode_literals
+from bisect import bisect_left, bisect_right, insort
 from collections import defaultdict
 import datetime
 import json
+import threading
 
 try:
         from collections import OrderedDict
@@ -9,10 +11,19 @@ except ImportError:
         # python 2.6 or earlier, use backport
         from ordereddict import OrderedDict
 
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
 
 from moto.core import BaseBackend
-from .comparisons import get_comparison_func
-from .utils import unix_time
+from .comparisons import cast_value, compile_condition
+from .exceptions import ConditionalCheckFailed, ProvisionedThroughputExceeded
+from .expressions import ExpressionAttributes
+from .streams import Stream, DEFAULT_STREAM_RECORDS, SHARD_ID, parse_shard_iterator
+from .throughput import CapacityTracker, DEFAULT_BURST_SECONDS
+from .utils import unix_time, dynamo_value_size, read_capacity_units, write_capacity_units
 
 
 class DynamoJsonEncoder(json.JSONEncoder):
@@ -21,18 +32,50 @@ class DynamoJsonEncoder(json.JSONEncoder):
             return obj.to_json()
 
 
+def _encode(obj, parts):
+    if hasattr(obj, 'json_fragment'):
+        parts.append(obj.json_fragment)
+    elif isinstance(obj, dict):
+        parts.append('{')
+        for index, (key, value) in enumerate(obj.items()):
+            if index:
+                parts.append(', ')
+            parts.append(json.dumps(key))
+            parts.append(': ')
+            _encode(value, parts)
+        parts.append('}')
+    elif isinstance(obj, (list, tuple)):
+        parts.append('[')
+        for index, value in enumerate(obj):
+            if index:
+                parts.append(', ')
+            _encode(value, parts)
+        parts.append(']')
+    else:
+        parts.append(json.dumps(obj, cls=DynamoJsonEncoder))
+
+
 def dynamo_json_dump(dynamo_object):
-    return json.dumps(dynamo_object, cls=DynamoJsonEncoder)
+    """
+    Encodes a response, splicing in the cached JSON of any items rather
+    than encoding their attributes again. The containers around them are
+    encoded here, so each fragment goes exactly where its item was.
+    """
+    parts = []
+    _encode(dynamo_object, parts)
+    return ''.join(parts)
 
 
 class DynamoType(object):
     """
     http://docs.aws.amazon.com/amazondynamodb/latest/developerguide/DataModel.html#DataModelDataTypes
     """
+    __slots__ = ('type', 'value', '_cast_value')
 
     def __init__(self, type_as_dict):
-        self.type = type_as_dict.keys()[0]
-        self.value = type_as_dict.values()[0]
+        self.type = list(type_as_dict.keys())[0]
+        self.value = list(type_as_dict.values())[0]
+        self._cast_value = None
 
     def __hash__(self):
         return hash((self.type, self.value))
@@ -44,16 +87,16 @@ class DynamoType(object):
         )
 
     def __lt__(self, other):
-        return self.value < other.value
+        return self.cast_value < other.cast_value
 
     def __le__(self, other):
-        return self.value <= other.value
+        return self.cast_value <= other.cast_value
 
     def __gt__(self, other):
-        return self.value > other.value
+        return self.cast_value > other.cast_value
 
     def __ge__(self, other):
-        return self.value >= other.value
+        return self.cast_value >= other.cast_value
 
     def __repr__(self):
         return "DynamoType: {0}".format(self.to_json())
@@ -61,28 +104,177 @@ class DynamoType(object):
     def to_json(self):
         return {self.type: self.value}
 
+    def size(self):
+        return dynamo_value_size(self.type, self.value)
+
+    @property
+    def cast_value(self):
+        if self._cast_value is None:
+            self._cast_value = cast_value(self.type, self.value)
+        return self._cast_value
+
     def compare(self, range_comparison, range_objs):
         """
         Compares this type against comparison filters
         """
-        range_values = [obj.value for obj in range_objs]
-        comparison_func = get_comparison_func(range_comparison)
-        return comparison_func(self.value, *range_values)
+        return compile_condition(range_comparison, range_objs)(self)
+
+class AttributeShape(object):
+    """
+    The attribute names of an item, in a fixed order, shared by every item
+    of a table with the same set of attributes.
+    """
+    __slots__ = ('names', 'positions')
+
+    def __init__(self, names):
+        self.names = names
+        self.positions = dict((name, index) for index, name in enumerate(names))
+
+
+class AttributeNameTable(object):
+    """
+    Per-table registry of attribute shapes, so that attribute names are
+    stored once per table instead of once per item. Names are interned in
+    ``names``, as the intern builtin takes no unicode on Python 2, so that
+    shapes sharing a name share its string too.
+    """
+
+    def __init__(self):
+        self.shapes = {}
+        self.names = {}
+
+    def __len__(self):
+        return len(self.shapes)
+
+    def attributes_for(self, item_attrs):
+        names = tuple(sorted(item_attrs))
+        shape = self.shapes.get(names)
+        if shape is None:
+            names = tuple(self.names.setdefault(name, name) for name in names)
+            shape = self.shapes[names] = AttributeShape(names)
+        values = tuple(DynamoType(item_attrs[name]) for name in shape.names)
+        size = sum(len(name) + value.size() for name, value in zip(shape.names, values))
+        return ItemAttributes(shape, values, size)
+
+
+class ItemAttributes(object):
+    """
+    Read-only mapping of attribute name to DynamoType, backed by a shared
+    AttributeShape and a tuple of values. Writes replace an item's
+    attributes rather than changing them, so the encoded JSON is cached.
+
+    Registered as a Mapping rather than subclassing it, as the ABCs have no
+    __slots__ on Python 2 and would give every instance a __dict__.
+    """
+    __slots__ = ('shape', '_values', 'size', '_json_fragment')
+
+    def __init__(self, shape, values, size):
+        self.shape = shape
+        self._values = values
+        # Item size in bytes, as used for capacity unit calculations
+        self.size = size
+        self._json_fragment = None
+
+    def __getitem__(self, name):
+        return self._values[self.shape.positions[name]]
+
+    def __iter__(self):
+        return iter(self.shape.names)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, name):
+        return name in self.shape.positions
+
+    def __repr__(self):
+        return repr(self.to_json())
+
+    def __eq__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def get(self, name, default=None):
+        index = self.shape.positions.get(name)
+        if index is None:
+            return default
+        return self._values[index]
+
+    def keys(self):
+        return list(self.shape.names)
+
+    def values(self):
+        return list(self._values)
+
+    def items(self):
+        return list(zip(self.shape.names, self._values))
+
+    def to_json(self):
+        return dict(zip(self.shape.names, self._values))
+
+    def to_wire(self):
+        return dict((name, value.to_json()) for name, value in zip(self.shape.names, self._values))
+
+    @property
+    def json_fragment(self):
+        if self._json_fragment is None:
+            self._json_fragment = json.dumps(self.to_wire())
+        return self._json_fragment
+
+
+Mapping.register(ItemAttributes)
+
+
+class ExpectedCondition(object):
+    """
+    The legacy Expected parameter of a conditional write
+    """
+
+    def __init__(self, expected, conditional_operator=None):
+        self.conditions = []
+        for attribute_name, expectation in expected.items():
+            if 'ComparisonOperator' in expectation:
+                comparison_operator = expectation['ComparisonOperator']
+                comparison_objs = [DynamoType(value) for value in expectation.get('AttributeValueList', [])]
+            elif expectation.get('Exists', True) is False:
+                comparison_operator, comparison_objs = 'NULL', []
+            elif 'Value' in expectation:
+                comparison_operator, comparison_objs = 'EQ', [DynamoType(expectation['Value'])]
+            else:
+                comparison_operator, comparison_objs = 'NOT_NULL', []
+            self.conditions.append((attribute_name, compile_condition(comparison_operator, comparison_objs)))
+        self.combine = any if conditional_operator == 'OR' else all
+
+    def evaluate(self, item, attributes=None):
+        return self.combine(
+            condition(DynamoType(item[attribute_name]) if attribute_name in item else None)
+            for attribute_name, condition in self.conditions
+        )
+
 
 class Item(object):
+    __slots__ = ('hash_key', 'hash_key_type', 'range_key', 'range_key_type', 'attrs')
+
     def __init__(self, hash_key, hash_key_type, range_key, range_key_type, attrs):
         self.hash_key = hash_key
         self.hash_key_type = hash_key_type
         self.range_key = range_key
         self.range_key_type = range_key_type
-
-        self.attrs = {}
-        for key, value in attrs.items():
-            self.attrs[key] = DynamoType(value)
+        self.attrs = attrs
 
     def __repr__(self):
         return "Item: {0}".format(self.to_json())
 
+    def size(self):
+        return self.attrs.size
+
     def to_json(self):
         attributes = {}
         for attribute_key, attribute in self.attrs.items():
@@ -105,8 +297,15 @@ class Item(object):
         }
 
 class Table(object):
+    """
+    The storage engine shared by the 2011-12-05 and 2012-08-10 APIs. Items
+    are stored by hash key and, for tables with a range key, in a dict per
+    hash key alongside a sorted list of its range keys so that queries can
+    bisect rather than scan.
+    """
 
-    def __init__(self, table_name, schema=None, attr = None, throughput=None, indexes=None):
+    def __init__(self, table_name, schema=None, attr = None, throughput=None, indexes=None,
+                 stream_specification=None):
         self.name = table_name
         self.attr = attr
         self.schema = schema
@@ -114,21 +313,35 @@ class Table(object):
         self.hash_key_attr = None
         self.range_key_type = None
         self.hash_key_type = None
+        attribute_types = dict(
+            (definition["AttributeName"], definition["AttributeType"]) for definition in attr or []
+        )
         for elem in schema:
             if elem["KeyType"] == "HASH":
                 self.hash_key_attr = elem["AttributeName"]
-                self.hash_key_type = elem["KeyType"]
+                self.hash_key_type = attribute_types.get(self.hash_key_attr)
             else:
                 self.range_key_attr = elem["AttributeName"]
-                self.range_key_type = elem["KeyType"]
+                self.range_key_type = attribute_types.get(self.range_key_attr)
         if throughput is None:
              self.throughput = {u'WriteCapacityUnits': 10, u'ReadCapacityUnits': 10}
         else:
             self.throughput = throughput
         self.throughput["NumberOfDecreasesToday"] = 0
         self.indexes = indexes
+        self.capacity = CapacityTracker(self.throughput)
+        self.index_capacity = dict(
+            (index['IndexName'], CapacityTracker(index['ProvisionedThroughput']))
+            for index in indexes or [] if 'ProvisionedThroughput' in index
+        )
         self.created_at = datetime.datetime.now()
         self.items = defaultdict(dict)
+        self.range_keys = defaultdict(list)
+        self.attribute_names = AttributeNameTable()
+        self.lock = threading.RLock()
+        self.stream = None
+        if stream_specification:
+            self.update_stream(stream_specification)
 
     @property
     def describe(self):
@@ -144,6 +357,13 @@ class Table(object):
             'CreationDateTime': unix_time(self.created_at)
             }
         }
+        if self.stream:
+            results['Table']['StreamSpecification'] = {
+                'StreamEnabled': True,
+                'StreamViewType': self.stream.view_type,
+            }
+            results['Table']['LatestStreamArn'] = self.stream.arn
+            results['Table']['LatestStreamLabel'] = self.stream.label
         return results
 
     def __len__(self):
@@ -155,19 +375,37 @@ class Table(object):
                 count += 1
         return count
 
-    def put_item(self, item_attrs):
-        hash_value = DynamoType(item_attrs.get(self.hash_key_attr))
+    def put_item(self, item_attrs, condition=None, expression_attributes=None):
+        attrs = self.attribute_names.attributes_for(item_attrs)
+        with self.lock:
+            if condition is not None:
+                existing = self.get_item(attrs[self.hash_key_attr], attrs.get(self.range_key_attr))
+                self.check_condition(existing, condition, expression_attributes)
+            if not self.consume_write_capacity(write_capacity_units(attrs.size)):
+                raise ProvisionedThroughputExceeded()
+            return self._store_item(attrs)
+
+    def _store_item(self, attrs):
+        # The keys are shared with the attributes rather than copied
+        hash_value = attrs[self.hash_key_attr]
         if self.has_range_key:
-            range_value = DynamoType(item_attrs.get(self.range_key_attr))
+            range_value = attrs[self.range_key_attr]
         else:
             range_value = None
 
-        item = Item(hash_value, self.hash_key_type, range_value, self.range_key_type, item_attrs)
+        item = Item(hash_value, self.hash_key_type, range_value, self.range_key_type, attrs)
 
         if range_value:
-            self.items[hash_value][range_value] = item
+            range_items = self.items[hash_value]
+            existing = range_items.get(range_value)
+            if existing is None:
+                insort(self.range_keys[hash_value], range_value)
+            range_items[range_value] = item
         else:
+            existing = self.items.get(hash_value)
             self.items[hash_value] = item
+        if self.stream:
+            self.stream.append(self.describe_key(item), existing.attrs if existing else None, attrs)
         return item
 
     def __nonzero__(self):
@@ -180,38 +418,259 @@ class Table(object):
     def get_item(self, hash_key, range_key):
         if self.has_range_key and not range_key:
             raise ValueError("Table has a range key, but no range key was passed into get_item")
-        try:
-            if range_key:
-                return self.items[hash_key][range_key]
-            else:
-                return self.items[hash_key]
-        except KeyError:
-            return None
+        if range_key:
+            return self.items.get(hash_key, {}).get(range_key)
+        else:
+            return self.items.get(hash_key)
+
+    def delete_item(self, hash_key, range_key, condition=None, expression_attributes=None):
+        with self.lock:
+            existing = self.get_item(hash_key, range_key)
+            if condition is not None:
+                self.check_condition(existing, condition, expression_attributes)
+            units = write_capacity_units(existing.size() if existing else 0)
+            if not self.consume_write_capacity(units):
+                raise ProvisionedThroughputExceeded()
+            return self._delete_item(hash_key, range_key)
+
+    def _delete_item(self, hash_key, range_key):
+        if not range_key:
+            item = self.items.pop(hash_key, None)
+        else:
+            range_items = self.items.get(hash_key)
+            if not range_items or range_key not in range_items:
+                return None
+            item = range_items.pop(range_key)
+            range_keys = self.range_keys[hash_key]
+            del range_keys[bisect_left(range_keys, range_key)]
+            if not range_items:
+                del self.items[hash_key]
+                del self.range_keys[hash_key]
+        if item and self.stream:
+            self.stream.append(self.describe_key(item), item.attrs, None)
+        return item
 
-    def delete_item(self, hash_key, range_key):
-        try:
-            if range_key:
-                return self.items[hash_key].pop(range_key)
+    def check_condition(self, existing, condition, expression_attributes):
+        item = existing.attrs.to_wire() if existing else {}
+        if not condition.evaluate(item, expression_attributes or ExpressionAttributes()):
+            raise ConditionalCheckFailed()
+
+    def update_item(self, keys, update, condition=None, expression_attributes=None):
+        """
+        Atomically applies an UpdateExpression or AttributeUpdates to the
+        item with the given keys, creating it if it doesn't exist. Returns
+        the updated item, the item's previous attributes in wire format and
+        the names of the updated attributes.
+        """
+        expression_attributes = expression_attributes or ExpressionAttributes()
+        hash_key, range_key = self.get_keys(keys)
+        updated_names = update.updated_names(expression_attributes)
+        if self.hash_key_attr in updated_names or self.range_key_attr in updated_names:
+            raise ValueError("Cannot update attribute {0}. This attribute is part of the key".format(
+                self.hash_key_attr if self.hash_key_attr in updated_names else self.range_key_attr))
+
+        with self.lock:
+            existing = self.get_item(hash_key, range_key)
+            old_item = existing.attrs.to_wire() if existing else {}
+            if condition is not None and not condition.evaluate(old_item, expression_attributes):
+                raise ConditionalCheckFailed()
+
+            new_item = update.apply(old_item or dict(keys), expression_attributes)
+            attrs = self.attribute_names.attributes_for(new_item)
+            units = write_capacity_units(max(attrs.size, existing.size() if existing else 0))
+            if not self.consume_write_capacity(units):
+                raise ProvisionedThroughputExceeded()
+
+            if existing:
+                if self.stream:
+                    self.stream.append(self.describe_key(existing), existing.attrs, attrs)
+                existing.attrs = attrs
+                item = existing
             else:
-                return self.items.pop(hash_key)
-        except KeyError:
+                item = self._store_item(attrs)
+        return item, old_item, updated_names
+
+    def get_keys(self, keys):
+        if not self.hash_key_attr in keys or (self.has_range_key and not self.range_key_attr in keys):
+            raise ValueError("Table has a range key, but no range key was passed into get_item")
+        hash_key = DynamoType(keys[self.hash_key_attr])
+        range_key = DynamoType(keys[self.range_key_attr]) if self.has_range_key else None
+        return hash_key, range_key
+
+    def describe_key(self, item):
+        key = {self.hash_key_attr: item.hash_key.to_json()}
+        if self.has_range_key:
+            key[self.range_key_attr] = item.range_key.to_json()
+        return key
+
+    def update_stream(self, stream_specification, max_records=DEFAULT_STREAM_RECORDS):
+        """
+        Starts a new stream of item changes, or stops recording them.
+        As in DynamoDB, re-enabling a stream starts a new one.
+        """
+        if stream_specification.get('StreamEnabled'):
+            self.stream = Stream(self, stream_specification.get('StreamViewType'), max_records)
+        else:
+            self.stream = None
+
+    def simulate_throughput(self, burst_seconds=DEFAULT_BURST_SECONDS):
+        self.capacity.simulate(burst_seconds)
+        for index_capacity in self.index_capacity.values():
+            index_capacity.simulate(burst_seconds)
+
+    def update_throughput(self, throughput):
+        self.throughput = throughput
+        self.capacity.update_throughput(throughput)
+
+    def consume_read_capacity(self, units):
+        if not self.capacity.has_read_capacity(units):
+            self.capacity.throttled_reads += 1
+            return False
+        self.capacity.record_read(units)
+        return True
+
+    def consume_write_capacity(self, units):
+        # Writes consume capacity on the table and on every global secondary index
+        trackers = [self.capacity] + list(self.index_capacity.values())
+        if not all(tracker.has_write_capacity(units) for tracker in trackers):
+            for tracker in trackers:
+                tracker.throttled_writes += 1
+            return False
+        for tracker in trackers:
+            tracker.record_write(units)
+        return True
+
+    def read_item(self, hash_key, range_key, consistent_read=False):
+        item = self.get_item(hash_key, range_key)
+        units = read_capacity_units(item.size() if item else 0, consistent_read)
+        if not self.consume_read_capacity(units):
+            raise ProvisionedThroughputExceeded()
+        return item
+
+    def batch_write(self, requests):
+        """
+        Applies a list of PutRequest/DeleteRequest entries in one critical
+        section. Returns the consumed write capacity and the requests which
+        were throttled and left unprocessed.
+        """
+        consumed = 0
+        unprocessed = []
+        writes = []
+        for request in requests:
+            request_type, request_body = list(request.items())[0]
+            if request_type == 'PutRequest':
+                writes.append((request, self.attribute_names.attributes_for(request_body['Item']), None))
+            elif request_type == 'DeleteRequest':
+                writes.append((request, None, self.get_keys(request_body['Key'])))
+
+        with self.lock:
+            for request, attrs, keys in writes:
+                if attrs is not None:
+                    size = attrs.size
+                else:
+                    existing = self.get_item(*keys)
+                    size = existing.size() if existing else 0
+                units = write_capacity_units(size)
+                if not self.consume_write_capacity(units):
+                    unprocessed.append(request)
+                    continue
+                consumed += units
+                if attrs is not None:
+                    self._store_item(attrs)
+                else:
+                    self._delete_item(*keys)
+        return consumed, unprocessed
+
+    def batch_get(self, keys, consistent_read=False):
+        """
+        Fetches the items for a list of keys. Returns the items found, the
+        consumed read capacity and the keys which were throttled.
+        """
+        consumed = 0
+        items = []
+        unprocessed = []
+        for key in keys:
+            item = self.get_item(*self.get_keys(key))
+            units = read_capacity_units(item.size() if item else 0, consistent_read)
+            if not self.consume_read_capacity(units):
+                unprocessed.append(key)
+                continue
+            consumed += units
+            if item:
+                items.append(item)
+        return items, consumed, unprocessed
+
+    def _range_bounds(self, range_keys, range_comparison, range_objs):
+        """
+        Returns the slice of a sorted range key list matching a key
+        condition, or None when the condition can't be answered by bisection.
+        """
+        if not range_comparison:
+            return 0, len(range_keys)
+        if range_objs[0].type != self.range_key_type:
             return None
 
-    def query(self, hash_key, range_comparison, range_objs):
-        results = []
-        last_page = True  # Once pagination is implemented, change this
+        value = range_objs[0]
+        if range_comparison == 'EQ':
+            return bisect_left(range_keys, value), bisect_right(range_keys, value)
+        elif range_comparison == 'LT':
+            return 0, bisect_left(range_keys, value)
+        elif range_comparison == 'LE':
+            return 0, bisect_right(range_keys, value)
+        elif range_comparison == 'GT':
+            return bisect_right(range_keys, value), len(range_keys)
+        elif range_comparison == 'GE':
+            return bisect_left(range_keys, value), len(range_keys)
+        elif range_comparison == 'BETWEEN':
+            return bisect_left(range_keys, value), bisect_right(range_keys, range_objs[1])
+        elif range_comparison == 'BEGINS_WITH':
+            lower = upper = bisect_left(range_keys, value)
+            while upper < len(range_keys) and range_keys[upper].value.startswith(value.value):
+                upper += 1
+            return lower, upper
+        return None
+
+    def query(self, hash_key, range_comparison, range_objs, limit=None,
+              exclusive_start_key=None, reverse=False):
+        """
+        Returns the items with the given hash key whose range key matches
+        the key condition, in range key order, along with the consumed read
+        capacity and the key to resume from when ``limit`` cut the page short.
+        """
+        if self.has_range_key:
+            range_items = self.items.get(hash_key, {})
+            range_keys = self.range_keys.get(hash_key, [])
+            bounds = self._range_bounds(range_keys, range_comparison, range_objs)
+            if bounds is None:
+                condition = compile_condition(range_comparison, range_objs)
+                range_keys = [range_key for range_key in range_keys if condition(range_key)]
+                bounds = 0, len(range_keys)
+
+            lower, upper = bounds
+            if exclusive_start_key is not None:
+                start_range_key = exclusive_start_key[1]
+                if reverse:
+                    upper = min(upper, bisect_left(range_keys, start_range_key))
+                else:
+                    lower = max(lower, bisect_right(range_keys, start_range_key))
 
-        possible_results =  [ item for item in list(self.all_items()) if item.hash_key == hash_key]
-        if range_comparison:
-            for result in possible_results:
-                if result.range_key.compare(range_comparison, range_objs):
-                    results.append(result)
+            matched = range_keys[lower:upper]
+            if reverse:
+                matched.reverse()
+            results = [range_items[range_key] for range_key in matched]
         else:
-            # If we're not filtering on range key, return all values
-            results = possible_results
+            item = self.items.get(hash_key)
+            results = [item] if item and exclusive_start_key is None else []
+
+        last_evaluated_key = None
+        if limit and len(results) > limit:
+            results = results[:limit]
+            last_evaluated_key = self.describe_key(results[-1])
 
-        results.sort(key=lambda item: item.range_key)
-        return results, last_page
+        consumed = read_capacity_units(sum(item.size() for item in results))
+        if not self.consume_read_capacity(consumed):
+            raise ProvisionedThroughputExceeded()
+        return results, consumed, last_evaluated_key
 
     def all_items(self):
         for hash_set in self.items.values():
@@ -221,58 +680,189 @@ class Table(object):
             else:
                 yield hash_set
 
-    def scan(self, filters):
+    def scan(self, filters, limit=None, exclusive_start_key=None):
+        """
+        Returns the items matching every filter, the number of items
+        examined, the consumed read capacity and the key to resume from.
+        As in DynamoDB, ``limit`` caps the items examined, not those returned.
+        """
         results = []
         scanned_count = 0
-        last_page = True  # Once pagination is implemented, change this
+        last_evaluated_key = None
+
+        conditions = [
+            (attribute_name, compile_condition(comparison_operator, comparison_objs))
+            for attribute_name, (comparison_operator, comparison_objs) in filters.items()
+        ]
+
+        items = self.all_items()
+        if exclusive_start_key is not None:
+            start_hash_key, start_range_key = exclusive_start_key
+            for item in items:
+                if item.hash_key == start_hash_key and item.range_key == start_range_key:
+                    break
 
-        for result in self.all_items():
+        scanned_size = 0
+        for result in items:
+            if limit and scanned_count == limit:
+                last_evaluated_key = self.describe_key(last_scanned)
+                break
             scanned_count += 1
-            passes_all_conditions = True
-            for attribute_name, (comparison_operator, comparison_objs) in filters.items():
-                attribute = result.attrs.get(attribute_name)
-
-                if attribute:
-                    # Attribute found
-                    if not attribute.compare(comparison_operator, comparison_objs):
-                        passes_all_conditions = False
-                        break
-                elif comparison_operator == 'NULL':
-                    # Comparison is NULL and we don't have the attribute
-                    continue
-                else:
-                    # No attribute found and comparison is no NULL. This item fails
-                    passes_all_conditions = False
+            last_scanned = result
+            attrs = result.attrs
+            scanned_size += attrs.size
+            for attribute_name, condition in conditions:
+                if not condition(attrs.get(attribute_name)):
                     break
-
-            if passes_all_conditions:
+            else:
                 results.append(result)
-        return results, scanned_count, last_page
+
+        consumed = read_capacity_units(scanned_size)
+        if not self.consume_read_capacity(consumed):
+            raise ProvisionedThroughputExceeded()
+        return results, scanned_count, consumed, last_evaluated_key
+
+
+class TableCatalog(Mapping):
+    """
+    Tables by name. The names are also kept sorted, the order ListTables
+    returns them in, so that pages can seek to ExclusiveStartTableName.
+    """
+
+    def __init__(self):
+        self._tables = {}
+        self._names = []
+
+    def __getitem__(self, name):
+        return self._tables[name]
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._tables)
+
+    def __contains__(self, name):
+        return name in self._tables
+
+    def __setitem__(self, name, table):
+        if name not in self._tables:
+            insort(self._names, name)
+        self._tables[name] = table
+
+    def pop(self, name, default=None):
+        table = self._tables.pop(name, None)
+        if table is None:
+            return default
+        del self._names[bisect_left(self._names, name)]
+        return table
+
+    def list_names(self, limit=None, exclusive_start_name=None):
+        """
+        Returns a page of table names and, if more follow, the name to
+        resume after.
+        """
+        start = bisect_right(self._names, exclusive_start_name) if exclusive_start_name else 0
+        end = start + limit if limit else len(self._names)
+        names = self._names[start:end]
+        last_evaluated_name = names[-1] if names and end < len(self._names) else None
+        return names, last_evaluated_name
 
 
 class DynamoDBBackend(BaseBackend):
+    table_class = Table
 
     def __init__(self):
-        self.tables = OrderedDict()
+        self.tables = TableCatalog()
+        self.throughput_burst_seconds = None
 
     def create_table(self, name, **params):
-        table = Table(name, **params)
+        table = self.table_class(name, **params)
+        if self.throughput_burst_seconds is not None:
+            table.simulate_throughput(self.throughput_burst_seconds)
         self.tables[name] = table
         return table
 
+    def enable_throughput_simulation(self, burst_seconds=DEFAULT_BURST_SECONDS):
+        """
+        Starts enforcing provisioned throughput on existing and new tables.
+        Requests over capacity fail with ProvisionedThroughputExceededException
+        and batch requests return their throttled part as unprocessed.
+        """
+        self.throughput_burst_seconds = burst_seconds
+        for table in self.tables.values():
+            table.simulate_throughput(burst_seconds)
+
+    def get_table_metrics(self, table_name):
+        table = self.tables.get(table_name)
+        if not table:
+            return None
+        metrics = table.capacity.describe
+        metrics['GlobalSecondaryIndexes'] = dict(
+            (index_name, index_capacity.describe)
+            for index_name, index_capacity in table.index_capacity.items()
+        )
+        return metrics
+
+    def list_tables(self, limit=None, exclusive_start_table_name=None):
+        return self.tables.list_names(limit, exclusive_start_table_name)
+
     def delete_table(self, name):
         return self.tables.pop(name, None)
 
     def update_table_throughput(self, name, throughput):
         table = self.tables[name]
-        table.throughput = throughput
+        table.update_throughput(throughput)
         return table
 
-    def put_item(self, table_name, item_attrs):
+    def update_table_stream(self, name, stream_specification):
+        table = self.tables[name]
+        table.update_stream(stream_specification)
+        return table
+
+    def get_stream(self, stream_arn):
+        # Stream ARNs look like arn:aws:dynamodb:<region>:<account>:table/<name>/stream/<label>
+        table = self.tables.get(stream_arn.split('/')[1]) if '/' in stream_arn else None
+        if table is None or table.stream is None or table.stream.arn != stream_arn:
+            return None
+        return table.stream
+
+    def list_streams(self, table_name=None):
+        if table_name:
+            tables = [self.tables[table_name]] if table_name in self.tables else []
+        else:
+            tables = self.tables.values()
+        return [table.stream for table in tables if table.stream]
+
+    def get_shard_iterator(self, stream_arn, shard_id, iterator_type, sequence_number=None):
+        stream = self.get_stream(stream_arn)
+        if stream is None or shard_id != SHARD_ID:
+            return None
+        return stream.shard_iterator(iterator_type, sequence_number)
+
+    def get_records(self, shard_iterator, limit=None):
+        """
+        Reads the records after a shard iterator's position. Returns the
+        stream, the records and the iterator to continue from.
+        """
+        stream_arn, shard_id, position = parse_shard_iterator(shard_iterator)
+        stream = self.get_stream(stream_arn)
+        if stream is None or shard_id != SHARD_ID:
+            return None, None, None
+        records, next_position = stream.get_records(position, limit)
+        return stream, records, stream.iterator_at(next_position)
+
+    def put_item(self, table_name, item_attrs, condition=None, expression_attributes=None):
         table = self.tables.get(table_name)
         if not table:
             return None
-        return table.put_item(item_attrs)
+        return table.put_item(item_attrs, condition, expression_attributes)
+
+    def update_item(self, table_name, keys, update, condition=None, expression_attributes=None):
+        table = self.tables.get(table_name)
+        if not table:
+            return None, None, None
+        return table.update_item(keys, update, condition, expression_attributes)
 
     def get_table_keys_name(self, table_name):
         table = self.tables.get(table_name)
@@ -282,47 +872,94 @@ class DynamoDBBackend(BaseBackend):
             return table.hash_key_attr, table.range_key_attr
 
     def get_keys_value(self, table, keys):
-        if not table.hash_key_attr in keys or (table.has_range_key and not table.range_key_attr in keys):
-            raise ValueError("Table has a range key, but no range key was passed into get_item")
-        hash_key = DynamoType(keys[table.hash_key_attr])
-        range_key = DynamoType(keys[table.range_key_attr]) if table.has_range_key else None
-        return hash_key,range_key
+        return table.get_keys(keys)
 
-    def get_item(self, table_name, keys):
+    def get_item(self, table_name, keys, consistent_read=False):
         table = self.tables.get(table_name)
         if not table:
             return None
         hash_key,range_key = self.get_keys_value(table,keys)
-        return table.get_item(hash_key, range_key)
+        return table.read_item(hash_key, range_key, consistent_read)
 
-    def query(self, table_name, hash_key_dict, range_comparison, range_value_dicts):
+    def batch_write_item(self, table_batches):
+        """
+        Applies a BatchWriteItem request, resolving each table once. Returns
+        the consumed capacity per table and the unprocessed requests.
+        """
+        consumed_capacity = OrderedDict()
+        unprocessed_items = {}
+        for table_name, table_requests in table_batches.items():
+            table = self.tables.get(table_name)
+            if not table:
+                continue
+            consumed, unprocessed = table.batch_write(table_requests)
+            consumed_capacity[table_name] = consumed
+            if unprocessed:
+                unprocessed_items[table_name] = unprocessed
+        if unprocessed_items and not any(consumed_capacity.values()):
+            # Only a batch which was throttled entirely fails outright
+            raise ProvisionedThroughputExceeded()
+        return consumed_capacity, unprocessed_items
+
+    def batch_get_item(self, table_batches):
+        """
+        Applies a BatchGetItem request, resolving each table once. Returns
+        the items found per table, the consumed capacity per table and the
+        unprocessed keys.
+        """
+        responses = OrderedDict()
+        consumed_capacity = OrderedDict()
+        unprocessed_keys = {}
+        for table_name, table_request in table_batches.items():
+            table = self.tables.get(table_name)
+            if not table:
+                responses[table_name] = []
+                continue
+            items, consumed, unprocessed = table.batch_get(
+                table_request['Keys'], table_request.get('ConsistentRead', False))
+            responses[table_name] = items
+            consumed_capacity[table_name] = consumed
+            if unprocessed:
+                unprocessed_request = dict(table_request)
+                unprocessed_request['Keys'] = unprocessed
+                unprocessed_keys[table_name] = unprocessed_request
+        if unprocessed_keys and not any(consumed_capacity.values()):
+            raise ProvisionedThroughputExceeded()
+        return responses, consumed_capacity, unprocessed_keys
+
+    def query(self, table_name, hash_key_dict, range_comparison, range_value_dicts,
+              limit=None, exclusive_start_key=None, reverse=False):
         table = self.tables.get(table_name)
         if not table:
-            return None, None
+            return None, None, None
 
         hash_key = DynamoType(hash_key_dict)
         range_values = [DynamoType(range_value) for range_value in range_value_dicts]
+        if exclusive_start_key is not None:
+            exclusive_start_key = table.get_keys(exclusive_start_key)
 
-        return table.query(hash_key, range_comparison, range_values)
+        return table.query(hash_key, range_comparison, range_values, limit, exclusive_start_key, reverse)
 
-    def scan(self, table_name, filters):
+    def scan(self, table_name, filters, limit=None, exclusive_start_key=None):
         table = self.tables.get(table_name)
         if not table:
-            return None, None, None
+            return None, None, None, None
 
         scan_filters = {}
         for key, (comparison_operator, comparison_values) in filters.items():
             dynamo_types = [DynamoType(value) for value in comparison_values]
             scan_filters[key] = (comparison_operator, dynamo_types)
+        if exclusive_start_key is not None:
+            exclusive_start_key = table.get_keys(exclusive_start_key)
 
-        return table.scan(scan_filters)
+        return table.scan(scan_filters, limit, exclusive_start_key)
 
-    def delete_item(self, table_name, keys):
+    def delete_item(self, table_name, keys, condition=None, expression_attributes=None):
         table = self.tables.get(table_name)
         if not table:
             return None
         hash_key, range_key = self.get_keys_value(table, keys)
-        return table.delete_item(hash_key, range_key)
+        return table.delete_item(hash_key, range_key, condition, expression_attributes)
 
 
 dynamodb_backend2 = DynamoDBBackend()
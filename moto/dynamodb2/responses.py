@@ -4,7 +4,13 @@ import six
 
 from moto.core.responses import BaseResponse
 from moto.core.utils import camelcase_to_underscores
-from .models import dynamodb_backend2, dynamo_json_dump
+from .exceptions import ConditionalCheckFailed, ProvisionedThroughputExceeded, TrimmedDataAccess
+from .expressions import (
+    AttributeUpdates, ConditionExpression, ExpressionAttributes,
+    ProjectionExpression, UpdateExpression,
+)
+from .models import dynamodb_backend2, dynamo_json_dump, ExpectedCondition
+from .utils import read_capacity_units, write_capacity_units
 
 
 GET_SESSION_TOKEN_RESULT = """
@@ -59,7 +65,10 @@ class DynamoHandler(BaseResponse):
         endpoint = self.get_endpoint_name(self.headers)
         if endpoint:
             endpoint = camelcase_to_underscores(endpoint)
-            response = getattr(self, endpoint)()
+            try:
+                response = getattr(self, endpoint)()
+            except (ConditionalCheckFailed, ProvisionedThroughputExceeded, TrimmedDataAccess) as e:
+                return self.error(e.error_type, status=e.status_code)
             if isinstance(response, six.string_types):
                 return 200, self.response_headers, response
 
@@ -70,22 +79,37 @@ class DynamoHandler(BaseResponse):
         else:
             return 404, self.response_headers, ""
 
+    def _expression_attributes(self):
+        return ExpressionAttributes(
+            self.body.get('ExpressionAttributeNames'),
+            self.body.get('ExpressionAttributeValues'),
+        )
+
+    def _write_condition(self):
+        if 'ConditionExpression' in self.body:
+            return ConditionExpression.compile(self.body['ConditionExpression'])
+        elif self.body.get('Expected'):
+            return ExpectedCondition(self.body['Expected'], self.body.get('ConditionalOperator'))
+        return None
+
+    def _projection(self, body=None):
+        body = body or self.body
+        if 'ProjectionExpression' in body:
+            return ProjectionExpression.compile(body['ProjectionExpression'])
+        return None
+
+    def _project(self, item, projection, attributes):
+        if projection is None:
+            return item.attrs
+        return projection.project(item.attrs.to_wire(), attributes)
+
     def list_tables(self):
         body = self.body
-        limit = body.get('Limit')
-        if body.get("ExclusiveStartTableName"):
-            last = body.get("ExclusiveStartTableName")
-            start = list(dynamodb_backend2.tables.keys()).index(last) + 1
-        else:
-            start = 0
-        all_tables = list(dynamodb_backend2.tables.keys())
-        if limit:
-            tables = all_tables[start:start + limit]
-        else:
-            tables = all_tables[start:]
+        tables, last_evaluated_name = dynamodb_backend2.list_tables(
+            body.get('Limit'), body.get("ExclusiveStartTableName"))
         response = {"TableNames": tables}
-        if limit and len(all_tables) > start + limit:
-            response["LastEvaluatedTableName"] = tables[-1]
+        if last_evaluated_name:
+            response["LastEvaluatedTableName"] = last_evaluated_name
         return dynamo_json_dump(response)
 
     def create_table(self):
@@ -99,10 +123,17 @@ class DynamoHandler(BaseResponse):
         #getting attribute definition
         attr = body["AttributeDefinitions"]
         #getting the indexes
-        table = dynamodb_backend2.create_table(table_name,
-                   schema = key_schema,
-                   throughput = throughput,
-                   attr = attr)
+        global_indexes = body.get("GlobalSecondaryIndexes", [])
+        try:
+            table = dynamodb_backend2.create_table(table_name,
+                       schema = key_schema,
+                       throughput = throughput,
+                       attr = attr,
+                       indexes = global_indexes,
+                       stream_specification = body.get("StreamSpecification"))
+        except ValueError:
+            er = 'com.amazon.coral.validate#ValidationException'
+            return self.error(er)
         return dynamo_json_dump(table.describe)
 
     def delete_table(self):
@@ -116,8 +147,14 @@ class DynamoHandler(BaseResponse):
 
     def update_table(self):
         name = self.body['TableName']
-        throughput = self.body["ProvisionedThroughput"]
-        table = dynamodb_backend2.update_table_throughput(name, throughput)
+        if 'StreamSpecification' in self.body:
+            try:
+                table = dynamodb_backend2.update_table_stream(name, self.body['StreamSpecification'])
+            except ValueError:
+                er = 'com.amazon.coral.validate#ValidationException'
+                return self.error(er)
+        if 'ProvisionedThroughput' in self.body:
+            table = dynamodb_backend2.update_table_throughput(name, self.body["ProvisionedThroughput"])
         return dynamo_json_dump(table.describe)
 
     def describe_table(self):
@@ -132,11 +169,16 @@ class DynamoHandler(BaseResponse):
     def put_item(self):
         name = self.body['TableName']
         item = self.body['Item']
-        result = dynamodb_backend2.put_item(name, item)
+        try:
+            condition = self._write_condition()
+            result = dynamodb_backend2.put_item(name, item, condition, self._expression_attributes())
+        except ValueError:
+            er = 'com.amazon.coral.validate#ValidationException'
+            return self.error(er)
 
         if result:
             item_dict = result.to_json()
-            item_dict['ConsumedCapacityUnits'] = 1
+            item_dict['ConsumedCapacityUnits'] = write_capacity_units(result.size())
             return dynamo_json_dump(item_dict)
         else:
             er = 'com.amazonaws.dynamodb.v20111205#ResourceNotFoundException'
@@ -145,41 +187,37 @@ class DynamoHandler(BaseResponse):
     def batch_write_item(self):
         table_batches = self.body['RequestItems']
 
-        for table_name, table_requests in table_batches.items():
-            for table_request in table_requests:
-                request_type = list(table_request.keys())[0]
-                request = list(table_request.values())[0]
-                if request_type == 'PutRequest':
-                    item = request['Item']
-                    dynamodb_backend2.put_item(table_name, item)
-                elif request_type == 'DeleteRequest':
-                    keys = request['Key']
-                    item = dynamodb_backend2.delete_item(table_name, keys)
+        try:
+            consumed_capacity, unprocessed_items = dynamodb_backend2.batch_write_item(table_batches)
+        except ValueError:
+            er = 'com.amazon.coral.validate#ValidationException'
+            return self.error(er)
 
         response = {
-            "Responses": {
-                "Thread": {
-                    "ConsumedCapacityUnits": 1.0
-                },
-                "Reply": {
-                    "ConsumedCapacityUnits": 1.0
-                }
-            },
-            "UnprocessedItems": {}
+            "ConsumedCapacity": [
+                {"TableName": table_name, "CapacityUnits": units}
+                for table_name, units in consumed_capacity.items()
+            ],
+            "UnprocessedItems": unprocessed_items,
         }
 
         return dynamo_json_dump(response)
+
     def get_item(self):
         name = self.body['TableName']
         key = self.body['Key']
+        consistent_read = self.body.get('ConsistentRead', False)
         try:
-            item = dynamodb_backend2.get_item(name, key)
+            item = dynamodb_backend2.get_item(name, key, consistent_read)
         except ValueError:
             er = 'com.amazon.coral.validate#ValidationException'
             return self.error(er, status=400)
         if item:
             item_dict = item.describe_attrs(attributes = None)
-            item_dict['ConsumedCapacityUnits'] = 0.5
+            projection = self._projection()
+            if projection:
+                item_dict['Item'] = self._project(item, projection, self._expression_attributes())
+            item_dict['ConsumedCapacityUnits'] = read_capacity_units(item.size(), consistent_read)
             return dynamo_json_dump(item_dict)
         else:
             # Item not found
@@ -189,29 +227,34 @@ class DynamoHandler(BaseResponse):
     def batch_get_item(self):
         table_batches = self.body['RequestItems']
 
+        try:
+            responses, consumed_capacity, unprocessed_keys = dynamodb_backend2.batch_get_item(table_batches)
+        except ValueError:
+            er = 'com.amazon.coral.validate#ValidationException'
+            return self.error(er)
+
         results = {
-            "ConsumedCapacity":[],
-            "Responses": {
-            },
-            "UnprocessedKeys": {
-            }
+            "ConsumedCapacity": [
+                {"TableName": table_name, "CapacityUnits": units}
+                for table_name, units in consumed_capacity.items()
+            ],
+            "Responses": {},
+            "UnprocessedKeys": unprocessed_keys,
         }
 
-        for table_name, table_request in table_batches.items():
-            items = []
-            keys = table_request['Keys']
-            attributes_to_get = table_request.get('AttributesToGet')
-            results["Responses"][table_name]=[]
-            for key in keys:
-                item = dynamodb_backend2.get_item(table_name, key)
-                if item:
-                    item_describe = item.describe_attrs(attributes_to_get)
-                    results["Responses"][table_name].append(item_describe["Item"])
-
-            results["ConsumedCapacity"].append({
-                "CapacityUnits": len(keys),
-                "TableName": table_name
-            })
+        for table_name, items in responses.items():
+            table_request = table_batches[table_name]
+            projection = self._projection(table_request)
+            if projection:
+                attributes = ExpressionAttributes(table_request.get('ExpressionAttributeNames'))
+                results["Responses"][table_name] = [
+                    self._project(item, projection, attributes) for item in items
+                ]
+            else:
+                attributes_to_get = table_request.get('AttributesToGet')
+                results["Responses"][table_name] = [
+                    item.describe_attrs(attributes_to_get)["Item"] for item in items
+                ]
         return dynamo_json_dump(results)
 
     def query(self):
@@ -237,31 +280,31 @@ class DynamoHandler(BaseResponse):
                 else:
                     range_comparison = None
                     range_values = []
-        items, last_page = dynamodb_backend2.query(name, hash_key, range_comparison, range_values)
+        # boto sends ScanIndexForward=False for its default ascending order
+        reverse = self.body.get("ScanIndexForward") != False
+        try:
+            items, consumed, last_evaluated_key = dynamodb_backend2.query(
+                name, hash_key, range_comparison, range_values,
+                limit=self.body.get("Limit"),
+                exclusive_start_key=self.body.get("ExclusiveStartKey"),
+                reverse=reverse,
+            )
+        except ValueError:
+            er = 'com.amazon.coral.validate#ValidationException'
+            return self.error(er)
         if items is None:
             er = 'com.amazonaws.dynamodb.v20111205#ResourceNotFoundException'
             return self.error(er)
 
-        limit = self.body.get("Limit")
-        if limit:
-            items = items[:limit]
-
-        reversed = self.body.get("ScanIndexForward")
-        if reversed != False:
-            items.reverse()
-
+        projection = self._projection()
+        attributes = self._expression_attributes()
         result = {
             "Count": len(items),
-            "Items": [item.attrs for item in items],
-            "ConsumedCapacityUnits": 1,
+            "Items": [self._project(item, projection, attributes) for item in items],
+            "ConsumedCapacityUnits": consumed,
         }
-
-        # Implement this when we do pagination
-        # if not last_page:
-        #     result["LastEvaluatedKey"] = {
-        #         "HashKeyElement": items[-1].hash_key,
-        #         "RangeKeyElement": items[-1].range_key,
-        #     }
+        if last_evaluated_key:
+            result["LastEvaluatedKey"] = last_evaluated_key
         return dynamo_json_dump(result)
 
     def scan(self):
@@ -275,43 +318,133 @@ class DynamoHandler(BaseResponse):
             comparison_values = scan_filter.get("AttributeValueList", [])
             filters[attribute_name] = (comparison_operator, comparison_values)
 
-        items, scanned_count, last_page = dynamodb_backend2.scan(name, filters)
-
+        try:
+            items, scanned_count, consumed, last_evaluated_key = dynamodb_backend2.scan(
+                name, filters,
+                limit=self.body.get("Limit"),
+                exclusive_start_key=self.body.get("ExclusiveStartKey"),
+            )
+        except ValueError:
+            er = 'com.amazon.coral.validate#ValidationException'
+            return self.error(er)
         if items is None:
             er = 'com.amazonaws.dynamodb.v20111205#ResourceNotFoundException'
             return self.error(er)
 
-        limit = self.body.get("Limit")
-        if limit:
-            items = items[:limit]
-
+        projection = self._projection()
+        attributes = self._expression_attributes()
         result = {
             "Count": len(items),
-            "Items": [item.attrs for item in items],
-            "ConsumedCapacityUnits": 1,
+            "Items": [self._project(item, projection, attributes) for item in items],
+            "ConsumedCapacityUnits": consumed,
             "ScannedCount": scanned_count
         }
-
-        # Implement this when we do pagination
-        # if not last_page:
-        #     result["LastEvaluatedKey"] = {
-        #         "HashKeyElement": items[-1].hash_key,
-        #         "RangeKeyElement": items[-1].range_key,
-        #     }
+        if last_evaluated_key:
+            result["LastEvaluatedKey"] = last_evaluated_key
         return dynamo_json_dump(result)
 
     def delete_item(self):
         name = self.body['TableName']
         keys = self.body['Key']
         return_values = self.body.get('ReturnValues', '')
-        item = dynamodb_backend2.delete_item(name, keys)
+        try:
+            condition = self._write_condition()
+            item = dynamodb_backend2.delete_item(name, keys, condition, self._expression_attributes())
+        except ValueError:
+            er = 'com.amazon.coral.validate#ValidationException'
+            return self.error(er)
         if item:
             if return_values == 'ALL_OLD':
                 item_dict = item.to_json()
             else:
                 item_dict = {'Attributes': []}
-            item_dict['ConsumedCapacityUnits'] = 0.5
+            item_dict['ConsumedCapacityUnits'] = write_capacity_units(item.size())
             return dynamo_json_dump(item_dict)
         else:
             er = 'com.amazonaws.dynamodb.v20120810#ConditionalCheckFailedException'
             return self.error(er)
+
+    def update_item(self):
+        name = self.body['TableName']
+        key = self.body['Key']
+        return_values = self.body.get('ReturnValues', 'NONE')
+        try:
+            if 'UpdateExpression' in self.body:
+                update = UpdateExpression.compile(self.body['UpdateExpression'])
+            else:
+                update = AttributeUpdates(self.body.get('AttributeUpdates', {}))
+            condition = self._write_condition()
+            item, old_item, updated_names = dynamodb_backend2.update_item(
+                name, key, update, condition, self._expression_attributes())
+        except ValueError:
+            er = 'com.amazon.coral.validate#ValidationException'
+            return self.error(er)
+        if item is None:
+            er = 'com.amazonaws.dynamodb.v20111205#ResourceNotFoundException'
+            return self.error(er)
+
+        if return_values in ('ALL_OLD', 'UPDATED_OLD'):
+            attributes = old_item
+        elif return_values in ('ALL_NEW', 'UPDATED_NEW'):
+            attributes = item.attrs.to_wire()
+        else:
+            attributes = {}
+        if return_values.startswith('UPDATED_'):
+            attributes = dict(
+                (attribute_name, value) for attribute_name, value in attributes.items()
+                if attribute_name in updated_names
+            )
+
+        item_dict = {'ConsumedCapacityUnits': write_capacity_units(item.size())}
+        if attributes:
+            item_dict['Attributes'] = attributes
+        return dynamo_json_dump(item_dict)
+
+    def list_streams(self):
+        streams = dynamodb_backend2.list_streams(self.body.get('TableName'))
+        return dynamo_json_dump({
+            'Streams': [{
+                'StreamArn': stream.arn,
+                'StreamLabel': stream.label,
+                'TableName': stream.table.name,
+            } for stream in streams]
+        })
+
+    def describe_stream(self):
+        stream = dynamodb_backend2.get_stream(self.body['StreamArn'])
+        if stream is None:
+            er = 'com.amazonaws.dynamodb.v20120810#ResourceNotFoundException'
+            return self.error(er)
+        return dynamo_json_dump(stream.describe)
+
+    def get_shard_iterator(self):
+        try:
+            shard_iterator = dynamodb_backend2.get_shard_iterator(
+                self.body['StreamArn'],
+                self.body['ShardId'],
+                self.body['ShardIteratorType'],
+                self.body.get('SequenceNumber'),
+            )
+        except ValueError:
+            er = 'com.amazon.coral.validate#ValidationException'
+            return self.error(er)
+        if shard_iterator is None:
+            er = 'com.amazonaws.dynamodb.v20120810#ResourceNotFoundException'
+            return self.error(er)
+        return dynamo_json_dump({'ShardIterator': shard_iterator})
+
+    def get_records(self):
+        # GetRecords returns at most 1000 records per call
+        limit = min(self.body.get('Limit') or 1000, 1000)
+        try:
+            stream, records, next_iterator = dynamodb_backend2.get_records(self.body['ShardIterator'], limit)
+        except ValueError:
+            er = 'com.amazon.coral.validate#ValidationException'
+            return self.error(er)
+        if stream is None:
+            er = 'com.amazonaws.dynamodb.v20120810#ResourceNotFoundException'
+            return self.error(er)
+        return dynamo_json_dump({
+            'Records': [record.to_json(stream.view_type) for record in records],
+            'NextShardIterator': next_iterator,
+        })
@@ -0,0 +1,156 @@
+from __future__ import unicode_literals
+import datetime
+
+from .exceptions import TrimmedDataAccess
+from .utils import unix_time
+
+# How many change records a stream keeps before the oldest are trimmed
+DEFAULT_STREAM_RECORDS = 10000
+
+STREAM_VIEW_TYPES = ('KEYS_ONLY', 'NEW_IMAGE', 'OLD_IMAGE', 'NEW_AND_OLD_IMAGES')
+
+SHARD_ID = 'shardId-00000000000000000000-00000001'
+
+
+class StreamRecord(object):
+    """
+    One change to an item. The images are the item's attributes before and
+    after the change, which are never mutated and so can be shared.
+    """
+    __slots__ = ('sequence_number', 'event_name', 'keys', 'old_image', 'new_image', 'created_at')
+
+    def __init__(self, sequence_number, event_name, keys, old_image, new_image):
+        self.sequence_number = sequence_number
+        self.event_name = event_name
+        self.keys = keys
+        self.old_image = old_image
+        self.new_image = new_image
+        self.created_at = datetime.datetime.now()
+
+    def to_json(self, view_type):
+        sequence_number = format_sequence_number(self.sequence_number)
+        record = {
+            'Keys': self.keys,
+            'SequenceNumber': sequence_number,
+            'SizeBytes': sum(image.size for image in (self.old_image, self.new_image) if image is not None),
+            'StreamViewType': view_type,
+            'ApproximateCreationDateTime': unix_time(self.created_at),
+        }
+        if self.new_image is not None and view_type in ('NEW_IMAGE', 'NEW_AND_OLD_IMAGES'):
+            record['NewImage'] = self.new_image
+        if self.old_image is not None and view_type in ('OLD_IMAGE', 'NEW_AND_OLD_IMAGES'):
+            record['OldImage'] = self.old_image
+        return {
+            'eventID': sequence_number,
+            'eventName': self.event_name,
+            'eventVersion': '1.0',
+            'eventSource': 'aws:dynamodb',
+            'awsRegion': 'us-east-1',
+            'dynamodb': record,
+        }
+
+
+def format_sequence_number(sequence_number):
+    return '{0:021d}'.format(sequence_number)
+
+
+def parse_shard_iterator(shard_iterator):
+    """
+    Splits a shard iterator into its stream ARN, shard id and position.
+    Iterators carry their position, so the streams keep no reader state.
+    """
+    try:
+        stream_arn, shard_id, position = shard_iterator.rsplit('|', 2)
+        return stream_arn, shard_id, int(position)
+    except ValueError:
+        raise ValueError("Invalid ShardIterator: {0}".format(shard_iterator))
+
+
+class Stream(object):
+    """
+    The change log of a table, held in a ring buffer of the latest
+    ``max_records`` changes. Sequence numbers increase by one per change,
+    so a record's slot in the buffer is its sequence number modulo the
+    buffer size and reads from any position need no search.
+    """
+
+    def __init__(self, table, view_type, max_records=DEFAULT_STREAM_RECORDS):
+        if view_type not in STREAM_VIEW_TYPES:
+            raise ValueError("Invalid StreamViewType: {0}".format(view_type))
+        self.table = table
+        self.view_type = view_type
+        self.created_at = datetime.datetime.now()
+        self.label = self.created_at.isoformat()
+        self.arn = 'arn:aws:dynamodb:us-east-1:123456789012:table/{0}/stream/{1}'.format(
+            table.name, self.label)
+        self.max_records = max_records
+        self.buffer = [None] * max_records
+        self.next_sequence_number = 1
+
+    @property
+    def trim_horizon(self):
+        """
+        The sequence number of the oldest record still held
+        """
+        return max(1, self.next_sequence_number - self.max_records)
+
+    def append(self, keys, old_image, new_image):
+        if old_image is None:
+            event_name = 'INSERT'
+        elif new_image is None:
+            event_name = 'REMOVE'
+        else:
+            event_name = 'MODIFY'
+        sequence_number = self.next_sequence_number
+        self.buffer[sequence_number % self.max_records] = StreamRecord(
+            sequence_number, event_name, keys, old_image, new_image)
+        self.next_sequence_number += 1
+
+    def shard_iterator(self, iterator_type, sequence_number=None):
+        if iterator_type == 'TRIM_HORIZON':
+            position = self.trim_horizon
+        elif iterator_type == 'LATEST':
+            position = self.next_sequence_number
+        elif iterator_type == 'AT_SEQUENCE_NUMBER':
+            position = int(sequence_number)
+        elif iterator_type == 'AFTER_SEQUENCE_NUMBER':
+            position = int(sequence_number) + 1
+        else:
+            raise ValueError("Invalid ShardIteratorType: {0}".format(iterator_type))
+        return self.iterator_at(position)
+
+    def iterator_at(self, position):
+        return '{0}|{1}|{2}'.format(self.arn, SHARD_ID, position)
+
+    def get_records(self, position, limit=None):
+        """
+        Returns up to ``limit`` records from ``position`` onwards and the
+        position to continue from.
+        """
+        if position < self.trim_horizon:
+            raise TrimmedDataAccess()
+        end = self.next_sequence_number
+        if limit:
+            end = min(end, position + limit)
+        records = [self.buffer[sequence_number % self.max_records] for sequence_number in range(position, end)]
+        return records, max(position, end)
+
+    @property
+    def describe(self):
+        return {
+            'StreamDescription': {
+                'StreamArn': self.arn,
+                'StreamLabel': self.label,
+                'StreamStatus': 'ENABLED',
+                'StreamViewType': self.view_type,
+                'CreationRequestDateTime': unix_time(self.created_at),
+                'TableName': self.table.name,
+                'KeySchema': self.table.schema,
+                'Shards': [{
+                    'ShardId': SHARD_ID,
+                    'SequenceNumberRange': {
+                        'StartingSequenceNumber': format_sequence_number(self.trim_horizon),
+                    },
+                }],
+            }
+        }
@@ -0,0 +1,92 @@
+from __future__ import unicode_literals
+import time
+
+# DynamoDB lets a table save up to five minutes of unused capacity for bursts
+DEFAULT_BURST_SECONDS = 300
+
+
+class TokenBucket(object):
+    """
+    Capacity units refilled continuously at ``rate`` per second, holding at
+    most ``burst_seconds`` worth of unused capacity.
+    """
+
+    def __init__(self, rate, burst_seconds=DEFAULT_BURST_SECONDS):
+        self.burst_seconds = burst_seconds
+        self.set_rate(rate)
+        self.tokens = self.capacity
+        self.updated_at = time.time()
+
+    def set_rate(self, rate):
+        self.rate = float(rate)
+        self.capacity = max(self.rate, self.rate * self.burst_seconds)
+
+    def refill(self):
+        now = time.time()
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def has_tokens(self, units):
+        self.refill()
+        return self.tokens >= units
+
+    def take(self, units):
+        self.tokens -= units
+
+
+class CapacityTracker(object):
+    """
+    Consumed capacity metrics for a table or global secondary index. Once
+    simulation is enabled, reads and writes are also limited by token
+    buckets driven by the provisioned throughput.
+    """
+
+    def __init__(self, throughput):
+        self.throughput = throughput
+        self.read_bucket = None
+        self.write_bucket = None
+        self.consumed_read_units = 0
+        self.consumed_write_units = 0
+        self.throttled_reads = 0
+        self.throttled_writes = 0
+
+    @property
+    def simulated(self):
+        return self.read_bucket is not None
+
+    def simulate(self, burst_seconds=DEFAULT_BURST_SECONDS):
+        self.read_bucket = TokenBucket(self.throughput['ReadCapacityUnits'], burst_seconds)
+        self.write_bucket = TokenBucket(self.throughput['WriteCapacityUnits'], burst_seconds)
+
+    def update_throughput(self, throughput):
+        self.throughput = throughput
+        if self.simulated:
+            self.read_bucket.set_rate(throughput['ReadCapacityUnits'])
+            self.write_bucket.set_rate(throughput['WriteCapacityUnits'])
+
+    def has_read_capacity(self, units):
+        return self.read_bucket is None or self.read_bucket.has_tokens(units)
+
+    def has_write_capacity(self, units):
+        return self.write_bucket is None or self.write_bucket.has_tokens(units)
+
+    def record_read(self, units):
+        if self.read_bucket is not None:
+            self.read_bucket.take(units)
+        self.consumed_read_units += units
+
+    def record_write(self, units):
+        if self.write_bucket is not None:
+            self.write_bucket.take(units)
+        self.consumed_write_units += units
+
+    @property
+    def describe(self):
+        return {
+            'ConsumedReadCapacityUnits': self.consumed_read_units,
+            'ConsumedWriteCapacityUnits': self.consumed_write_units,
+            'ThrottledReadRequests': self.throttled_reads,
+            'ThrottledWriteRequests': self.throttled_writes,
+        }
@@ -3,6 +3,7 @@ from .responses import DynamoHandler
 
 url_bases = [
     "https?://dynamodb.(.+).amazonaws.com",
+    "https?://streams.dynamodb.(.+).amazonaws.com",
     "https?://sts.amazonaws.com",
 ]
 
@@ -1,6 +1,44 @@
 from __future__ import unicode_literals
 import calendar
+import math
 
 
 def unix_time(dt):
     return calendar.timegm(dt.timetuple())
+
+
+def dynamo_value_size(dynamo_type, value):
+    """
+    Approximates the stored size in bytes of a wire-format value, following
+    http://docs.aws.amazon.com/amazondynamodb/latest/developerguide/WorkingWithTables.html#ItemSizeCalculations
+    """
+    if dynamo_type in ('SS', 'NS', 'BS'):
+        return sum(dynamo_value_size(dynamo_type[0], element) for element in value)
+    elif dynamo_type == 'M':
+        return 3 + sum(
+            len(name) + dynamo_value_size(*list(element.items())[0])
+            for name, element in value.items()
+        )
+    elif dynamo_type == 'L':
+        return 3 + sum(dynamo_value_size(*list(element.items())[0]) for element in value)
+    elif dynamo_type in ('BOOL', 'NULL'):
+        return 1
+    elif dynamo_type == 'N':
+        # Numbers are stored with two significant digits per byte
+        return (len(value.lstrip('-').replace('.', '')) + 1) // 2 + 1
+    elif dynamo_type == 'B':
+        # Binary values arrive base64 encoded
+        return len(value) * 3 // 4
+    return len(value.encode('utf-8'))
+
+
+def write_capacity_units(size):
+    return max(1, int(math.ceil(size / 1024.0)))
+
+
+def read_capacity_units(size, consistent_read=False):
+    units = max(1, int(math.ceil(size / 4096.0)))
+    if not consistent_read:
+        # Eventually consistent reads cost half as much
+        return units * 0.5
+    return units
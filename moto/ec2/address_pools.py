@@ -0,0 +1,113 @@
+from __future__ import unicode_literals
+import socket
+import struct
+
+
+def ip_to_int(address):
+    return struct.unpack(str('!I'), socket.inet_aton(str(address)))[0]
+
+
+def int_to_ip(value):
+    return socket.inet_ntoa(struct.pack(str('!I'), value))
+
+
+def parse_cidr_block(cidr_block):
+    """
+    Returns the first address of ``cidr_block`` as an int, the number of
+    addresses in it and its prefix length. Host bits set in the address are
+    ignored, as AWS does.
+    Raises ValueError for anything that is not an IPv4 CIDR block.
+    """
+    try:
+        address, prefix_length = cidr_block.split('/')
+        prefix_length = int(prefix_length)
+        network = ip_to_int(address)
+    except (AttributeError, TypeError, socket.error):
+        raise ValueError("Invalid CIDR block: {0}".format(cidr_block))
+    if not 0 <= prefix_length <= 32:
+        raise ValueError("Invalid CIDR block: {0}".format(cidr_block))
+    size = 1 << (32 - prefix_length)
+    return network & ~(size - 1) & 0xFFFFFFFF, size, prefix_length
+
+
+class AddressPool(object):
+    """
+    The addresses of a CIDR block, handed out by ``allocate`` and returned
+    by ``release`` in constant time. Addresses never handed out are taken
+    from a cursor running through the block, released ones from a free
+    list; ``allocated`` holds the offsets in use so that addresses asked
+    for by value can be reserved too.
+
+    The first ``reserved_head`` and last ``reserved_tail`` addresses are
+    never handed out, like the network, router, DNS and broadcast
+    addresses of a subnet.
+    """
+
+    def __init__(self, cidr_block, reserved_head=0, reserved_tail=0):
+        self.cidr_block = cidr_block
+        self.network, self.size, _ = parse_cidr_block(cidr_block)
+        self.first = min(reserved_head, self.size)
+        self.last = max(self.first, self.size - reserved_tail)
+        self.allocated = set()
+        self.released = []
+        self.cursor = self.first
+
+    def offset(self, address):
+        """
+        The offset of ``address`` in the block, or None when it is outside
+        """
+        try:
+            offset = ip_to_int(address) - self.network
+        except (TypeError, socket.error):
+            return None
+        if 0 <= offset < self.size:
+            return offset
+        return None
+
+    def __contains__(self, address):
+        return self.offset(address) is not None
+
+    def __len__(self):
+        return len(self.allocated)
+
+    @property
+    def free_count(self):
+        return self.last - self.first - len(self.allocated)
+
+    def allocate(self):
+        """
+        Returns a free address, or None when the pool is exhausted
+        """
+        while self.released:
+            offset = self.released.pop()
+            # Skip offsets reserved by value since they were released
+            if offset not in self.allocated:
+                self.allocated.add(offset)
+                return int_to_ip(self.network + offset)
+        while self.cursor < self.last:
+            offset = self.cursor
+            self.cursor += 1
+            if offset not in self.allocated:
+                self.allocated.add(offset)
+                return int_to_ip(self.network + offset)
+        return None
+
+    def reserve(self, address):
+        """
+        Takes ``address`` out of the pool. Returns False when it is already
+        in use or is one of the reserved addresses. Addresses outside the
+        block are not tracked and always succeed.
+        """
+        offset = self.offset(address)
+        if offset is None:
+            return True
+        if offset < self.first or offset >= self.last or offset in self.allocated:
+            return False
+        self.allocated.add(offset)
+        return True
+
+    def release(self, address):
+        offset = self.offset(address)
+        if offset in self.allocated:
+            self.allocated.remove(offset)
+            self.released.append(offset)
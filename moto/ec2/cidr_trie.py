@@ -0,0 +1,107 @@
+from __future__ import unicode_literals
+import socket
+
+from .address_pools import ip_to_int, parse_cidr_block
+
+
+class _TrieNode(object):
+    __slots__ = ('children', 'value')
+
+    def __init__(self):
+        self.children = [None, None]
+        self.value = None
+
+
+def _prefix_bits(cidr_block):
+    network, _, prefix_length = parse_cidr_block(cidr_block)
+    return [(network >> (31 - depth)) & 1 for depth in range(prefix_length)]
+
+
+class CidrTrie(object):
+    """
+    A binary trie of IPv4 CIDR blocks, one level per prefix bit. Finding a
+    block, or every block holding an address, follows a single path of at
+    most 32 nodes whatever the number of blocks stored.
+    """
+
+    def __init__(self):
+        self.root = _TrieNode()
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _find(self, cidr_block, create=False):
+        node = self.root
+        for bit in _prefix_bits(cidr_block):
+            if node.children[bit] is None:
+                if not create:
+                    return None
+                node.children[bit] = _TrieNode()
+            node = node.children[bit]
+        return node
+
+    def get(self, cidr_block, default=None):
+        node = self._find(cidr_block)
+        if node is None or node.value is None:
+            return default
+        return node.value
+
+    def setdefault(self, cidr_block, value):
+        node = self._find(cidr_block, create=True)
+        if node.value is None:
+            node.value = value
+            self.size += 1
+        return node.value
+
+    def __setitem__(self, cidr_block, value):
+        node = self._find(cidr_block, create=True)
+        if node.value is None:
+            self.size += 1
+        node.value = value
+
+    def pop(self, cidr_block, default=None):
+        path = [self.root]
+        bits = _prefix_bits(cidr_block)
+        for bit in bits:
+            node = path[-1].children[bit]
+            if node is None:
+                return default
+            path.append(node)
+        value = path[-1].value
+        if value is None:
+            return default
+        path[-1].value = None
+        self.size -= 1
+        # Prune the branch left without any block
+        for depth in range(len(bits), 0, -1):
+            node = path[depth]
+            if node.value is not None or node.children != [None, None]:
+                break
+            path[depth - 1].children[bits[depth - 1]] = None
+        return value
+
+    def matches(self, address):
+        """
+        Yields the values of every block holding ``address``, the shortest
+        prefix first. Raises ValueError when ``address`` is not an IPv4 address.
+        """
+        try:
+            address = ip_to_int(address)
+        except (TypeError, socket.error):
+            raise ValueError("Invalid IP address: {0}".format(address))
+        node = self.root
+        depth = 0
+        while node is not None:
+            if node.value is not None:
+                yield node.value
+            if depth == 32:
+                break
+            node = node.children[(address >> (31 - depth)) & 1]
+            depth += 1
+
+    def longest_match(self, address, default=None):
+        match = default
+        for match in self.matches(address):
+            pass
+        return match
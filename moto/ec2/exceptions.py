@@ -111,6 +111,13 @@ class InvalidPermissionNotFoundError(EC2ClientError):
             "Could not find a matching ingress rule")
 
 
+class InvalidPermissionDuplicateError(EC2ClientError):
+    def __init__(self):
+        super(InvalidPermissionDuplicateError, self).__init__(
+            "InvalidPermission.Duplicate",
+            "The specified rule already exists")
+
+
 class InvalidRouteTableIdError(EC2ClientError):
     def __init__(self, route_table_id):
         super(InvalidRouteTableIdError, self).__init__(
@@ -230,6 +237,29 @@ class InvalidVPCPeeringConnectionStateTransitionError(EC2ClientError):
             .format(vpc_peering_connection_id))
 
 
+class InvalidIPAddressInUseError(EC2ClientError):
+    def __init__(self, ip):
+        super(InvalidIPAddressInUseError, self).__init__(
+            "InvalidIPAddress.InUse",
+            "Address {0} is in use."
+            .format(ip))
+
+
+class InsufficientFreeAddressesInSubnetError(EC2ClientError):
+    def __init__(self, subnet_id):
+        super(InsufficientFreeAddressesInSubnetError, self).__init__(
+            "InsufficientFreeAddressesInSubnet",
+            "There are not enough free addresses in subnet '{0}' to satisfy the requested number of instances."
+            .format(subnet_id))
+
+
+class AddressLimitExceededError(EC2ClientError):
+    def __init__(self):
+        super(AddressLimitExceededError, self).__init__(
+            "AddressLimitExceeded",
+            "The maximum number of addresses has been reached.")
+
+
 class InvalidParameterValueError(EC2ClientError):
     def __init__(self, parameter_value):
         super(InvalidParameterValueError, self).__init__(
@@ -0,0 +1,148 @@
+from __future__ import unicode_literals
+import six
+
+from .utils import SimpleAwsFilterMatcher
+
+
+def tag_value(resource, tag_key):
+    from .models import ec2_backend
+    return ec2_backend.tags.get(resource.id, {}).get(tag_key)
+
+
+def tag_keys(resource):
+    from .models import ec2_backend
+    return list(ec2_backend.tags.get(resource.id, {}).keys())
+
+
+def tag_values(resource):
+    from .models import ec2_backend
+    return list(ec2_backend.tags.get(resource.id, {}).values())
+
+
+def find_accessor(accessors, filter_name):
+    """
+    Returns the function giving a resource's value for a filter, or None
+    when the filter is not supported. Tag filters work on every resource.
+    """
+    if filter_name in accessors:
+        return accessors[filter_name]
+    if filter_name.startswith('tag:'):
+        tag_key = filter_name.replace('tag:', '', 1)
+        return lambda resource: tag_value(resource, tag_key)
+    if filter_name == 'tag-key':
+        return tag_keys
+    if filter_name == 'tag-value':
+        return tag_values
+    return None
+
+
+def find_index(indexes, filter_name):
+    if filter_name in indexes:
+        return indexes[filter_name]
+    if filter_name.startswith('tag:'):
+        return indexes.get('tag:')
+    return None
+
+
+def id_index(filter_name, filter_values):
+    """
+    The index for id filters: the ids are the candidates, and the lookup
+    in the dict of resources drops the unknown ones.
+    """
+    return set(filter_values)
+
+
+def dict_index(index):
+    """
+    The index for a filter from a dict of filter value to resource ids
+    """
+    def lookup(filter_name, filter_values):
+        return set().union(*[index.get(value, ()) for value in filter_values])
+    return lookup
+
+
+class FilterPlan(object):
+    """
+    A compiled set of filters. Filters answered by an index narrow the
+    resources to ``candidate_ids``; the rest are checked per resource by
+    ``matches``. The filters of a request must all pass, and a filter
+    passes when any of the resource's values matches any filter value.
+    """
+
+    def __init__(self):
+        self.candidate_ids = None
+        self.predicates = []
+
+    def add_candidates(self, resource_ids):
+        if self.candidate_ids is None:
+            self.candidate_ids = set(resource_ids)
+        else:
+            self.candidate_ids = self.candidate_ids.intersection(resource_ids)
+
+    def add_predicate(self, accessor, matcher):
+        self.predicates.append((accessor, matcher))
+
+    def matches(self, resource):
+        for accessor, matcher in self.predicates:
+            value = accessor(resource)
+            if isinstance(value, (list, tuple, set, frozenset)):
+                if not any(_value_matches(matcher, item) for item in value):
+                    return False
+            elif not _value_matches(matcher, value):
+                return False
+        return True
+
+    def apply(self, resources):
+        """
+        Filters ``resources``, a dict from resource id to resource or any
+        iterable of resources. Given a dict, only the candidates are looked at.
+        """
+        if isinstance(resources, dict):
+            if self.candidate_ids is not None:
+                resources = [resources[resource_id] for resource_id in self.candidate_ids
+                             if resource_id in resources]
+            else:
+                resources = resources.values()
+        elif self.candidate_ids is not None:
+            resources = [resource for resource in resources if resource.id in self.candidate_ids]
+        return [resource for resource in resources if self.matches(resource)]
+
+
+def _value_matches(matcher, value):
+    if value is None:
+        return False
+    if not isinstance(value, six.string_types):
+        value = six.text_type(value)
+    return matcher(value)
+
+
+def compile_filters(filters, accessors, description, indexes=None):
+    """
+    Compiles the {filter name: values} of a Describe* request into a
+    FilterPlan. ``accessors`` maps the supported filter names to functions
+    of a resource, and ``indexes`` maps filter names to functions of
+    (filter name, values) returning the ids of the matching resources, or
+    None when they cannot answer, e.g. for wildcards. Unsupported filters
+    are rejected before any resource is looked at.
+    """
+    indexes = indexes or {}
+    plan = FilterPlan()
+    for filter_name, filter_values in (filters or {}).items():
+        if isinstance(filter_values, six.string_types):
+            filter_values = [filter_values]
+        accessor = find_accessor(accessors, filter_name)
+        if accessor is None:
+            raise NotImplementedError(
+                "The filter '{0}' for {1} has not been implemented in Moto yet."
+                " Feel free to open an issue at"
+                " https://github.com/spulec/moto/issues".format(filter_name, description))
+
+        index = find_index(indexes, filter_name)
+        matcher = SimpleAwsFilterMatcher(filter_values)
+        if index is not None and matcher.literals is not None:
+            resource_ids = index(filter_name, filter_values)
+            if resource_ids is not None:
+                plan.add_candidates(resource_ids)
+                continue
+        plan.add_predicate(accessor, matcher)
+    return plan
@@ -1,7 +1,6 @@
 from __future__ import unicode_literals
-import copy
-import itertools
 from collections import defaultdict
+from operator import attrgetter
 
 import six
 import boto
@@ -32,6 +31,7 @@ from .exceptions import (
     InvalidSecurityGroupDuplicateError,
     InvalidSecurityGroupNotFoundError,
     InvalidPermissionNotFoundError,
+    InvalidPermissionDuplicateError,
     InvalidRouteTableIdError,
     InvalidRouteError,
     InvalidInstanceIdError,
@@ -48,7 +48,10 @@ from .exceptions import (
     InvalidVPCPeeringConnectionIdError,
     InvalidVPCPeeringConnectionStateTransitionError,
     TagLimitExceeded,
-    InvalidID
+    InvalidID,
+    InvalidIPAddressInUseError,
+    InsufficientFreeAddressesInSubnetError,
+    AddressLimitExceededError,
 )
 from .utils import (
     EC2_RESOURCE_TO_PREFIX,
@@ -60,10 +63,9 @@ from .utils import (
     random_eni_attach_id,
     random_eni_id,
     random_instance_id,
+    random_instance_ids,
     random_internet_gateway_id,
-    random_ip,
     random_key_pair,
-    random_public_ip,
     random_reservation_id,
     random_route_table_id,
     generate_route_id,
@@ -75,10 +77,17 @@ from .utils import (
     random_volume_id,
     random_vpc_id,
     random_vpc_peering_connection_id,
-    generic_filter,
+    SimpleAwsFilterMatcher,
     is_valid_resource_id,
-    get_prefix,
-    simple_aws_filter_to_re)
+    get_prefix)
+from .address_pools import AddressPool
+from .cidr_trie import CidrTrie
+from .filters import compile_filters, dict_index, id_index
+from .security_rules import IngressRules, rule_key
+
+
+# Where the public IPs of Elastic IPs and instances come from
+PUBLIC_CIDR_BLOCK = '54.214.0.0/16'
 
 
 def validate_resource_ids(resource_ids):
@@ -95,29 +104,24 @@ class InstanceState(object):
 
 
 class TaggedEC2Resource(object):
+    # Filter names to functions giving a resource's value, see compile_filters
+    filter_accessors = {}
+
     def get_tags(self, *args, **kwargs):
-        tags = ec2_backend.describe_tags(filters={'resource-id': [self.id]})
+        tags = ec2_backend.get_resource_tags(self.id)
         return tags
 
-    def get_filter_value(self, filter_name):
-        tags = self.get_tags()
-
-        if filter_name.startswith('tag:'):
-            tagname = filter_name.replace('tag:', '', 1)
-            for tag in tags:
-                if tag['key'] == tagname:
-                    return tag['value']
-
-            return ''
-
-        if filter_name == 'tag-key':
-            return [tag['key'] for tag in tags]
-
-        if filter_name == 'tag-value':
-            return [tag['value'] for tag in tags]
-
 
 class NetworkInterface(object):
+    filter_accessors = {
+        'attachment.instance-id': lambda eni: eni.instance.id if eni.instance else None,
+        'group-id': lambda eni: [group.id for group in eni.group_set],
+        'network-interface-id': attrgetter('id'),
+        'private-ip-address': attrgetter('private_ip_address'),
+        'subnet-id': lambda eni: eni.subnet.id if eni.subnet else None,
+        'vpc-id': lambda eni: eni.subnet.vpc_id if eni.subnet else None,
+    }
+
     def __init__(self, subnet, private_ip_address, device_index=0, public_ip_auto_assign=True, group_ids=None):
         self.id = random_eni_id()
         self.device_index = device_index
@@ -125,9 +129,12 @@ class NetworkInterface(object):
         self.subnet = subnet
         self.instance = None
         self.attachment_id = None
+        self.delete_on_termination = False
 
         self.public_ip = None
         self.public_ip_auto_assign = public_ip_auto_assign
+        # The auto-assigned public IP, held from the public address pool
+        self._auto_public_ip = None
         self.start()
 
         self.attachments = []
@@ -143,7 +150,7 @@ class NetworkInterface(object):
                 if not group:
                     # Create with specific group ID.
                     group = SecurityGroup(group_id, group_id, group_id, vpc_id=subnet.vpc_id)
-                    ec2_backend.groups[subnet.vpc_id][group_id] = group
+                    ec2_backend.add_security_group(group)
                 if group:
                     self._group_set.append(group)
 
@@ -168,13 +175,21 @@ class NetworkInterface(object):
     def stop(self):
         if self.public_ip_auto_assign:
             self.public_ip = None
+            self.release_auto_public_ip()
 
     def start(self):
         self.check_auto_public_ip()
 
     def check_auto_public_ip(self):
         if self.public_ip_auto_assign:
-            self.public_ip = random_public_ip()
+            if self._auto_public_ip is None:
+                self._auto_public_ip = ec2_backend.allocate_public_ip()
+            self.public_ip = self._auto_public_ip
+
+    def release_auto_public_ip(self):
+        if self._auto_public_ip is not None:
+            ec2_backend.release_public_ip(self._auto_public_ip)
+            self._auto_public_ip = None
 
     @property
     def group_set(self):
@@ -190,6 +205,7 @@ class NetworkInterfaceBackend(object):
         super(NetworkInterfaceBackend, self).__init__()
 
     def create_network_interface(self, subnet, private_ip_address, group_ids=None, **kwargs):
+        private_ip_address = self.allocate_private_ip(subnet, private_ip_address)
         eni = NetworkInterface(subnet, private_ip_address, group_ids=group_ids)
         self.enis[eni.id] = eni
         return eni
@@ -204,28 +220,14 @@ class NetworkInterfaceBackend(object):
         deleted = self.enis.pop(eni_id, None)
         if not deleted:
             raise InvalidNetworkInterfaceIdError(eni_id)
+        self.release_private_ip(deleted.subnet, deleted.private_ip_address)
+        deleted.release_auto_public_ip()
         return deleted
 
     def describe_network_interfaces(self, filters=None):
-        enis = self.enis.values()
-
-        if filters:
-            for (_filter, _filter_value) in filters.items():
-                if _filter == 'network-interface-id':
-                    _filter = 'id'
-                    enis = [ eni for eni in enis if getattr(eni, _filter) in _filter_value ]
-                elif _filter == 'group-id':
-                    original_enis = enis
-                    enis = []
-                    for eni in original_enis:
-                        group_ids = []
-                        for group in eni.group_set:
-                            if group.id in _filter_value:
-                                enis.append(eni)
-                                break
-                else:
-                    ec2_backend.raise_not_implemented_error("The filter '{0}' for DescribeNetworkInterfaces".format(_filter))
-        return enis
+        return self.filter_resources(filters, self.enis, NetworkInterface.filter_accessors,
+                                     'DescribeNetworkInterfaces',
+                                     indexes={'network-interface-id': id_index})
 
     def attach_network_interface(self, eni_id, instance_id, device_index):
         eni = self.get_network_interface(eni_id)
@@ -251,9 +253,18 @@ class NetworkInterfaceBackend(object):
 
 
 class Instance(BotoInstance, TaggedEC2Resource):
+    filter_accessors = {
+        'image-id': attrgetter('image_id'),
+        'instance-id': attrgetter('id'),
+        'instance-state-name': attrgetter('state'),
+        'instance-type': attrgetter('instance_type'),
+        'key-name': attrgetter('key_name'),
+        'subnet-id': attrgetter('subnet_id'),
+    }
+
     def __init__(self, image_id, user_data, security_groups, **kwargs):
         super(Instance, self).__init__()
-        self.id = random_instance_id()
+        self.id = kwargs.get("instance_id") or random_instance_id()
         self.image_id = image_id
         self._state = InstanceState("running", 16)
         self.user_data = user_data
@@ -265,8 +276,8 @@ class Instance(BotoInstance, TaggedEC2Resource):
         self.block_device_mapping = BlockDeviceMapping()
         self.block_device_mapping['/dev/sda1'] = BlockDeviceType(volume_id=random_volume_id())
 
-        amis = ec2_backend.describe_images(filters={'image-id': image_id})
-        ami = amis[0] if amis else None
+        # Looked up once per launch by InstanceBackend.add_instances
+        ami = kwargs.get("ami")
 
         self.platform = ami.platform if ami else None
         self.virtualization_type = ami.virtualization_type if ami else 'paravirtual'
@@ -323,8 +334,13 @@ class Instance(BotoInstance, TaggedEC2Resource):
         self._state.code = 80
 
     def terminate(self, *args, **kwargs):
-        for nic in self.nics.values():
+        for nic in list(self.nics.values()):
             nic.stop()
+            # The ENIs RunInstances created go away with the instance,
+            # returning their addresses to the subnet
+            if nic.delete_on_termination:
+                self.detach_eni(nic)
+                ec2_backend.delete_network_interface(nic.id)
 
         self._state.name = "terminated"
         self._state.code = 48
@@ -334,7 +350,7 @@ class Instance(BotoInstance, TaggedEC2Resource):
         self._state.code = 16
 
     def get_tags(self):
-        tags = ec2_backend.describe_tags(filters={'resource-id': [self.id]})
+        tags = ec2_backend.get_resource_tags(self.id)
         return tags
 
     @property
@@ -391,6 +407,7 @@ class Instance(BotoInstance, TaggedEC2Resource):
                                                                device_index=device_index,
                                                                public_ip_auto_assign=nic.get('AssociatePublicIpAddress',False),
                                                                group_ids=group_ids)
+                use_nic.delete_on_termination = True
 
             self.attach_eni(use_nic, device_index)
 
@@ -415,31 +432,41 @@ class InstanceBackend(object):
 
     def __init__(self):
         self.reservations = {}
+        # Indexes from instance id to the instance and to its reservation
+        self.instances = {}
+        self.instance_reservations = {}
         super(InstanceBackend, self).__init__()
 
     def get_instance(self, instance_id):
-        for instance in self.all_instances():
-            if instance.id == instance_id:
-                return instance
-        raise InvalidInstanceIdError(instance_id)
+        instance = self.instances.get(instance_id)
+        if instance is None:
+            raise InvalidInstanceIdError(instance_id)
+        return instance
 
     def add_instances(self, image_id, count, user_data, security_group_names,
                       **kwargs):
         new_reservation = Reservation()
         new_reservation.id = random_reservation_id()
 
+        # Everything shared by the instances is resolved once per launch
         security_groups = [self.get_security_group_from_name(name)
                            for name in security_group_names]
         security_groups.extend(self.get_security_group_from_id(sg_id)
                                for sg_id in kwargs.pop("security_group_ids", []))
-        for index in range(count):
+        # CloudFormation can pass an intrinsic function it could not resolve
+        kwargs["ami"] = self.amis.get(image_id) if isinstance(image_id, six.string_types) else None
+
+        for instance_id in random_instance_ids(count, exclude=self.instances):
             new_instance = Instance(
                 image_id,
                 user_data,
                 security_groups,
+                instance_id=instance_id,
                 **kwargs
             )
             new_reservation.instances.append(new_instance)
+            self.instances[new_instance.id] = new_instance
+            self.instance_reservations[new_instance.id] = new_reservation
         self.reservations[new_reservation.id] = new_reservation
         return new_reservation
 
@@ -498,50 +525,59 @@ class InstanceBackend(object):
         :return: A list with instance objects
         """
         result = []
-
-        for reservation in self.all_reservations():
-            for instance in reservation.instances:
-                if instance.id in instance_ids:
-                    result.append(instance)
-
-        # TODO: Trim error message down to specific invalid id.
-        if instance_ids and len(instance_ids) > len(result):
-            raise InvalidInstanceIdError(instance_ids)
-
+        seen = set()
+        for instance_id in instance_ids:
+            if instance_id in seen:
+                continue
+            seen.add(instance_id)
+            result.append(self.get_instance(instance_id))
         return result
 
     def get_instance_by_id(self, instance_id):
-        for reservation in self.all_reservations():
-            for instance in reservation.instances:
-                if instance.id == instance_id:
-                    return instance
+        return self.instances.get(instance_id)
 
-    def get_reservations_by_instance_ids(self, instance_ids):
-        """ Go through all of the reservations and filter to only return those
-        associated with the given instance_ids.
+    def describe_reservations(self, instance_ids=None, filters=None):
+        """
+        Returns (reservation, instances) pairs, where instances are the
+        reservation's instances with the given ids that pass the filters.
+        Only the reservations of the candidate instances are looked at when
+        ids are given or an index answers a filter.
         """
-        reservations = []
-        for reservation in self.all_reservations(make_copy=True):
-            reservation_instance_ids = [instance.id for instance in reservation.instances]
-            matching_reservation = any(instance_id in reservation_instance_ids for instance_id in instance_ids)
-            if matching_reservation:
-                # We need to make a copy of the reservation because we have to modify the
-                # instances to limit to those requested
-                reservation.instances = [instance for instance in reservation.instances if instance.id in instance_ids]
-                reservations.append(reservation)
-        found_instance_ids = [instance.id for reservation in reservations for instance in reservation.instances]
-        if len(found_instance_ids) != len(instance_ids):
-            invalid_id = list(set(instance_ids).difference(set(found_instance_ids)))[0]
-            raise InvalidInstanceIdError(invalid_id)
-        return reservations
-
-    def all_reservations(self, make_copy=False):
-        if make_copy:
-            # Return copies so that other functions can modify them with changing
-            # the originals
-            return [copy.deepcopy(reservation) for reservation in self.reservations.values()]
+        plan = compile_filters(filters, Instance.filter_accessors, 'DescribeInstances',
+                               indexes=dict(self.tag_indexes(), **{'instance-id': id_index}))
+        candidate_ids = plan.candidate_ids
+        if instance_ids:
+            for instance_id in instance_ids:
+                if instance_id not in self.instances:
+                    raise InvalidInstanceIdError(instance_id)
+            candidate_ids = set(instance_ids) if candidate_ids is None else candidate_ids & set(instance_ids)
+
+        if candidate_ids is None:
+            reservations = [(reservation, reservation.instances) for reservation in self.reservations.values()]
         else:
-            return [reservation for reservation in self.reservations.values()]
+            matching = set()
+            for instance_id in candidate_ids:
+                reservation = self.instance_reservations.get(instance_id)
+                if reservation is not None:
+                    matching.add(reservation.id)
+            # In the order of self.reservations, as when nothing narrows them down
+            reservations = [(reservation, [instance for instance in reservation.instances
+                                           if instance.id in candidate_ids])
+                            for reservation in self.reservations.values()
+                            if reservation.id in matching]
+
+        result = []
+        for reservation, instances in reservations:
+            instances = [instance for instance in instances if plan.matches(instance)]
+            if instances:
+                result.append((reservation, instances))
+        return result
+
+    def get_reservations_by_instance_ids(self, instance_ids):
+        return self.describe_reservations(instance_ids=instance_ids)
+
+    def all_reservations(self):
+        return [reservation for reservation in self.reservations.values()]
 
 
 class KeyPairBackend(object):
@@ -604,8 +640,33 @@ class TagBackend(object):
 
     def __init__(self):
         self.tags = defaultdict(dict)
+        # Inverted indexes to the ids of the resources with a tag key, a
+        # (key, value) pair and a value
+        self.tag_key_index = defaultdict(set)
+        self.tag_pair_index = defaultdict(set)
+        self.tag_value_index = defaultdict(set)
         super(TagBackend, self).__init__()
 
+    def _set_tag(self, resource_id, key, value):
+        tags = self.tags[resource_id]
+        if key in tags:
+            self._remove_tag(resource_id, key)
+            tags = self.tags[resource_id]
+        tags[key] = value
+        self.tag_key_index[key].add(resource_id)
+        self.tag_pair_index[(key, value)].add(resource_id)
+        self.tag_value_index[value].add(resource_id)
+
+    def _remove_tag(self, resource_id, key):
+        tags = self.tags[resource_id]
+        value = tags.pop(key)
+        _discard_from_index(self.tag_key_index, key, resource_id)
+        _discard_from_index(self.tag_pair_index, (key, value), resource_id)
+        if value not in tags.values():
+            _discard_from_index(self.tag_value_index, value, resource_id)
+        if not tags:
+            del self.tags[resource_id]
+
     def create_tags(self, resource_ids, tags):
         if None in set([tags[tag] for tag in tags]):
             raise InvalidParameterValueErrorTagNull()
@@ -617,91 +678,118 @@ class TagBackend(object):
                 raise TagLimitExceeded()
         for resource_id in resource_ids:
             for tag in tags:
-                self.tags[resource_id][tag] = tags[tag]
+                self._set_tag(resource_id, tag, tags[tag])
         return True
 
     def delete_tags(self, resource_ids, tags):
         for resource_id in resource_ids:
             for tag in tags:
-                if tag in self.tags[resource_id]:
-                    if tags[tag] is None:
-                        self.tags[resource_id].pop(tag)
-                    elif tags[tag] == self.tags[resource_id][tag]:
-                        self.tags[resource_id].pop(tag)
+                resource_tags = self.tags.get(resource_id, {})
+                if tag in resource_tags:
+                    if tags[tag] is None or tags[tag] == resource_tags[tag]:
+                        self._remove_tag(resource_id, tag)
         return True
 
+    def get_resource_tags(self, resource_id):
+        tags = self.tags.get(resource_id)
+        if not tags:
+            return []
+        resource_type = EC2_PREFIX_TO_RESOURCE[get_prefix(resource_id)]
+        return [{
+            'resource_id': resource_id,
+            'key': key,
+            'value': value,
+            'resource_type': resource_type,
+        } for key, value in tags.items()]
+
+    def resource_ids_by_tag_filters(self, filters):
+        """
+        Returns the ids of the resources which pass every one of the 'tag:',
+        'tag-key' and 'tag-value' filters, by intersecting index entries.
+        """
+        result = None
+        for filter_name, filter_values in filters.items():
+            if isinstance(filter_values, six.string_types):
+                filter_values = [filter_values]
+            if filter_name.startswith('tag:'):
+                key = filter_name.replace('tag:', '', 1)
+                entries = [self.tag_pair_index.get((key, value), ()) for value in filter_values]
+            elif filter_name == 'tag-key':
+                entries = [self.tag_key_index.get(key, ()) for key in filter_values]
+            elif filter_name == 'tag-value':
+                entries = [self.tag_value_index.get(value, ()) for value in filter_values]
+            else:
+                continue
+            matching = set().union(*entries)
+            result = matching if result is None else result & matching
+        return result
+
+    def tag_indexes(self):
+        """
+        The indexes answering tag filters, for compile_filters
+        """
+        def lookup(filter_name, filter_values):
+            return self.resource_ids_by_tag_filters({filter_name: filter_values})
+        return {'tag:': lookup, 'tag-key': lookup, 'tag-value': lookup}
+
+    def filter_resources(self, filters, resources, accessors, description, indexes=None):
+        """
+        Applies the filters of a Describe* request to ``resources``, a dict
+        from id to resource or a list, using the tag indexes and ``indexes``.
+        """
+        all_indexes = self.tag_indexes()
+        all_indexes.update(indexes or {})
+        plan = compile_filters(filters, accessors, description, all_indexes)
+        return plan.apply(resources)
+
     def describe_tags(self, filters=None):
-        import re
+        filters = dict((tag_filter, values) for tag_filter, values in (filters or {}).items()
+                       if tag_filter in self.VALID_TAG_FILTERS)
+        key_matches = SimpleAwsFilterMatcher(filters.get('key'))
+        resource_id_matches = SimpleAwsFilterMatcher(filters.get('resource-id'))
+        value_matches = SimpleAwsFilterMatcher(filters.get('value'))
+        resource_types = set(resource_type for resource_type in filters.get('resource-type', [])
+                             if resource_type in self.VALID_TAG_RESOURCE_FILTER_TYPES)
+
+        # Only look at the resources which can match, when the ids or keys
+        # are given without wildcards
+        if resource_id_matches.literals is not None:
+            resource_ids = [resource_id for resource_id in resource_id_matches.literals
+                            if resource_id in self.tags]
+        elif key_matches.literals is not None:
+            resource_ids = set().union(*[self.tag_key_index.get(key, ()) for key in key_matches.literals])
+        else:
+            resource_ids = list(self.tags.keys())
+
         results = []
-        key_filters = []
-        resource_id_filters = []
-        resource_type_filters = []
-        value_filters = []
-        if not filters is None:
-            for tag_filter in filters:
-                if tag_filter in self.VALID_TAG_FILTERS:
-                    if tag_filter == 'key':
-                        for value in filters[tag_filter]:
-                            key_filters.append(re.compile(simple_aws_filter_to_re(value)))
-                    if tag_filter == 'resource-id':
-                        for value in filters[tag_filter]:
-                            resource_id_filters.append(re.compile(simple_aws_filter_to_re(value)))
-                    if tag_filter == 'resource-type':
-                        for value in filters[tag_filter]:
-                            if value in self.VALID_TAG_RESOURCE_FILTER_TYPES:
-                                resource_type_filters.append(value)
-                    if tag_filter == 'value':
-                        for value in filters[tag_filter]:
-                            value_filters.append(re.compile(simple_aws_filter_to_re(value)))
-        for resource_id, tags in self.tags.items():
-            for key, value in tags.items():
-                add_result = False
-                if filters is None:
-                    add_result = True
-                else:
-                    key_pass = False
-                    id_pass = False
-                    type_pass = False
-                    value_pass = False
-                    if key_filters:
-                        for pattern in key_filters:
-                            if pattern.match(key) is not None:
-                                key_pass = True
-                    else:
-                        key_pass = True
-                    if resource_id_filters:
-                        for pattern in resource_id_filters:
-                            if pattern.match(resource_id) is not None:
-                                id_pass = True
-                    else:
-                        id_pass = True
-                    if resource_type_filters:
-                        for resource_type in resource_type_filters:
-                            if EC2_PREFIX_TO_RESOURCE[get_prefix(resource_id)] == resource_type:
-                                type_pass = True
-                    else:
-                        type_pass = True
-                    if value_filters:
-                        for pattern in value_filters:
-                            if pattern.match(value) is not None:
-                                value_pass = True
-                    else:
-                        value_pass = True
-                    if key_pass and id_pass and type_pass and value_pass:
-                        add_result = True
-                        # If we're not filtering, or we are filtering and this
-                if add_result:
-                    result = {
-                        'resource_id': resource_id,
-                        'key': key,
-                        'value': value,
-                        'resource_type': EC2_PREFIX_TO_RESOURCE[get_prefix(resource_id)],
-                        }
-                    results.append(result)
+        for resource_id in resource_ids:
+            if not resource_id_matches(resource_id):
+                continue
+            for tag in self.get_resource_tags(resource_id):
+                if resource_types and tag['resource_type'] not in resource_types:
+                    continue
+                if key_matches(tag['key']) and value_matches(tag['value']):
+                    results.append(tag)
         return results
 
 
+def _discard_from_index(index, index_key, resource_id):
+    resource_ids = index[index_key]
+    resource_ids.discard(resource_id)
+    if not resource_ids:
+        del index[index_key]
+
+
 class Ami(TaggedEC2Resource):
+    filter_accessors = {
+        'architecture': attrgetter('architecture'),
+        'image-id': attrgetter('id'),
+        'kernel-id': attrgetter('kernel_id'),
+        'platform': attrgetter('platform'),
+        'state': attrgetter('state'),
+        'virtualization-type': attrgetter('virtualization_type'),
+    }
+
     def __init__(self, ami_id, instance=None, source_ami=None, name=None, description=None):
         self.id = ami_id
         self.state = "available"
@@ -735,26 +823,6 @@ class Ami(TaggedEC2Resource):
         volume = ec2_backend.create_volume(15, "us-east-1a")
         self.ebs_snapshot = ec2_backend.create_snapshot(volume.id, "Auto-created snapshot for AMI %s" % self.id)
 
-    def get_filter_value(self, filter_name):
-        if filter_name == 'virtualization-type':
-            return self.virtualization_type
-        elif filter_name == 'kernel-id':
-            return self.kernel_id
-        elif filter_name in ['architecture', 'platform']:
-            return getattr(self,filter_name)
-        elif filter_name == 'image-id':
-            return self.id
-        elif filter_name == 'state':
-            return self.state
-
-        filter_value = super(Ami, self).get_filter_value(filter_name)
-
-        if filter_value is None:
-            ec2_backend.raise_not_implemented_error("The filter '{0}' for DescribeImages".format(filter_name))
-
-        return filter_value
-
-
 class AmiBackend(object):
     def __init__(self):
         self.amis = {}
@@ -779,7 +847,8 @@ class AmiBackend(object):
         if filters:
             images = self.amis.values()
 
-            return generic_filter(filters, images)
+            return self.filter_resources(filters, self.amis, Ami.filter_accessors, 'DescribeImages',
+                                         indexes={'image-id': id_index})
         else:
             images = []
             for ami_id in ami_ids:
@@ -876,25 +945,35 @@ class SecurityRule(object):
         self.source_groups = source_groups
 
     @property
-    def unique_representation(self):
-        return "{0}-{1}-{2}-{3}-{4}".format(
-            self.ip_protocol,
-            self.from_port,
-            self.to_port,
-            self.ip_ranges,
-            self.source_groups
-        )
-
-    def __eq__(self, other):
-        return self.unique_representation == other.unique_representation
+    def key(self):
+        return rule_key(self)
 
 
 class SecurityGroup(object):
+    filter_accessors = {
+        'description': attrgetter('description'),
+        'group-id': attrgetter('id'),
+        'group-name': attrgetter('name'),
+        'ip-permission.cidr': lambda group: [ip_range for rule in group.ingress_rules
+                                             for ip_range in rule.ip_ranges],
+        'ip-permission.from-port': lambda group: [rule.from_port for rule in group.ingress_rules],
+        'ip-permission.group-id': lambda group: [source_group.id for rule in group.ingress_rules
+                                                 for source_group in rule.source_groups],
+        'ip-permission.group-name': lambda group: [source_group.name for rule in group.ingress_rules
+                                                   for source_group in rule.source_groups],
+        'ip-permission.protocol': lambda group: [rule.ip_protocol for rule in group.ingress_rules],
+        'ip-permission.to-port': lambda group: [rule.to_port for rule in group.ingress_rules],
+        'vpc-id': attrgetter('vpc_id'),
+        'vpc_id': attrgetter('vpc_id'),
+    }
+
     def __init__(self, group_id, name, description, vpc_id=None):
         self.id = group_id
         self.name = name
         self.description = description
         self.ingress_rules = []
+        # The ingress rules compiled for duplicate checks and reachability
+        self.ingress = IngressRules()
         self.egress_rules = []
         self.enis = {}
         self.vpc_id = vpc_id
@@ -931,50 +1010,21 @@ class SecurityGroup(object):
         return self.id
 
 
-    def matches_filter(self, key, filter_value):
-        result = True
-
-        def to_attr(filter_name):
-            attr = None
-
-            if filter_name == 'group-name':
-                attr = 'name'
-            elif filter_name == 'group-id':
-                attr = 'id'
-            elif filter_name == 'vpc-id':
-                attr = 'vpc_id'
-            else:
-                attr = filter_name.replace('-', '_')
-
-            return attr
-
-        if key.startswith('ip-permission'):
-            match = re.search(r"ip-permission.(*)", key)
-            ingress_attr = to_attr(match.groups()[0])
-
-            for ingress in self.ingress_rules:
-                if getattr(ingress, ingress_attr) in filters[key]:
-                    return True
-        else:
-            attr_name = to_attr(key)
-            return getattr(self, attr_name) in filter_value
-
-        return False
-
-    def matches_filters(self, filters):
-        for key, value in filters.items():
-            if not self.matches_filter(key, value):
-                return False
-        return True
-
-
 class SecurityGroupBackend(object):
 
     def __init__(self):
         # the key in the dict group is the vpc_id or None (non-vpc)
         self.groups = defaultdict(dict)
+        self.groups_by_id = {}
+        # (vpc_id, name) to group; names are unique within a VPC
+        self.groups_by_name = {}
         super(SecurityGroupBackend, self).__init__()
 
+    def add_security_group(self, group):
+        self.groups[group.vpc_id][group.id] = group
+        self.groups_by_id[group.id] = group
+        self.groups_by_name.setdefault((group.vpc_id, group.name), group)
+
     def create_security_group(self, name, description, vpc_id=None, force=False):
         if not description:
             raise MissingParameterError('GroupDescription')
@@ -986,55 +1036,57 @@ class SecurityGroupBackend(object):
                 raise InvalidSecurityGroupDuplicateError(name)
         group = SecurityGroup(group_id, name, description, vpc_id=vpc_id)
 
-        self.groups[vpc_id][group_id] = group
+        self.add_security_group(group)
         return group
 
     def describe_security_groups(self, group_ids=None, groupnames=None, filters=None):
-        all_groups = itertools.chain(*[x.values() for x in self.groups.values()])
-        groups = []
-
-        if group_ids or groupnames or filters:
-            for group in all_groups:
-                if ((group_ids and group.id in group_ids) or
-                        (groupnames and group.name in groupnames) or
-                        (filters and group.matches_filters(filters))):
-                    groups.append(group)
-        else:
-            groups = all_groups
-
-        return groups
+        if not (group_ids or groupnames or filters):
+            return list(self.groups_by_id.values())
 
-    def _delete_security_group(self, vpc_id, group_id):
-        if self.groups[vpc_id][group_id].enis:
-            raise DependencyViolationError("{0} is being utilized by {1}".format(group_id, 'ENIs'))
-        return self.groups[vpc_id].pop(group_id)
+        matching_ids = set(group_id for group_id in group_ids or () if group_id in self.groups_by_id)
+        if groupnames:
+            matching_ids.update(group.id for group in self.groups_by_id.values()
+                                if group.name in groupnames)
+        if filters:
+            def groups_in_vpcs(filter_name, vpc_ids):
+                return set(group_id for vpc_id in vpc_ids for group_id in self.groups.get(vpc_id, ()))
+            filtered = self.filter_resources(filters, self.groups_by_id, SecurityGroup.filter_accessors,
+                                             'DescribeSecurityGroups',
+                                             indexes={'vpc-id': groups_in_vpcs, 'vpc_id': groups_in_vpcs,
+                                                      'group-id': id_index})
+            matching_ids.update(group.id for group in filtered)
+
+        return [group for group in self.groups_by_id.values() if group.id in matching_ids]
+
+    def _delete_security_group(self, group):
+        if group.enis:
+            raise DependencyViolationError("{0} is being utilized by {1}".format(group.id, 'ENIs'))
+        del self.groups[group.vpc_id][group.id]
+        del self.groups_by_id[group.id]
+        if self.groups_by_name.get((group.vpc_id, group.name)) is group:
+            del self.groups_by_name[(group.vpc_id, group.name)]
+        return group
 
     def delete_security_group(self, name=None, group_id=None):
         if group_id:
-            # loop over all the SGs, find the right one
-            for vpc_id, groups in self.groups.items():
-                if group_id in groups:
-                    return self._delete_security_group(vpc_id, group_id)
+            group = self.groups_by_id.get(group_id)
+            if group:
+                return self._delete_security_group(group)
             raise InvalidSecurityGroupNotFoundError(group_id)
         elif name:
             # Group Name.  Has to be in standard EC2, VPC needs to be identified by group_id
             group = self.get_security_group_from_name(name)
             if group:
-                return self._delete_security_group(None, group.id)
+                return self._delete_security_group(group)
             raise InvalidSecurityGroupNotFoundError(name)
 
     def get_security_group_from_id(self, group_id):
-        # 2 levels of chaining necessary since it's a complex structure
-        all_groups = itertools.chain.from_iterable([x.values() for x in self.groups.values()])
-
-        for group in all_groups:
-            if group.id == group_id:
-                return group
+        return self.groups_by_id.get(group_id)
 
     def get_security_group_from_name(self, name, vpc_id=None):
-        for group_id, group in self.groups[vpc_id].items():
-            if group.name == name:
-                return group
+        group = self.groups_by_name.get((vpc_id, name))
+        if group:
+            return group
 
         if name == 'default':
             # If the request is for the default group and it does not exist, create it
@@ -1077,6 +1129,9 @@ class SecurityGroupBackend(object):
                 source_groups.append(source_group)
 
         security_rule = SecurityRule(ip_protocol, from_port, to_port, ip_ranges, source_groups)
+        if group.ingress.duplicates(security_rule):
+            raise InvalidPermissionDuplicateError()
+        group.ingress.add(security_rule)
         group.ingress_rules.append(security_rule)
 
     def revoke_security_group_ingress(self,
@@ -1107,11 +1162,40 @@ class SecurityGroupBackend(object):
                 source_groups.append(source_group)
 
         security_rule = SecurityRule(ip_protocol, from_port, to_port, ip_ranges, source_groups)
-        if security_rule in group.ingress_rules:
-            group.ingress_rules.remove(security_rule)
-            return security_rule
+        revoked = group.ingress.remove(security_rule)
+        if revoked is None:
+            raise InvalidPermissionNotFoundError()
+        group.ingress_rules.remove(revoked)
+        return revoked
 
-        raise InvalidPermissionNotFoundError()
+    def _network_endpoint(self, resource_id):
+        """
+        The addresses and security group ids of an ENI or instance
+        """
+        if resource_id.startswith(EC2_RESOURCE_TO_PREFIX['network-interface'] + '-'):
+            enis = [self.get_network_interface(resource_id)]
+            groups = enis[0].group_set
+        else:
+            instance = self.get_instance(resource_id)
+            enis = instance.nics.values()
+            groups = instance.dynamic_group_list
+        addresses = [address for eni in enis
+                     for address in (eni.private_ip_address, eni.public_ip) if address]
+        return addresses, [group for group in groups if group]
+
+    def can_reach(self, source_id, destination_id, port, ip_protocol='tcp'):
+        """
+        Whether the ingress rules of the security groups of ``destination_id``
+        let ``ip_protocol`` traffic to ``port`` in from ``source_id``. Both are
+        ENI or instance ids. A CIDR grant matches any private or public
+        address of the source, a group grant any of its groups. Egress rules
+        and network ACLs are not modelled.
+        """
+        addresses, source_groups = self._network_endpoint(source_id)
+        _, destination_groups = self._network_endpoint(destination_id)
+        source_group_ids = set(group.id for group in source_groups)
+        return any(group.ingress.allows(ip_protocol, port, addresses, source_group_ids)
+                   for group in destination_groups)
 
 
 class VolumeAttachment(object):
@@ -1268,10 +1352,18 @@ class EBSBackend(object):
 
 
 class VPC(TaggedEC2Resource):
+    filter_accessors = {
+        'cidr': attrgetter('cidr_block'),
+        'dhcp-options-id': lambda vpc: vpc.dhcp_options.id if vpc.dhcp_options else None,
+        'vpc-id': attrgetter('id'),
+    }
+
     def __init__(self, vpc_id, cidr_block):
         self.id = vpc_id
         self.cidr_block = cidr_block
         self.dhcp_options = None
+        # Every private IP in use in the VPC, whichever subnet holds it
+        self.address_pool = AddressPool(cidr_block)
 
     @classmethod
     def create_from_cloudformation_json(cls, resource_name, cloudformation_json):
@@ -1286,23 +1378,6 @@ class VPC(TaggedEC2Resource):
     def physical_resource_id(self):
         return self.id
 
-    def get_filter_value(self, filter_name):
-        if filter_name == 'cidr':
-            return self.cidr_block
-        elif filter_name == 'dhcp-options-id':
-            if not self.dhcp_options:
-                return None
-
-            return self.dhcp_options.id
-
-        filter_value = super(VPC, self).get_filter_value(filter_name)
-
-        if filter_value is None:
-            ec2_backend.raise_not_implemented_error("The filter '{0}' for DescribeVPCs".format(filter_name))
-
-        return filter_value
-
-
 class VPCBackend(object):
     def __init__(self):
         self.vpcs = {}
@@ -1310,7 +1385,10 @@ class VPCBackend(object):
 
     def create_vpc(self, cidr_block):
         vpc_id = random_vpc_id()
-        vpc = VPC(vpc_id, cidr_block)
+        try:
+            vpc = VPC(vpc_id, cidr_block)
+        except ValueError:
+            raise InvalidParameterValueError(cidr_block)
         self.vpcs[vpc_id] = vpc
 
         # AWS creates a default main route table and security group.
@@ -1329,11 +1407,12 @@ class VPCBackend(object):
 
     def get_all_vpcs(self, vpc_ids=None, filters=None):
         if vpc_ids:
-            vpcs = [vpc for vpc in self.vpcs.values() if vpc.id in vpc_ids]
+            vpcs = dict((vpc_id, self.vpcs[vpc_id]) for vpc_id in vpc_ids if vpc_id in self.vpcs)
         else:
-            vpcs = self.vpcs.values()
+            vpcs = self.vpcs
 
-        return generic_filter(filters, vpcs)
+        return self.filter_resources(filters, vpcs, VPC.filter_accessors, 'DescribeVPCs',
+                                     indexes={'vpc-id': id_index})
 
     def delete_vpc(self, vpc_id):
         # Delete route table if only main route table remains.
@@ -1450,10 +1529,20 @@ class VPCPeeringConnectionBackend(object):
 
 
 class Subnet(TaggedEC2Resource):
+    filter_accessors = {
+        'cidr': attrgetter('cidr_block'),
+        'cidrBlock': attrgetter('cidr_block'),
+        'cidr-block': attrgetter('cidr_block'),
+        'subnet-id': attrgetter('id'),
+        'vpc-id': attrgetter('vpc_id'),
+    }
+
     def __init__(self, subnet_id, vpc_id, cidr_block):
         self.id = subnet_id
         self.vpc_id = vpc_id
         self.cidr_block = cidr_block
+        # AWS keeps the first four addresses and the last one of a subnet
+        self.address_pool = AddressPool(cidr_block, reserved_head=4, reserved_tail=1)
 
     @classmethod
     def create_from_cloudformation_json(cls, resource_name, cloudformation_json):
@@ -1470,25 +1559,10 @@ class Subnet(TaggedEC2Resource):
     def physical_resource_id(self):
         return self.id
 
-    def get_filter_value(self, filter_name):
-        if filter_name in ['cidr', 'cidrBlock', 'cidr-block']:
-            return self.cidr_block
-        elif filter_name == 'vpc-id':
-            return self.vpc_id
-        elif filter_name == 'subnet-id':
-            return self.id
-
-        filter_value = super(Subnet, self).get_filter_value(filter_name)
-
-        if filter_value is None:
-            ec2_backend.raise_not_implemented_error("The filter '{0}' for DescribeSubnets".format(filter_name))
-
-        return filter_value
-
-
 class SubnetBackend(object):
     def __init__(self):
         self.subnets = {}
+        self.vpc_subnet_ids = defaultdict(set)
         super(SubnetBackend, self).__init__()
 
     def get_subnet(self, subnet_id):
@@ -1499,22 +1573,65 @@ class SubnetBackend(object):
 
     def create_subnet(self, vpc_id, cidr_block):
         subnet_id = random_subnet_id()
-        subnet = Subnet(subnet_id, vpc_id, cidr_block)
         vpc = self.get_vpc(vpc_id) # Validate VPC exists
+        try:
+            subnet = Subnet(subnet_id, vpc_id, cidr_block)
+        except ValueError:
+            raise InvalidParameterValueError(cidr_block)
         self.subnets[subnet_id] = subnet
+        self.vpc_subnet_ids[vpc_id].add(subnet_id)
         return subnet
 
     def get_all_subnets(self, filters=None):
-        subnets = self.subnets.values()
-
-        return generic_filter(filters, subnets)
+        return self.filter_resources(filters, self.subnets, Subnet.filter_accessors, 'DescribeSubnets',
+                                     indexes={'subnet-id': id_index,
+                                              'vpc-id': dict_index(self.vpc_subnet_ids)})
 
     def delete_subnet(self, subnet_id):
         deleted = self.subnets.pop(subnet_id, None)
         if not deleted:
             raise InvalidSubnetIdError(subnet_id)
+        self.vpc_subnet_ids[deleted.vpc_id].discard(subnet_id)
         return deleted
 
+    def allocate_private_ip(self, subnet, address=None):
+        """
+        Takes ``address``, or the next free address of the subnet, out of
+        the address pools of the subnet and its VPC. Addresses outside the
+        subnet are taken as given.
+        """
+        vpc = self.vpcs.get(subnet.vpc_id)
+        if address:
+            if not subnet.address_pool.reserve(address):
+                raise InvalidIPAddressInUseError(address)
+            if vpc and not vpc.address_pool.reserve(address):
+                subnet.address_pool.release(address)
+                raise InvalidIPAddressInUseError(address)
+            return address
+
+        # Addresses in use through an overlapping subnet of the VPC are
+        # skipped, and handed back to this subnet's pool once one is found.
+        in_use = []
+        try:
+            while True:
+                address = subnet.address_pool.allocate()
+                if address is None:
+                    raise InsufficientFreeAddressesInSubnetError(subnet.id)
+                if not vpc or vpc.address_pool.reserve(address):
+                    return address
+                in_use.append(address)
+        finally:
+            for skipped in in_use:
+                subnet.address_pool.release(skipped)
+
+    def release_private_ip(self, subnet, address):
+        if not address:
+            return
+        subnet.address_pool.release(address)
+        vpc = self.vpcs.get(subnet.vpc_id)
+        if vpc:
+            vpc.address_pool.release(address)
+
 
 class SubnetRouteTableAssociation(object):
     def __init__(self, route_table_id, subnet_id):
@@ -1538,15 +1655,26 @@ class SubnetRouteTableAssociation(object):
 class SubnetRouteTableAssociationBackend(object):
     def __init__(self):
         self.subnet_associations = {}
+        # subnet_id to the id of its explicitly associated route table
+        self.subnet_route_table_ids = {}
         super(SubnetRouteTableAssociationBackend, self).__init__()
 
     def create_subnet_association(self, route_table_id, subnet_id):
         subnet_association = SubnetRouteTableAssociation(route_table_id, subnet_id)
         self.subnet_associations["{0}:{1}".format(route_table_id, subnet_id)] = subnet_association
+        self.subnet_route_table_ids[subnet_id] = route_table_id
         return subnet_association
 
 
 class RouteTable(TaggedEC2Resource):
+    filter_accessors = {
+        # Note: Boto only supports 'true'.
+        # https://github.com/boto/boto/issues/1742
+        'association.main': lambda route_table: 'true' if route_table.main else 'false',
+        'route-table-id': attrgetter('id'),
+        'vpc-id': attrgetter('vpc_id'),
+    }
+
     def __init__(self, route_table_id, vpc_id, main=False):
         self.id = route_table_id
         self.vpc_id = vpc_id
@@ -1554,6 +1682,8 @@ class RouteTable(TaggedEC2Resource):
         self.association_id = None
         self.subnet_id = None
         self.routes = {}
+        # The routes by destination, for longest prefix matches
+        self.route_trie = CidrTrie()
 
     @classmethod
     def create_from_cloudformation_json(cls, resource_name, cloudformation_json):
@@ -1569,28 +1699,35 @@ class RouteTable(TaggedEC2Resource):
     def physical_resource_id(self):
         return self.id
 
-    def get_filter_value(self, filter_name):
-        if filter_name == "association.main":
-            # Note: Boto only supports 'true'.
-            # https://github.com/boto/boto/issues/1742
-            if self.main:
-                return 'true'
-            else:
-                return 'false'
-        elif filter_name == "vpc-id":
-            return self.vpc_id
-
-        filter_value = super(RouteTable, self).get_filter_value(filter_name)
-
-        if filter_value is None:
-            ec2_backend.raise_not_implemented_error("The filter '{0}' for DescribeRouteTables".format(filter_name))
+    def add_route(self, route):
+        self.routes[route.id] = route
+        try:
+            self.route_trie[route.destination_cidr_block] = route
+        except ValueError:
+            # Not a CIDR block, e.g. an unresolved CloudFormation reference
+            pass
+
+    def remove_route(self, route_id):
+        route = self.routes.pop(route_id, None)
+        if route is not None:
+            try:
+                self.route_trie.pop(route.destination_cidr_block)
+            except ValueError:
+                pass
+        return route
 
-        return filter_value
+    def lookup(self, destination):
+        """
+        The route with the longest prefix holding the ``destination``
+        address, or None when no route applies
+        """
+        return self.route_trie.longest_match(destination)
 
 
 class RouteTableBackend(object):
     def __init__(self):
         self.route_tables = {}
+        self.vpc_route_table_ids = defaultdict(set)
         super(RouteTableBackend, self).__init__()
 
     def create_route_table(self, vpc_id, main=False):
@@ -1598,6 +1735,7 @@ class RouteTableBackend(object):
         vpc = self.get_vpc(vpc_id) # Validate VPC exists
         route_table = RouteTable(route_table_id, vpc_id, main=main)
         self.route_tables[route_table_id] = route_table
+        self.vpc_route_table_ids[vpc_id].add(route_table_id)
 
         # AWS creates a default local route.
         self.create_route(route_table_id, vpc.cidr_block, local=True)
@@ -1611,22 +1749,58 @@ class RouteTableBackend(object):
         return route_table
 
     def get_all_route_tables(self, route_table_ids=None, filters=None):
-        route_tables = self.route_tables.values()
+        route_tables = self.route_tables
 
         if route_table_ids:
-            route_tables = [ route_table for route_table in route_tables if route_table.id in route_table_ids ]
-            if len(route_tables) != len(route_table_ids):
-                invalid_id = list(set(route_table_ids).difference(set([route_table.id for route_table in route_tables])))[0]
-                raise InvalidRouteTableIdError(invalid_id)
+            for route_table_id in route_table_ids:
+                if route_table_id not in self.route_tables:
+                    raise InvalidRouteTableIdError(route_table_id)
+            route_tables = dict((route_table_id, self.route_tables[route_table_id])
+                                for route_table_id in route_table_ids)
 
-        return generic_filter(filters, route_tables)
+        return self.filter_resources(filters, route_tables, RouteTable.filter_accessors, 'DescribeRouteTables',
+                                     indexes={'route-table-id': id_index,
+                                              'vpc-id': dict_index(self.vpc_route_table_ids)})
 
     def delete_route_table(self, route_table_id):
         deleted = self.route_tables.pop(route_table_id, None)
         if not deleted:
             raise InvalidRouteTableIdError(route_table_id)
+        self.vpc_route_table_ids[deleted.vpc_id].discard(route_table_id)
         return deleted
 
+    def get_effective_route_table(self, subnet_id):
+        """
+        The route table a subnet routes through: the table explicitly
+        associated with it, or else the main table of its VPC
+        """
+        subnet = self.get_subnet(subnet_id)
+        route_table = self.route_tables.get(self.subnet_route_table_ids.get(subnet_id))
+        if route_table is not None:
+            return route_table
+        for route_table_id in self.vpc_route_table_ids[subnet.vpc_id]:
+            route_table = self.route_tables[route_table_id]
+            if route_table.main:
+                return route_table
+        return None
+
+    def get_effective_routes(self, subnet_id):
+        route_table = self.get_effective_route_table(subnet_id)
+        return list(route_table.routes.values()) if route_table else []
+
+    def resolve_route(self, subnet_id, destination):
+        """
+        The route traffic from the subnet to the ``destination`` address
+        takes, or None when it has no route
+        """
+        route_table = self.get_effective_route_table(subnet_id)
+        if route_table is None:
+            return None
+        try:
+            return route_table.lookup(destination)
+        except ValueError:
+            raise InvalidParameterValueError(destination)
+
 
 class Route(object):
     def __init__(self, route_table, destination_cidr_block, local=False,
@@ -1678,7 +1852,7 @@ class RouteBackend(object):
                       instance=self.get_instance(instance_id) if instance_id else None,
                       interface=None,
                       vpc_pcx=self.get_vpc_peering_connection(vpc_peering_connection_id) if vpc_peering_connection_id else None)
-        route_table.routes[route.id] = route
+        route_table.add_route(route)
         return route
 
     def replace_route(self, route_table_id, destination_cidr_block,
@@ -1695,19 +1869,17 @@ class RouteBackend(object):
         route.instance = self.get_instance(instance_id) if instance_id else None
         route.interface = None
         route.vpc_pcx = self.get_vpc_peering_connection(vpc_peering_connection_id) if vpc_peering_connection_id else None
-
-        route_table.routes[route.id] = route
         return route
 
     def get_route(self, route_id):
         route_table_id, destination_cidr_block = split_route_id(route_id)
         route_table = self.get_route_table(route_table_id)
-        return route_table.get(route_id)
+        return route_table.routes.get(route_id)
 
     def delete_route(self, route_table_id, destination_cidr_block):
         route_table = self.get_route_table(route_table_id)
         route_id = generate_route_id(route_table_id, destination_cidr_block)
-        deleted = route_table.routes.pop(route_id, None)
+        deleted = route_table.remove_route(route_id)
         if not deleted:
             raise InvalidRouteError(route_table_id, destination_cidr_block)
         return deleted
@@ -1807,6 +1979,11 @@ class VPCGatewayAttachmentBackend(object):
 
 
 class SpotInstanceRequest(BotoSpotRequest, TaggedEC2Resource):
+    filter_accessors = {
+        'spot-instance-request-id': attrgetter('id'),
+        'state': attrgetter('state'),
+    }
+
     def __init__(self, spot_request_id, price, image_id, type, valid_from,
                  valid_until, launch_group, availability_zone_group, key_name,
                  security_groups, user_data, instance_type, placement, kernel_id,
@@ -1842,19 +2019,6 @@ class SpotInstanceRequest(BotoSpotRequest, TaggedEC2Resource):
             default_group = ec2_backend.get_security_group_from_name("default")
             ls.groups.append(default_group)
 
-    def get_filter_value(self, filter_name):
-        if filter_name == 'state':
-            return self.state
-        if filter_name == 'spot-instance-request-id':
-            return self.id
-        filter_value = super(SpotInstanceRequest, self).get_filter_value(filter_name)
-
-        if filter_value is None:
-            ec2_backend.raise_not_implemented_error("The filter '{0}' for DescribeSpotInstanceRequests".format(filter_name))
-
-        return filter_value
-
-
 @six.add_metaclass(Model)
 class SpotRequestBackend(object):
     def __init__(self):
@@ -1881,9 +2045,9 @@ class SpotRequestBackend(object):
 
     @Model.prop('SpotInstanceRequest')
     def describe_spot_instance_requests(self, filters=None):
-        requests = self.spot_instance_requests.values()
-
-        return generic_filter(filters, requests)
+        return self.filter_resources(filters, self.spot_instance_requests,
+                                     SpotInstanceRequest.filter_accessors, 'DescribeSpotInstanceRequests',
+                                     indexes={'spot-instance-request-id': id_index})
 
     def cancel_spot_instance_requests(self, request_ids):
         requests = []
@@ -1893,8 +2057,8 @@ class SpotRequestBackend(object):
 
 
 class ElasticAddress(object):
-    def __init__(self, domain):
-        self.public_ip = random_ip()
+    def __init__(self, domain, public_ip):
+        self.public_ip = public_ip
         self.allocation_id = random_eip_allocation_id() if domain == "vpc" else None
         self.domain = domain
         self.instance = None
@@ -1925,13 +2089,24 @@ class ElasticAddressBackend(object):
 
     def __init__(self):
         self.addresses = []
+        # The public IPs of both Elastic IPs and auto-assigned addresses
+        self.public_address_pool = AddressPool(PUBLIC_CIDR_BLOCK)
         super(ElasticAddressBackend, self).__init__()
 
+    def allocate_public_ip(self):
+        public_ip = self.public_address_pool.allocate()
+        if public_ip is None:
+            raise AddressLimitExceededError()
+        return public_ip
+
+    def release_public_ip(self, public_ip):
+        self.public_address_pool.release(public_ip)
+
     def allocate_address(self, domain):
         if domain not in ['standard', 'vpc']:
             raise InvalidDomainError(domain)
 
-        address = ElasticAddress(domain)
+        address = ElasticAddress(domain, self.allocate_public_ip())
         self.addresses.append(address)
         return address
 
@@ -1980,6 +2155,7 @@ class ElasticAddressBackend(object):
             eip.instance = instance
             eip.eni = eni
             if eip.eni:
+                eip.eni.release_auto_public_ip()
                 eip.eni.public_ip = eip.public_ip
             if eip.domain == "vpc":
                 eip.association_id = random_eip_association_id()
@@ -2021,6 +2197,7 @@ class ElasticAddressBackend(object):
         self.disassociate_address(address=eip.public_ip)
         eip.allocation_id = None
         self.addresses.remove(eip)
+        self.release_public_ip(eip.public_ip)
         return True
 
 
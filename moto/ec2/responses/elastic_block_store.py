@@ -3,6 +3,7 @@ from jinja2 import Template
 
 from moto.core.responses import BaseResponse
 from moto.ec2.models import ec2_backend
+from moto.ec2.utils import paginate, pagination_from_querystring
 
 
 class ElasticBlockStore(BaseResponse):
@@ -45,14 +46,18 @@ class ElasticBlockStore(BaseResponse):
         return DELETE_VOLUME_RESPONSE
 
     def describe_snapshots(self):
-        snapshots = ec2_backend.describe_snapshots()
+        max_results, next_token = pagination_from_querystring(self.querystring)
+        snapshots, next_token = paginate(ec2_backend.describe_snapshots(), key=lambda snapshot: (snapshot.id,),
+                                         max_results=max_results, next_token=next_token)
         template = Template(DESCRIBE_SNAPSHOTS_RESPONSE)
-        return template.render(snapshots=snapshots)
+        return template.render(snapshots=snapshots, next_token=next_token)
 
     def describe_volumes(self):
-        volumes = ec2_backend.describe_volumes()
+        max_results, next_token = pagination_from_querystring(self.querystring)
+        volumes, next_token = paginate(ec2_backend.describe_volumes(), key=lambda volume: (volume.id,),
+                                       max_results=max_results, next_token=next_token)
         template = Template(DESCRIBE_VOLUMES_RESPONSE)
-        return template.render(volumes=volumes)
+        return template.render(volumes=volumes, next_token=next_token)
 
     def describe_volume_attribute(self):
         raise NotImplementedError('ElasticBlockStore.describe_volume_attribute is not yet implemented')
@@ -137,6 +142,9 @@ DESCRIBE_VOLUMES_RESPONSE = """<DescribeVolumesResponse xmlns="http://ec2.amazon
           </item>
       {% endfor %}
    </volumeSet>
+   {% if next_token %}
+   <nextToken>{{ next_token }}</nextToken>
+   {% endif %}
 </DescribeVolumesResponse>"""
 
 DELETE_VOLUME_RESPONSE = """<DeleteVolumeResponse xmlns="http://ec2.amazonaws.com/doc/2012-12-01/">
@@ -192,6 +200,9 @@ DESCRIBE_SNAPSHOTS_RESPONSE = """<DescribeSnapshotsResponse xmlns="http://ec2.am
           </item>
       {% endfor %}
    </snapshotSet>
+   {% if next_token %}
+   <nextToken>{{ next_token }}</nextToken>
+   {% endif %}
 </DescribeSnapshotsResponse>"""
 
 DELETE_SNAPSHOT_RESPONSE = """<DeleteSnapshotResponse xmlns="http://ec2.amazonaws.com/doc/2012-12-01/">
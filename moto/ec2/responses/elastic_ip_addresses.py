@@ -3,7 +3,7 @@ from jinja2 import Template
 
 from moto.core.responses import BaseResponse
 from moto.ec2.models import ec2_backend
-from moto.ec2.utils import sequence_from_querystring
+from moto.ec2.utils import sequence_from_querystring, paginate, pagination_from_querystring
 
 
 class ElasticIPAddresses(BaseResponse):
@@ -56,7 +56,10 @@ class ElasticIPAddresses(BaseResponse):
             addresses = ec2_backend.address_by_allocation(allocation_ids)
         else:
             addresses = ec2_backend.describe_addresses()
-        return template.render(addresses=addresses)
+        max_results, next_token = pagination_from_querystring(self.querystring)
+        addresses, next_token = paginate(addresses, key=lambda address: (address.public_ip,),
+                                         max_results=max_results, next_token=next_token)
+        return template.render(addresses=addresses, next_token=next_token)
 
     def disassociate_address(self):
         if "PublicIp" in self.querystring:
@@ -122,6 +125,9 @@ DESCRIBE_ADDRESS_RESPONSE = """<DescribeAddressesResponse xmlns="http://ec2.amaz
         </item>
     {% endfor %}
   </addressesSet>
+  {% if next_token %}
+  <nextToken>{{ next_token }}</nextToken>
+  {% endif %}
 </DescribeAddressesResponse>"""
 
 DISASSOCIATE_ADDRESS_RESPONSE = """<DisassociateAddressResponse xmlns="http://ec2.amazonaws.com/doc/2013-07-15/">
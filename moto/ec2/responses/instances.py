@@ -1,28 +1,36 @@
 from __future__ import unicode_literals
+import itertools
 from jinja2 import Template
 
 from moto.core.responses import BaseResponse
 from moto.core.utils import camelcase_to_underscores
-from moto.ec2.utils import instance_ids_from_querystring, filters_from_querystring, filter_reservations, \
-    dict_from_querystring
+from moto.ec2.utils import instance_ids_from_querystring, filters_from_querystring, dict_from_querystring, \
+    paginate, pagination_from_querystring
 
 
 class InstanceResponse(BaseResponse):
     def describe_instances(self):
         instance_ids = instance_ids_from_querystring(self.querystring)
-        if instance_ids:
-            reservations = self.ec2_backend.get_reservations_by_instance_ids(instance_ids)
-        else:
-            reservations = self.ec2_backend.all_reservations(make_copy=True)
-
         filter_dict = filters_from_querystring(self.querystring)
-        reservations = filter_reservations(reservations, filter_dict)
+        reservations = self.ec2_backend.describe_reservations(instance_ids, filter_dict)
+
+        max_results, next_token = pagination_from_querystring(self.querystring)
+        if max_results or next_token:
+            # Pages are counted in instances, ordered by reservation
+            instances, next_token = paginate(
+                [(reservation, instance) for reservation, instances in reservations for instance in instances],
+                key=lambda pair: (pair[0].id, pair[1].id), max_results=max_results, next_token=next_token)
+            reservations = [(reservation, [instance for _, instance in pairs])
+                            for reservation, pairs in itertools.groupby(instances, key=lambda pair: pair[0])]
 
         template = Template(EC2_DESCRIBE_INSTANCES)
-        return template.render(reservations=reservations)
+        return template.render(reservations=reservations, next_token=next_token)
 
     def run_instances(self):
         min_count = int(self.querystring.get('MinCount', ['1'])[0])
+        # As many as requested, as capacity is never short. boto always sends
+        # MaxCount, defaulting to 1, so MinCount wins when it is larger.
+        count = max(min_count, int(self.querystring.get('MaxCount', [min_count])[0]))
         image_id = self.querystring.get('ImageId')[0]
         user_data = self.querystring.get('UserData')
         security_group_names = self._get_multi_param('SecurityGroup')
@@ -35,7 +43,7 @@ class InstanceResponse(BaseResponse):
         key_name = self.querystring.get("KeyName", [None])[0]
 
         new_reservation = self.ec2_backend.add_instances(
-            image_id, min_count, user_data, security_group_names,
+            image_id, count, user_data, security_group_names,
             instance_type=instance_type, subnet_id=subnet_id,
             key_name=key_name, security_group_ids=security_group_ids,
             nics=nics, private_ip=private_ip, associate_public_ip=associate_public_ip)
@@ -280,7 +288,7 @@ EC2_RUN_INSTANCES = """<RunInstancesResponse xmlns="http://ec2.amazonaws.com/doc
 EC2_DESCRIBE_INSTANCES = """<DescribeInstancesResponse xmlns='http://ec2.amazonaws.com/doc/2012-12-01/'>
   <requestId>fdcdcab1-ae5c-489e-9c33-4637c5dda355</requestId>
       <reservationSet>
-        {% for reservation in reservations %}
+        {% for reservation, instances in reservations %}
           <item>
             <reservationId>{{ reservation.id }}</reservationId>
             <ownerId>111122223333</ownerId>
@@ -293,7 +301,7 @@ EC2_DESCRIBE_INSTANCES = """<DescribeInstancesResponse xmlns='http://ec2.amazona
               {% endfor %}
             </groupSet>
             <instancesSet>
-                {% for instance in reservation.instances %}
+                {% for instance in instances %}
                   <item>
                     <instanceId>{{ instance.id }}</instanceId>
                     <imageId>{{ instance.image_id }}</imageId>
@@ -419,6 +427,9 @@ EC2_DESCRIBE_INSTANCES = """<DescribeInstancesResponse xmlns='http://ec2.amazona
           </item>
         {% endfor %}
       </reservationSet>
+      {% if next_token %}
+      <nextToken>{{ next_token }}</nextToken>
+      {% endif %}
 </DescribeInstancesResponse>"""
 
 EC2_TERMINATE_INSTANCES = """
@@ -3,7 +3,7 @@ from jinja2 import Template
 
 from moto.core.responses import BaseResponse
 from moto.ec2.models import ec2_backend
-from moto.ec2.utils import filters_from_querystring
+from moto.ec2.utils import filters_from_querystring, paginate, pagination_from_querystring
 
 
 def process_rules_from_querystring(querystring):
@@ -75,9 +75,12 @@ class SecurityGroups(BaseResponse):
             groupnames=groupnames,
             filters=filters
         )
+        max_results, next_token = pagination_from_querystring(self.querystring)
+        groups, next_token = paginate(groups, key=lambda group: (group.id,),
+                                      max_results=max_results, next_token=next_token)
 
         template = Template(DESCRIBE_SECURITY_GROUPS_RESPONSE)
-        return template.render(groups=groups)
+        return template.render(groups=groups, next_token=next_token)
 
     def revoke_security_group_egress(self):
         raise NotImplementedError('SecurityGroups.revoke_security_group_egress is not yet implemented')
@@ -139,6 +142,9 @@ DESCRIBE_SECURITY_GROUPS_RESPONSE = """<DescribeSecurityGroupsResponse xmlns="ht
           </item>
       {% endfor %}
    </securityGroupInfo>
+   {% if next_token %}
+   <nextToken>{{ next_token }}</nextToken>
+   {% endif %}
 </DescribeSecurityGroupsResponse>"""
 
 AUTHORIZE_SECURITY_GROUP_INGRESS_REPONSE = """<AuthorizeSecurityGroupIngressResponse xmlns="http://ec2.amazonaws.com/doc/2012-12-01/">
@@ -3,7 +3,8 @@ from jinja2 import Template
 
 from moto.core.responses import BaseResponse
 from moto.ec2.models import ec2_backend, validate_resource_ids
-from moto.ec2.utils import sequence_from_querystring, tags_from_query_string, filters_from_querystring
+from moto.ec2.utils import sequence_from_querystring, tags_from_query_string, filters_from_querystring, \
+    paginate, pagination_from_querystring
 
 
 class TagResponse(BaseResponse):
@@ -25,9 +26,12 @@ class TagResponse(BaseResponse):
 
     def describe_tags(self):
         filters = filters_from_querystring(querystring_dict=self.querystring)
-        tags = ec2_backend.describe_tags(filters=filters)
+        max_results, next_token = pagination_from_querystring(self.querystring)
+        tags, next_token = paginate(ec2_backend.describe_tags(filters=filters),
+                                    key=lambda tag: (tag['resource_id'], tag['key']),
+                                    max_results=max_results, next_token=next_token)
         template = Template(DESCRIBE_RESPONSE)
-        return template.render(tags=tags)
+        return template.render(tags=tags, next_token=next_token)
 
 
 CREATE_RESPONSE = """<CreateTagsResponse xmlns="http://ec2.amazonaws.com/doc/2012-12-01/">
@@ -52,4 +56,7 @@ DESCRIBE_RESPONSE = """<DescribeTagsResponse xmlns="http://ec2.amazonaws.com/doc
           </item>
       {% endfor %}
     </tagSet>
+    {% if next_token %}
+    <nextToken>{{ next_token }}</nextToken>
+    {% endif %}
 </DescribeTagsResponse>"""
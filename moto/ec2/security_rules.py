@@ -0,0 +1,195 @@
+from __future__ import unicode_literals
+import bisect
+import six
+
+from .cidr_trie import CidrTrie
+
+ALL_PROTOCOLS = '-1'
+MAX_PORT = 65535
+
+# Protocols may be given by name or by IP protocol number
+PROTOCOL_NAMES = {'1': 'icmp', '6': 'tcp', '17': 'udp'}
+
+
+def normalize_protocol(ip_protocol):
+    protocol = six.text_type(ip_protocol).lower()
+    return PROTOCOL_NAMES.get(protocol, protocol)
+
+
+def port_range(ip_protocol, from_port, to_port):
+    """
+    The (first, last) ports of a rule. -1, as used for ICMP types and for
+    all protocols, stands for every port.
+    """
+    if normalize_protocol(ip_protocol) == ALL_PROTOCOLS:
+        return 0, MAX_PORT
+    first = int(from_port) if from_port not in (None, '') else -1
+    last = int(to_port) if to_port not in (None, '') else -1
+    return (first if first >= 0 else 0), (last if last >= 0 else MAX_PORT)
+
+
+def _ip_ranges(rule):
+    if isinstance(rule.ip_ranges, (list, tuple)):
+        return rule.ip_ranges
+    return [rule.ip_ranges]
+
+
+def rule_key(rule):
+    """
+    What makes a rule the same as another: its protocol, its ports and
+    its sources, whatever their order or how the ports were spelled
+    """
+    return (normalize_protocol(rule.ip_protocol),
+            port_range(rule.ip_protocol, rule.from_port, rule.to_port),
+            frozenset(six.text_type(ip_range) for ip_range in _ip_ranges(rule)),
+            frozenset(source_group.id for source_group in rule.source_groups))
+
+
+class PortRanges(object):
+    """
+    The port ranges granted to one source. The ranges as authorized are kept
+    for duplicate checks; their union is kept as sorted, disjoint ranges so
+    that a port is looked up with a binary search.
+    """
+
+    def __init__(self):
+        self.ranges = set()
+        self.starts = []
+        self.ends = []
+
+    def __len__(self):
+        return len(self.ranges)
+
+    def __contains__(self, port):
+        index = bisect.bisect_right(self.starts, port) - 1
+        return index >= 0 and self.ends[index] >= port
+
+    def add(self, ports):
+        self.ranges.add(ports)
+        self._merge()
+
+    def discard(self, ports):
+        self.ranges.discard(ports)
+        self._merge()
+
+    def _merge(self):
+        self.starts = []
+        self.ends = []
+        for first, last in sorted(self.ranges):
+            if self.ends and first <= self.ends[-1] + 1:
+                self.ends[-1] = max(self.ends[-1], last)
+            else:
+                self.starts.append(first)
+                self.ends.append(last)
+
+
+class IngressRules(object):
+    """
+    The ingress rules of a security group, compiled for lookups. Each rule
+    grants a port range of one protocol to CIDR blocks and to source groups.
+    Per protocol, CIDR grants live in a CidrTrie and group grants in a dict
+    by group id, both holding the PortRanges granted.
+
+    Grants whose CIDR block cannot be parsed, like the unresolved references
+    of a CloudFormation template, are kept out and never match.
+    """
+
+    def __init__(self):
+        # rule_key to rule, for revoking
+        self.rules = {}
+        self.cidr_grants = {}
+        self.group_grants = {}
+
+    @staticmethod
+    def grants(rule):
+        """
+        Yields the (protocol, ports, cidr block, group id) grants of a rule,
+        with either the block or the group id set
+        """
+        protocol = normalize_protocol(rule.ip_protocol)
+        ports = port_range(rule.ip_protocol, rule.from_port, rule.to_port)
+        for cidr_block in _ip_ranges(rule):
+            yield protocol, ports, cidr_block, None
+        for source_group in rule.source_groups:
+            yield protocol, ports, None, source_group.id
+
+    def _port_ranges(self, protocol, cidr_block, group_id, create=False):
+        if cidr_block is not None:
+            grants = self.cidr_grants.get(protocol)
+            if grants is None:
+                if not create:
+                    return None
+                grants = self.cidr_grants[protocol] = CidrTrie()
+            try:
+                if create:
+                    return grants.setdefault(cidr_block, PortRanges())
+                return grants.get(cidr_block)
+            except ValueError:
+                return None
+        grants = self.group_grants.get(protocol)
+        if grants is None:
+            if not create:
+                return None
+            grants = self.group_grants[protocol] = {}
+        if create:
+            return grants.setdefault(group_id, PortRanges())
+        return grants.get(group_id)
+
+    def duplicates(self, rule):
+        """
+        Returns the grants of ``rule`` that are already authorized
+        """
+        duplicates = []
+        for protocol, ports, cidr_block, group_id in self.grants(rule):
+            port_ranges = self._port_ranges(protocol, cidr_block, group_id)
+            if port_ranges is not None and ports in port_ranges.ranges:
+                duplicates.append((protocol, ports, cidr_block, group_id))
+        return duplicates
+
+    def add(self, rule):
+        self.rules[rule_key(rule)] = rule
+        for protocol, ports, cidr_block, group_id in self.grants(rule):
+            port_ranges = self._port_ranges(protocol, cidr_block, group_id, create=True)
+            if port_ranges is not None:
+                port_ranges.add(ports)
+
+    def remove(self, rule):
+        """
+        Removes the rule equal to ``rule`` and returns it, or None if there
+        is no such rule
+        """
+        rule = self.rules.pop(rule_key(rule), None)
+        if rule is None:
+            return None
+        for protocol, ports, cidr_block, group_id in self.grants(rule):
+            port_ranges = self._port_ranges(protocol, cidr_block, group_id)
+            if port_ranges is None:
+                continue
+            port_ranges.discard(ports)
+            if not port_ranges:
+                if cidr_block is not None:
+                    self.cidr_grants[protocol].pop(cidr_block)
+                else:
+                    del self.group_grants[protocol][group_id]
+        return rule
+
+    def allows(self, ip_protocol, port, addresses=(), group_ids=()):
+        """
+        Whether traffic of ``ip_protocol`` to ``port`` is let in from any of
+        the source ``addresses`` or source security ``group_ids``
+        """
+        port = int(port)
+        for protocol in set([normalize_protocol(ip_protocol), ALL_PROTOCOLS]):
+            group_grants = self.group_grants.get(protocol, {})
+            for group_id in group_ids:
+                port_ranges = group_grants.get(group_id)
+                if port_ranges is not None and port in port_ranges:
+                    return True
+            cidr_grants = self.cidr_grants.get(protocol)
+            if cidr_grants is None:
+                continue
+            for address in addresses:
+                for port_ranges in cidr_grants.matches(address):
+                    if port in port_ranges:
+                        return True
+        return False
@@ -1,8 +1,13 @@
 from __future__ import unicode_literals
-import random
+import base64
+import bisect
+import json
 import re
 import six
 
+from moto.core.utils import get_random_hex
+from .exceptions import InvalidParameterValueError
+
 EC2_RESOURCE_TO_PREFIX = {
     'customer-gateway': 'cgw',
     'dhcp-options': 'dopt',
@@ -33,10 +38,26 @@ EC2_PREFIX_TO_RESOURCE = dict((v, k) for (k, v) in EC2_RESOURCE_TO_PREFIX.items(
 
 def random_id(prefix=''):
     size = 8
-    chars = list(range(10)) + ['a', 'b', 'c', 'd', 'e', 'f']
+    return '{0}-{1}'.format(prefix, get_random_hex(size))
+
 
-    resource_id = ''.join(six.text_type(random.choice(chars)) for x in range(size))
-    return '{0}-{1}'.format(prefix, resource_id)
+def random_ids(prefix, count, exclude=()):
+    """
+    ``count`` distinct ids, none of them in ``exclude``, cut from as few
+    reads of random hex digits as possible.
+    """
+    size = 8
+    ids = []
+    seen = set()
+    while len(ids) < count:
+        needed = count - len(ids)
+        digits = get_random_hex(size * needed)
+        for start in range(0, size * needed, size):
+            resource_id = '{0}-{1}'.format(prefix, digits[start:start + size])
+            if resource_id not in seen and resource_id not in exclude:
+                seen.add(resource_id)
+                ids.append(resource_id)
+    return ids
 
 
 def random_ami_id():
@@ -47,6 +68,10 @@ def random_instance_id():
     return random_id(prefix=EC2_RESOURCE_TO_PREFIX['instance'])
 
 
+def random_instance_ids(count, exclude=()):
+    return random_ids(EC2_RESOURCE_TO_PREFIX['instance'], count, exclude)
+
+
 def random_reservation_id():
     return random_id(prefix=EC2_RESOURCE_TO_PREFIX['reservation'])
 
@@ -107,19 +132,6 @@ def random_eni_attach_id():
     return random_id(prefix=EC2_RESOURCE_TO_PREFIX['network-interface-attachment'])
 
 
-def random_public_ip():
-    return '54.214.{0}.{1}'.format(random.choice(range(255)),
-                                   random.choice(range(255)))
-
-
-def random_ip():
-    return "127.{0}.{1}.{2}".format(
-        random.randint(0, 255),
-        random.randint(0, 255),
-        random.randint(0, 255)
-    )
-
-
 def generate_route_id(route_table_id, cidr_block):
     return "%s~%s" % (route_table_id, cidr_block)
 
@@ -256,6 +268,37 @@ def dict_from_querystring(parameter, querystring_dict):
     return use_dict
 
 
+def pagination_from_querystring(querystring_dict):
+    max_results = querystring_dict.get('MaxResults', [None])[0]
+    next_token = querystring_dict.get('NextToken', [None])[0]
+    return (int(max_results) if max_results else None), next_token
+
+
+def paginate(items, key, max_results=None, next_token=None):
+    """
+    Returns a page of at most ``max_results`` items in ``key`` order and
+    the token for the next page, which is None on the last page. Tokens
+    hold the key of the last item returned rather than an offset, so the
+    pages stay consistent while resources are created and deleted.
+    Without either parameter the items are returned as they are.
+    """
+    if max_results is None and not next_token:
+        return list(items), None
+    items = sorted(items, key=key)
+    start = 0
+    if next_token:
+        try:
+            last_key = tuple(json.loads(base64.urlsafe_b64decode(str(next_token)).decode('utf-8')))
+        except (TypeError, ValueError):
+            raise InvalidParameterValueError(next_token)
+        start = bisect.bisect_right([key(item) for item in items], last_key)
+    if max_results is None or len(items) - start <= max_results:
+        return items[start:], None
+    page = items[start:start + max_results]
+    token = base64.urlsafe_b64encode(json.dumps(list(key(page[-1]))).encode('utf-8')).decode('ascii')
+    return page, token
+
+
 def keypair_names_from_querystring(querystring_dict):
     keypair_names = []
     for key, value in querystring_dict.items():
@@ -264,66 +307,6 @@ def keypair_names_from_querystring(querystring_dict):
     return keypair_names
 
 
-filter_dict_attribute_mapping = {
-    'instance-state-name': 'state',
-    'instance-id': 'id'
-}
-
-
-def passes_filter_dict(instance, filter_dict):
-    for filter_name, filter_values in filter_dict.items():
-        if filter_name in filter_dict_attribute_mapping:
-            instance_attr = filter_dict_attribute_mapping[filter_name]
-            instance_value = getattr(instance, instance_attr)
-            if instance_value not in filter_values:
-                return False
-        elif filter_name.startswith('tag:'):
-            tags = dict((tag['key'], tag['value']) for tag in instance.get_tags())
-            tag_name = filter_name.replace('tag:', '', 1)
-            tag_value = tags.get(tag_name)
-            if tag_value not in filter_values:
-                return False
-        else:
-            raise NotImplementedError(
-                "Filter dicts have not been implemented in Moto for '%s' yet. Feel free to open an issue at https://github.com/spulec/moto/issues",
-                filter_name)
-    return True
-
-
-def filter_reservations(reservations, filter_dict):
-    result = []
-    for reservation in reservations:
-        new_instances = []
-        for instance in reservation.instances:
-            if passes_filter_dict(instance, filter_dict):
-                new_instances.append(instance)
-        if new_instances:
-            reservation.instances = new_instances
-            result.append(reservation)
-    return result
-
-
-def is_filter_matching(obj, filter, filter_value):
-    value = obj.get_filter_value(filter)
-
-    if isinstance(value, six.string_types):
-        return value in filter_value
-
-    try:
-        value = set(value)
-        return (value and value.issubset(filter_value)) or value.issuperset(filter_value)
-    except TypeError:
-        return value in filter_value
-
-
-def generic_filter(filters, objects):
-    if filters:
-        for (_filter, _filter_value) in filters.items():
-            objects = [obj for obj in objects if is_filter_matching(obj, _filter, _filter_value)]
-
-    return objects
-
-
 def simple_aws_filter_to_re(filter_string):
     import fnmatch
     tmp_filter = filter_string.replace('\?','[?]')
@@ -332,6 +315,33 @@ def simple_aws_filter_to_re(filter_string):
     return tmp_filter
 
 
+class SimpleAwsFilterMatcher(object):
+    """
+    Matches strings against filter values which may use wildcards. Values
+    without wildcards are looked up in a set, and are exposed as
+    ``literals`` when there are no patterns, so callers can use an index.
+    With no filter values everything matches.
+    """
+
+    def __init__(self, filter_values):
+        if isinstance(filter_values, six.string_types):
+            filter_values = [filter_values]
+        self.match_all = not filter_values
+        self.exact = set()
+        self.patterns = []
+        for value in filter_values or []:
+            if any(char in value for char in '*?[\\'):
+                self.patterns.append(re.compile(simple_aws_filter_to_re(value)))
+            else:
+                self.exact.add(value)
+        self.literals = None if self.match_all or self.patterns else self.exact
+
+    def __call__(self, value):
+        if self.match_all or value in self.exact:
+            return True
+        return any(pattern.match(value) is not None for pattern in self.patterns)
+
+
 # not really random ( http://xkcd.com/221/ )
 def random_key_pair():
     return {
@@ -1,10 +1,5 @@
 from __future__ import unicode_literals
-import random
-import string
-
-
-def random_hex(length):
-    return ''.join(random.choice(string.ascii_lowercase) for x in range(length))
+from moto.core.utils import get_random_hex as random_hex
 
 
 def get_random_message_id():
@@ -14,3 +14,24 @@ class MessageAttributesInvalid(Exception):
 
 	def __init__(self, description):
 		self.description = description
+
+
+class InvalidParameterValue(Exception):
+	status_code = 400
+
+	def __init__(self, description):
+		self.description = description
+
+
+class MissingParameter(Exception):
+	status_code = 400
+
+	def __init__(self, description):
+		self.description = description
+
+
+class InvalidAttributeName(Exception):
+	status_code = 400
+
+	def __init__(self, description):
+		self.description = description
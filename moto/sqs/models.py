@@ -1,6 +1,12 @@
 from __future__ import unicode_literals
 import base64
+import copy
+from collections import deque
 import hashlib
+import heapq
+import itertools
+import json
+import threading
 import time
 import re
 
@@ -8,12 +14,46 @@ from moto.core import BaseBackend
 from moto.core.utils import camelcase_to_underscores, get_random_message_id
 from .utils import generate_receipt_handle, unix_time_millis
 from .exceptions import (
+    InvalidAttributeName,
+    InvalidParameterValue,
+    MissingParameter,
     ReceiptHandleIsInvalid,
     MessageNotInflight
 )
 
 DEFAULT_ACCOUNT_ID = 123456789012
 
+MESSAGE_READY = 'ready'
+MESSAGE_DELAYED = 'delayed'
+MESSAGE_INFLIGHT = 'inflight'
+MESSAGE_DELETED = 'deleted'
+
+# FIFO queues drop messages with a deduplication id seen in the last five minutes
+DEDUPLICATION_INTERVAL = 5 * 60
+DEDUPLICATION_BUCKET_SECONDS = 60
+
+# Sending a message expires at most this many old messages
+EXPIRY_SWEEP_LIMIT = 16
+
+# The attributes a queue can be created with, besides VisibilityTimeout and
+# FifoQueue, and the type their values are kept as
+INTEGER_QUEUE_ATTRIBUTES = ['DelaySeconds',
+                            'KmsDataKeyReusePeriodSeconds',
+                            'MaximumMessageSize',
+                            'MessageRetentionPeriod',
+                            'ReceiveMessageWaitTimeSeconds']
+BOOLEAN_QUEUE_ATTRIBUTES = ['ContentBasedDeduplication',
+                            'SqsManagedSseEnabled']
+STRING_QUEUE_ATTRIBUTES = ['DeduplicationScope',
+                           'FifoThroughputLimit',
+                           'KmsMasterKeyId',
+                           'Policy',
+                           'RedriveAllowPolicy',
+                           'RedrivePolicy']
+FIFO_QUEUE_ATTRIBUTES = ['ContentBasedDeduplication',
+                         'DeduplicationScope',
+                         'FifoThroughputLimit']
+
 
 class Message(object):
     def __init__(self, message_id, body):
@@ -27,6 +67,14 @@ class Message(object):
         self.approximate_receive_count = 0
         self.visible_at = 0
         self.delayed_until = 0
+        # Where the message is in its queue and its current entry in the
+        # queue's schedule, see Queue
+        self.state = None
+        self.schedule_token = None
+        # Only set on messages in FIFO queues
+        self.group_id = None
+        self.deduplication_id = None
+        self.sequence_number = None
 
     @property
     def md5(self):
@@ -70,20 +118,6 @@ class Message(object):
         delay_msec = int(delay_seconds) * 1000
         self.delayed_until = unix_time_millis() + delay_msec
 
-    @property
-    def visible(self):
-        current_time = unix_time_millis()
-        if current_time > self.visible_at:
-            return True
-        return False
-
-    @property
-    def delayed(self):
-        current_time = unix_time_millis()
-        if current_time < self.delayed_until:
-            return True
-        return False
-
 
 class Queue(object):
     camelcase_attributes = ['ApproximateNumberOfMessages',
@@ -101,7 +135,27 @@ class Queue(object):
     def __init__(self, name, visibility_timeout):
         self.name = name
         self.visibility_timeout = visibility_timeout or 30
-        self._messages = []
+        # Visible messages in the order they became visible, and a heap of
+        # delayed and in-flight messages ordered by when they become visible
+        self._ready = deque()
+        self._schedule_heap = []
+        self._tokens = itertools.count()
+        self._stale_count = 0
+        self._delayed_count = 0
+        self._inflight_count = 0
+        self._ready_message_count = 0
+        # Deleted messages still in the ready queue, skipped when reached
+        self._dead_ready_count = 0
+        # Every message in the order it was sent, for retention expiry
+        self._by_age = deque()
+        self._dead_by_age_count = 0
+        # The message each outstanding receipt handle was issued for
+        self._receipts = {}
+        self.lock = threading.RLock()
+        # Notified whenever a message may have become available to receivers,
+        # which _notifications counts
+        self.messages_available = threading.Condition(self.lock)
+        self._notifications = 0
 
         now = time.time()
 
@@ -112,6 +166,7 @@ class Queue(object):
         self.message_retention_period = 86400 * 4  # four days
         self.queue_arn = 'arn:aws:sqs:sqs.us-east-1:123456789012:%s' % self.name
         self.receive_message_wait_time_seconds = 0
+        self.redrive_policy = None
 
     @classmethod
     def create_from_cloudformation_json(cls, resource_name, cloudformation_json):
@@ -124,33 +179,432 @@ class Queue(object):
 
     @property
     def approximate_number_of_messages_delayed(self):
-        return len([m for m in self._messages if m.delayed])
+        with self.lock:
+            self._wake()
+            return self._delayed_count
 
     @property
     def approximate_number_of_messages_not_visible(self):
-        return len([m for m in self._messages if not m.visible])
+        with self.lock:
+            self._wake()
+            return self._inflight_count
 
     @property
     def approximate_number_of_messages(self):
-        return len(self.messages)
+        with self.lock:
+            self._wake()
+            return self._ready_count()
 
     @property
     def physical_resource_id(self):
         return self.name
 
+    @property
+    def redrive_policy(self):
+        return self._redrive_policy
+
+    @redrive_policy.setter
+    def redrive_policy(self, policy):
+        """
+        Takes the RedrivePolicy attribute as JSON, e.g.
+        {"deadLetterTargetArn": "...", "maxReceiveCount": 5}.
+        """
+        self._redrive_policy = policy or None
+        self._dead_letter_queue_name = None
+        self._max_receive_count = None
+        if self._redrive_policy:
+            try:
+                parsed = json.loads(policy)
+                self._dead_letter_queue_name = parsed['deadLetterTargetArn'].split(':')[-1]
+                self._max_receive_count = int(parsed['maxReceiveCount'])
+            except (ValueError, KeyError, TypeError, AttributeError):
+                raise InvalidParameterValue("Value {0} for parameter RedrivePolicy is invalid.".format(policy))
+
     @property
     def attributes(self):
         result = {}
         for attribute in self.camelcase_attributes:
             result[attribute] = getattr(self, camelcase_to_underscores(attribute))
+        if self.redrive_policy:
+            result['RedrivePolicy'] = self.redrive_policy
         return result
 
     @property
     def messages(self):
-        return [message for message in self._messages if message.visible and not message.delayed]
+        with self.lock:
+            self._wake()
+            return self._ready_messages()
+
+    def _schedule(self, message, state, wake_at):
+        """
+        Puts a message in the schedule until ``wake_at``. Entries are never
+        removed from the heap; they go stale when the message is rescheduled
+        or deleted and are dropped when they reach the top.
+        """
+        if message.schedule_token is not None:
+            self._stale_count += 1
+        self._set_state(message, state)
+        message.schedule_token = next(self._tokens)
+        heapq.heappush(self._schedule_heap, (wake_at, message.schedule_token, message))
+
+    def _set_state(self, message, state):
+        if message.state == MESSAGE_READY:
+            self._ready_message_count -= 1
+        elif message.state == MESSAGE_DELAYED:
+            self._delayed_count -= 1
+        elif message.state == MESSAGE_INFLIGHT:
+            self._inflight_count -= 1
+        if state == MESSAGE_READY:
+            self._ready_message_count += 1
+        elif state == MESSAGE_DELAYED:
+            self._delayed_count += 1
+        elif state == MESSAGE_INFLIGHT:
+            self._inflight_count += 1
+        message.state = state
+
+    def _discard(self, message):
+        """
+        Deletes a message wherever it is. Its entries in the ready queue and
+        the schedule go stale and are dropped when reached.
+        """
+        if message.state == MESSAGE_INFLIGHT:
+            self._release(message)
+        elif message.state == MESSAGE_READY:
+            self._dead_ready_count += 1
+        if message.schedule_token is not None:
+            message.schedule_token = None
+            self._stale_count += 1
+        if self._receipts.get(message.receipt_handle) is message:
+            del self._receipts[message.receipt_handle]
+        self._set_state(message, MESSAGE_DELETED)
+        self._dead_by_age_count += 1
+
+    def _expire(self, now, limit=None):
+        """
+        Deletes the messages sent longer than the retention period ago, or
+        only the ``limit`` oldest of them. Messages are checked oldest
+        first, so this stops at the first one still retained.
+        """
+        horizon = now - int(self.message_retention_period) * 1000
+        by_age = self._by_age
+        while by_age and by_age[0].sent_timestamp <= horizon:
+            if limit is not None:
+                if limit <= 0:
+                    break
+                limit -= 1
+            message = by_age.popleft()
+            if message.state != MESSAGE_DELETED:
+                self._discard(message)
+            self._dead_by_age_count -= 1
+
+        if self._dead_by_age_count > 64 and self._dead_by_age_count > len(by_age) // 2:
+            self._by_age = deque(message for message in by_age if message.state != MESSAGE_DELETED)
+            self._dead_by_age_count = 0
+        if self._dead_ready_count > 64 and self._dead_ready_count > self._ready_message_count:
+            self._compact_ready()
+            self._dead_ready_count = 0
+
+    def _wake(self, now=None):
+        """
+        Drops expired messages and moves the messages whose delay or
+        visibility timeout has passed to the ready queue.
+        """
+        now = unix_time_millis() if now is None else now
+        self._expire(now)
+        heap = self._schedule_heap
+        while heap and heap[0][0] <= now:
+            _, token, message = heapq.heappop(heap)
+            if token != message.schedule_token:
+                self._stale_count -= 1
+                continue
+            message.schedule_token = None
+            self._make_ready(message)
+
+        if self._stale_count > 64 and self._stale_count > len(heap) // 2:
+            self._schedule_heap = [entry for entry in heap if entry[1] == entry[2].schedule_token]
+            heapq.heapify(self._schedule_heap)
+            self._stale_count = 0
+
+    def _make_ready(self, message):
+        self._set_state(message, MESSAGE_READY)
+        self._ready.append(message)
+
+    def _take_ready(self, count):
+        result = []
+        while self._ready and len(result) < count:
+            message = self._ready.popleft()
+            if message.state != MESSAGE_READY:
+                self._dead_ready_count -= 1
+                continue
+            result.append(message)
+        return result
+
+    def _compact_ready(self):
+        self._ready = deque(message for message in self._ready if message.state == MESSAGE_READY)
+
+    def _ready_count(self):
+        return self._ready_message_count
+
+    def _ready_messages(self):
+        return [message for message in self._ready if message.state == MESSAGE_READY]
+
+    def _release(self, message):
+        """
+        Called as an in-flight message is deleted
+        """
+
+    def _notify(self):
+        self._notifications += 1
+        self.messages_available.notify_all()
 
     def add_message(self, message):
-        self._messages.append(message)
+        with self.lock:
+            now = unix_time_millis()
+            self._expire(now, limit=EXPIRY_SWEEP_LIMIT)
+            self._by_age.append(message)
+            if message.delayed_until > now:
+                self._schedule(message, MESSAGE_DELAYED, message.delayed_until)
+            else:
+                self._make_ready(message)
+            self._notify()
+            return message
+
+    def _receive_locks(self):
+        """
+        The locks held while receiving: this queue's and those of its
+        dead-letter queue, taken in name order so that two queues can be
+        each other's dead-letter queue.
+        """
+        queues = set([self])
+        if self._max_receive_count:
+            target = sqs_backend.get_queue(self._dead_letter_queue_name)
+            if target is not None:
+                queues.add(target)
+        return [queue.lock for queue in sorted(queues, key=lambda queue: queue.name)]
+
+    def receive_messages(self, count, wait_seconds=0):
+        """
+        Receives up to ``count`` messages. When there are none, waits up
+        to ``wait_seconds`` for one to be sent or to become visible again.
+        """
+        deadline = time.time() + wait_seconds
+        while True:
+            locks = self._receive_locks()
+            for lock in locks:
+                lock.acquire()
+            try:
+                now = unix_time_millis()
+                self._wake(now)
+                result = []
+                while len(result) < count:
+                    taken = self._take_ready(count - len(result))
+                    if not taken:
+                        break
+                    for message in taken:
+                        if self._max_receive_count and message.approximate_receive_count >= self._max_receive_count:
+                            # Received too many times; moved to the dead-letter queue
+                            self._release(message)
+                            self._set_state(message, MESSAGE_DELETED)
+                            self._dead_by_age_count += 1
+                            self._redrive(message)
+                            continue
+                        self._receipts.pop(message.receipt_handle, None)
+                        message.mark_received(visibility_timeout=self.visibility_timeout)
+                        self._receipts[message.receipt_handle] = message
+                        self._schedule(message, MESSAGE_INFLIGHT, max(message.visible_at, now))
+                        result.append(message)
+
+                remaining = deadline - time.time()
+                if result or remaining <= 0:
+                    return result
+                if self._schedule_heap:
+                    # Wake up in time for the next delay or visibility timeout to pass
+                    remaining = min(remaining, max(0.001, (self._schedule_heap[0][0] - now) / 1000.0))
+                notifications = self._notifications
+            finally:
+                for lock in reversed(locks):
+                    lock.release()
+            # Wait with this queue's lock only, unless notified since it was released
+            with self.lock:
+                if self._notifications == notifications:
+                    self.messages_available.wait(remaining)
+
+    def _redrive(self, message):
+        target = sqs_backend.get_queue(self._dead_letter_queue_name)
+        if target is None:
+            return
+        # A copy, as the original stays deleted in this queue's indexes
+        moved = copy.copy(message)
+        moved.state = None
+        moved.schedule_token = None
+        moved.delayed_until = 0
+        target.add_message(moved)
+
+    def _inflight_message(self, receipt_handle):
+        message = self._receipts.get(receipt_handle)
+        if message is None:
+            raise ReceiptHandleIsInvalid
+        self._wake()
+        if message.state != MESSAGE_INFLIGHT:
+            raise MessageNotInflight
+        return message
+
+    def change_message_visibility(self, receipt_handle, visibility_timeout):
+        with self.lock:
+            message = self._inflight_message(receipt_handle)
+            message.change_visibility(visibility_timeout)
+            self._schedule(message, MESSAGE_INFLIGHT, message.visible_at)
+            self._notify()
+
+    def change_message_visibility_batch(self, entries):
+        """
+        Applies a list of (entry id, receipt handle, visibility timeout).
+        Returns the ids of the successful entries and the failed entries as
+        (entry id, exception).
+        """
+        successful = []
+        failed = []
+        with self.lock:
+            for entry_id, receipt_handle, visibility_timeout in entries:
+                try:
+                    self.change_message_visibility(receipt_handle, visibility_timeout)
+                except (ReceiptHandleIsInvalid, MessageNotInflight) as e:
+                    failed.append((entry_id, e))
+                else:
+                    successful.append(entry_id)
+        return successful, failed
+
+    def delete_message(self, receipt_handle):
+        with self.lock:
+            try:
+                message = self._inflight_message(receipt_handle)
+            except (ReceiptHandleIsInvalid, MessageNotInflight):
+                # Only in-flight messages are deleted; anything else is ignored
+                return None
+            self._discard(message)
+            return message
+
+    def delete_message_batch(self, receipt_handles):
+        with self.lock:
+            return [self.delete_message(receipt_handle) for receipt_handle in receipt_handles]
+
+
+class FifoQueue(Queue):
+    """
+    A queue which delivers each message group in order. Ready messages are
+    kept in a sub-queue per group, and the groups with no message in
+    flight take turns in a ring, so picking the next group is O(1).
+    """
+    camelcase_attributes = Queue.camelcase_attributes + ['ContentBasedDeduplication',
+                                                         'FifoQueue']
+
+    def __init__(self, name, visibility_timeout):
+        super(FifoQueue, self).__init__(name, visibility_timeout)
+        self.fifo_queue = 'true'
+        self.content_based_deduplication = 'false'
+        self._groups = {}
+        self._group_inflight = {}
+        self._ready_groups = deque()
+        self._ready_group_ids = set()
+        self._sequence_numbers = itertools.count(1)
+        # (bucket start, {deduplication id: message}), oldest first
+        self._deduplication_buckets = deque()
+
+    def _queue_group(self, group_id):
+        if group_id not in self._ready_group_ids and group_id not in self._group_inflight:
+            self._ready_group_ids.add(group_id)
+            self._ready_groups.append(group_id)
+
+    def _make_ready(self, message):
+        returning = message.state == MESSAGE_INFLIGHT
+        self._set_state(message, MESSAGE_READY)
+        group = self._groups.setdefault(message.group_id, deque())
+        if returning:
+            # Messages back from flight go ahead of the rest of their group
+            index = 0
+            while index < len(group) and group[index].sequence_number < message.sequence_number:
+                index += 1
+            group.insert(index, message)
+            self._release(message)
+        else:
+            group.append(message)
+            self._queue_group(message.group_id)
+
+    def _take_ready(self, count):
+        result = []
+        while self._ready_groups and len(result) < count:
+            group_id = self._ready_groups.popleft()
+            self._ready_group_ids.discard(group_id)
+            group = self._groups.get(group_id)
+            if group is None:
+                continue
+            taken = 0
+            while group and len(result) < count:
+                message = group.popleft()
+                if message.state != MESSAGE_READY:
+                    self._dead_ready_count -= 1
+                    continue
+                result.append(message)
+                taken += 1
+            if not group:
+                del self._groups[group_id]
+            if taken:
+                # The group stays locked until its messages leave flight
+                self._group_inflight[group_id] = taken
+        return result
+
+    def _compact_ready(self):
+        for group_id, group in list(self._groups.items()):
+            group = deque(message for message in group if message.state == MESSAGE_READY)
+            if group:
+                self._groups[group_id] = group
+            else:
+                del self._groups[group_id]
+
+    def _ready_messages(self):
+        return [message for group in self._groups.values() for message in group
+                if message.state == MESSAGE_READY]
+
+    def _release(self, message):
+        remaining = self._group_inflight[message.group_id] - 1
+        if remaining:
+            self._group_inflight[message.group_id] = remaining
+            return
+        del self._group_inflight[message.group_id]
+        if message.group_id in self._groups:
+            self._queue_group(message.group_id)
+
+    def _find_duplicate(self, deduplication_id):
+        now = time.time()
+        buckets = self._deduplication_buckets
+        # Drop the buckets whose ids were all seen before the interval
+        while buckets and buckets[0][0] + DEDUPLICATION_BUCKET_SECONDS <= now - DEDUPLICATION_INTERVAL:
+            buckets.popleft()
+        for _, seen in buckets:
+            if deduplication_id in seen:
+                return seen[deduplication_id]
+        return None
+
+    def _remember(self, message):
+        now = time.time()
+        bucket_start = now - now % DEDUPLICATION_BUCKET_SECONDS
+        buckets = self._deduplication_buckets
+        if not buckets or buckets[-1][0] != bucket_start:
+            buckets.append((bucket_start, {}))
+        buckets[-1][1][message.deduplication_id] = message
+
+    def add_message(self, message):
+        """
+        Adds a message unless one with the same deduplication id was added
+        in the last five minutes, in which case that message is returned.
+        """
+        with self.lock:
+            duplicate = self._find_duplicate(message.deduplication_id)
+            if duplicate is not None:
+                return duplicate
+            self._remember(message)
+            message.sequence_number = next(self._sequence_numbers)
+            return super(FifoQueue, self).add_message(message)
 
 
 class SQSBackend(BaseBackend):
@@ -158,10 +612,47 @@ class SQSBackend(BaseBackend):
         self.queues = {}
         super(SQSBackend, self).__init__()
 
-    def create_queue(self, name, visibility_timeout):
+    @staticmethod
+    def _queue_attributes(attributes, fifo):
+        """
+        Checks the attributes a queue is created with and converts their
+        values to the types the queue keeps them as.
+        """
+        result = {}
+        for key, value in attributes.items():
+            if key in FIFO_QUEUE_ATTRIBUTES and not fifo:
+                raise InvalidAttributeName("Unknown Attribute {0}.".format(key))
+            if key in INTEGER_QUEUE_ATTRIBUTES:
+                try:
+                    value = int(value)
+                except (TypeError, ValueError):
+                    raise InvalidParameterValue("Invalid value for the parameter {0}.".format(key))
+            elif key in BOOLEAN_QUEUE_ATTRIBUTES:
+                value = str(value).lower()
+                if value not in ('true', 'false'):
+                    raise InvalidParameterValue("Invalid value for the parameter {0}.".format(key))
+            elif key not in STRING_QUEUE_ATTRIBUTES:
+                raise InvalidAttributeName("Unknown Attribute {0}.".format(key))
+            result[camelcase_to_underscores(key)] = value
+        return result
+
+    def create_queue(self, name, visibility_timeout, attributes=None):
         queue = self.queues.get(name)
         if queue is None:
-            queue = Queue(name, visibility_timeout)
+            attributes = dict(attributes or {})
+            fifo = str(attributes.pop('FifoQueue', 'false')).lower()
+            if fifo not in ('true', 'false'):
+                raise InvalidParameterValue("Invalid value for the parameter FifoQueue.")
+            fifo = fifo == 'true'
+            if fifo != name.endswith('.fifo'):
+                raise InvalidParameterValue("The name of a FIFO queue can only include alphanumeric characters, hyphens, or underscores, must end with .fifo suffix and be 1 to 80 in length.")
+            attributes = self._queue_attributes(attributes, fifo)
+            if fifo:
+                queue = FifoQueue(name, visibility_timeout)
+            else:
+                queue = Queue(name, visibility_timeout)
+            for key, value in attributes.items():
+                setattr(queue, key, value)
             self.queues[name] = queue
         return queue
 
@@ -189,10 +680,21 @@ class SQSBackend(BaseBackend):
         setattr(queue, key, value)
         return queue
 
-    def send_message(self, queue_name, message_body, message_attributes=None, delay_seconds=None):
+    def send_message(self, queue_name, message_body, message_attributes=None, delay_seconds=None,
+                     group_id=None, deduplication_id=None):
 
         queue = self.get_queue(queue_name)
 
+        if isinstance(queue, FifoQueue):
+            if not group_id:
+                raise MissingParameter("The request must contain the parameter MessageGroupId.")
+            if delay_seconds:
+                raise InvalidParameterValue("Value {0} for parameter DelaySeconds is invalid. Reason: The request include parameter that is not valid for this queue type.".format(delay_seconds))
+            if not deduplication_id:
+                if queue.content_based_deduplication != 'true':
+                    raise InvalidParameterValue("The Queue should either have ContentBasedDeduplication enabled or MessageDeduplicationId provided explicitly")
+                deduplication_id = hashlib.sha256(message_body.encode('utf-8')).hexdigest()
+
         if delay_seconds:
             delay_seconds = int(delay_seconds)
         else:
@@ -200,6 +702,8 @@ class SQSBackend(BaseBackend):
 
         message_id = get_random_message_id()
         message = Message(message_id, message_body)
+        message.group_id = group_id
+        message.deduplication_id = deduplication_id
 
         if message_attributes:
             message.message_attributes = message_attributes
@@ -208,11 +712,9 @@ class SQSBackend(BaseBackend):
             delay_seconds=delay_seconds
         )
 
-        queue.add_message(message)
-
-        return message
+        return queue.add_message(message)
 
-    def receive_messages(self, queue_name, count):
+    def receive_messages(self, queue_name, count, wait_seconds=0):
         """
         Attempt to retrieve visible messages from a queue.
 
@@ -223,39 +725,26 @@ class SQSBackend(BaseBackend):
 
         :param string queue_name: The name of the queue to read from.
         :param int count: The maximum amount of messages to retrieve.
+        :param int wait_seconds: How long to wait for a message when none
+            are visible.
         """
         queue = self.get_queue(queue_name)
-        result = []
-        # queue.messages only contains visible messages
-        for message in queue.messages:
-            message.mark_received(
-                visibility_timeout=queue.visibility_timeout
-            )
-            result.append(message)
-            if len(result) >= count:
-                break
-
-        return result
+        return queue.receive_messages(count, wait_seconds)
 
     def delete_message(self, queue_name, receipt_handle):
         queue = self.get_queue(queue_name)
-        new_messages = []
-        for message in queue._messages:
-            # Only delete message if it is not visible and the reciept_handle
-            # matches.
-            if not message.visible and message.receipt_handle == receipt_handle:
-                continue
-            new_messages.append(message)
-        queue._messages = new_messages
+        queue.delete_message(receipt_handle)
+
+    def delete_message_batch(self, queue_name, receipt_handles):
+        queue = self.get_queue(queue_name)
+        queue.delete_message_batch(receipt_handles)
 
     def change_message_visibility(self, queue_name, receipt_handle, visibility_timeout):
         queue = self.get_queue(queue_name)
-        for message in queue._messages:
-            if message.receipt_handle == receipt_handle:
-                if message.visible:
-                    raise MessageNotInflight
-                message.change_visibility(visibility_timeout)
-                return
-        raise ReceiptHandleIsInvalid
+        queue.change_message_visibility(receipt_handle, visibility_timeout)
+
+    def change_message_visibility_batch(self, queue_name, entries):
+        queue = self.get_queue(queue_name)
+        return queue.change_message_visibility_batch(entries)
 
 sqs_backend = SQSBackend()
@@ -6,23 +6,35 @@ from moto.core.utils import camelcase_to_underscores
 from .utils import parse_message_attributes
 from .models import sqs_backend
 from .exceptions import (
+    InvalidAttributeName,
+    InvalidParameterValue,
     MessageAttributesInvalid,
     MessageNotInflight,
+    MissingParameter,
     ReceiptHandleIsInvalid
 )
 
 MAXIMUM_VISIBILTY_TIMEOUT = 43200
+MAXIMUM_WAIT_TIME_SECONDS = 20
 
 
 class QueuesResponse(BaseResponse):
 
     def create_queue(self):
-        visibility_timeout = None
-        if 'Attribute.1.Name' in self.querystring and self.querystring.get('Attribute.1.Name')[0] == 'VisibilityTimeout':
-            visibility_timeout = self.querystring.get("Attribute.1.Value")[0]
+        attributes = {}
+        index = 1
+        while 'Attribute.{0}.Name'.format(index) in self.querystring:
+            name = self.querystring.get('Attribute.{0}.Name'.format(index))[0]
+            attributes[name] = self.querystring.get('Attribute.{0}.Value'.format(index))[0]
+            index += 1
+        visibility_timeout = attributes.pop('VisibilityTimeout', None)
 
         queue_name = self.querystring.get("QueueName")[0]
-        queue = sqs_backend.create_queue(queue_name, visibility_timeout=visibility_timeout)
+        try:
+            queue = sqs_backend.create_queue(queue_name, visibility_timeout=visibility_timeout,
+                                             attributes=attributes)
+        except (InvalidAttributeName, InvalidParameterValue) as e:
+            return e.description, dict(status=e.status_code)
         template = Template(CREATE_QUEUE_RESPONSE)
         return template.render(queue=queue)
 
@@ -75,7 +87,10 @@ class QueueResponse(BaseResponse):
         queue_name = self.path.split("/")[-1]
         key = camelcase_to_underscores(self.querystring.get('Attribute.Name')[0])
         value = self.querystring.get('Attribute.Value')[0]
-        sqs_backend.set_queue_attribute(queue_name, key, value)
+        try:
+            sqs_backend.set_queue_attribute(queue_name, key, value)
+        except InvalidParameterValue as e:
+            return e.description, dict(status=e.status_code)
         return SET_QUEUE_ATTRIBUTE_RESPONSE
 
     def delete_queue(self):
@@ -101,12 +116,17 @@ class QueueResponse(BaseResponse):
             return e.description, dict(status=e.status_code)
 
         queue_name = self.path.split("/")[-1]
-        message = sqs_backend.send_message(
-            queue_name,
-            message,
-            message_attributes=message_attributes,
-            delay_seconds=delay_seconds
-        )
+        try:
+            message = sqs_backend.send_message(
+                queue_name,
+                message,
+                message_attributes=message_attributes,
+                delay_seconds=delay_seconds,
+                group_id=self.querystring.get('MessageGroupId', [None])[0],
+                deduplication_id=self.querystring.get('MessageDeduplicationId', [None])[0],
+            )
+        except (InvalidParameterValue, MissingParameter) as e:
+            return e.description, dict(status=e.status_code)
         template = Template(SEND_MESSAGE_RESPONSE)
         return template.render(message=message, message_attributes=message_attributes)
 
@@ -137,7 +157,18 @@ class QueueResponse(BaseResponse):
             message_user_id = self.querystring.get(message_user_id_key)[0]
             delay_key = 'SendMessageBatchRequestEntry.{0}.DelaySeconds'.format(index)
             delay_seconds = self.querystring.get(delay_key, [None])[0]
-            message = sqs_backend.send_message(queue_name, message_body[0], delay_seconds=delay_seconds)
+            group_key = 'SendMessageBatchRequestEntry.{0}.MessageGroupId'.format(index)
+            deduplication_key = 'SendMessageBatchRequestEntry.{0}.MessageDeduplicationId'.format(index)
+            try:
+                message = sqs_backend.send_message(
+                    queue_name,
+                    message_body[0],
+                    delay_seconds=delay_seconds,
+                    group_id=self.querystring.get(group_key, [None])[0],
+                    deduplication_id=self.querystring.get(deduplication_key, [None])[0],
+                )
+            except (InvalidParameterValue, MissingParameter) as e:
+                return e.description, dict(status=e.status_code)
             message.user_id = message_user_id
 
             message_attributes = parse_message_attributes(self.querystring, base='SendMessageBatchRequestEntry.{0}.'.format(index), value_namespace='')
@@ -170,6 +201,7 @@ class QueueResponse(BaseResponse):
         queue_name = self.path.split("/")[-1]
 
         message_ids = []
+        receipt_handles = []
         for index in range(1, 11):
             # Loop through looking for messages
             receipt_key = 'DeleteMessageBatchRequestEntry.{0}.ReceiptHandle'.format(index)
@@ -177,20 +209,67 @@ class QueueResponse(BaseResponse):
             if not receipt_handle:
                 # Found all messages
                 break
-
-            sqs_backend.delete_message(queue_name, receipt_handle[0])
+            receipt_handles.append(receipt_handle[0])
 
             message_user_id_key = 'DeleteMessageBatchRequestEntry.{0}.Id'.format(index)
             message_user_id = self.querystring.get(message_user_id_key)[0]
             message_ids.append(message_user_id)
 
+        sqs_backend.delete_message_batch(queue_name, receipt_handles)
+
         template = Template(DELETE_MESSAGE_BATCH_RESPONSE)
         return template.render(message_ids=message_ids)
 
+    def change_message_visibility_batch(self):
+        """
+        The querystring comes like this
+
+        'ChangeMessageVisibilityBatchRequestEntry.1.Id': ['message_1'],
+        'ChangeMessageVisibilityBatchRequestEntry.1.ReceiptHandle': ['asdfsfs...'],
+        'ChangeMessageVisibilityBatchRequestEntry.1.VisibilityTimeout': ['60'],
+        ...
+        """
+        queue_name = self.path.split("/")[-1]
+
+        entries = []
+        failed = []
+        for index in range(1, 11):
+            base = 'ChangeMessageVisibilityBatchRequestEntry.{0}.'.format(index)
+            receipt_handle = self.querystring.get(base + 'ReceiptHandle')
+            if not receipt_handle:
+                # Found all messages
+                break
+
+            entry_id = self.querystring.get(base + 'Id')[0]
+            visibility_timeout = int(self.querystring.get(base + 'VisibilityTimeout', [0])[0])
+            if visibility_timeout > MAXIMUM_VISIBILTY_TIMEOUT:
+                failed.append((entry_id, 'InvalidParameterValue',
+                               "Maximum visibility timeout is {0}".format(MAXIMUM_VISIBILTY_TIMEOUT)))
+                continue
+            entries.append((entry_id, receipt_handle[0], visibility_timeout))
+
+        successful, errors = sqs_backend.change_message_visibility_batch(queue_name, entries)
+        failed.extend((entry_id, type(e).__name__, e.description) for entry_id, e in errors)
+
+        template = Template(CHANGE_MESSAGE_VISIBILITY_BATCH_RESPONSE)
+        return template.render(successful=successful, failed=failed)
+
     def receive_message(self):
         queue_name = self.path.split("/")[-1]
         message_count = int(self.querystring.get("MaxNumberOfMessages")[0])
-        messages = sqs_backend.receive_messages(queue_name, message_count)
+        wait_time = self.querystring.get("WaitTimeSeconds")
+        if wait_time:
+            wait_time = int(wait_time[0])
+        else:
+            queue = sqs_backend.get_queue(queue_name)
+            wait_time = int(queue.receive_message_wait_time_seconds)
+
+        if wait_time > MAXIMUM_WAIT_TIME_SECONDS:
+            return "Invalid request, maximum wait time is {0}".format(
+                MAXIMUM_WAIT_TIME_SECONDS
+            ), dict(status=400)
+
+        messages = sqs_backend.receive_messages(queue_name, message_count, wait_time)
         template = Template(RECEIVE_MESSAGE_RESPONSE)
         output = template.render(messages=messages)
         return output
@@ -272,6 +351,9 @@ SEND_MESSAGE_RESPONSE = """<SendMessageResponse>
         <MessageId>
             {{ message.id }}
         </MessageId>
+        {% if message.sequence_number %}
+        <SequenceNumber>{{ message.sequence_number }}</SequenceNumber>
+        {% endif %}
     </SendMessageResult>
     <ResponseMetadata>
         <RequestId>
@@ -304,6 +386,20 @@ RECEIVE_MESSAGE_RESPONSE = """<ReceiveMessageResponse>
             <Name>ApproximateFirstReceiveTimestamp</Name>
             <Value>{{ message.approximate_first_receive_timestamp }}</Value>
           </Attribute>
+          {% if message.group_id %}
+          <Attribute>
+            <Name>MessageGroupId</Name>
+            <Value>{{ message.group_id }}</Value>
+          </Attribute>
+          <Attribute>
+            <Name>MessageDeduplicationId</Name>
+            <Value>{{ message.deduplication_id }}</Value>
+          </Attribute>
+          <Attribute>
+            <Name>SequenceNumber</Name>
+            <Value>{{ message.sequence_number }}</Value>
+          </Attribute>
+          {% endif %}
           {% if message.message_attributes.items()|count > 0 %}
             <MD5OfMessageAttributes>324758f82d026ac6ec5b31a3b192d1e3</MD5OfMessageAttributes>
           {% endif %}
@@ -340,6 +436,9 @@ SEND_MESSAGE_BATCH_RESPONSE = """<SendMessageBatchResponse>
             {% if message.message_attributes.items()|count > 0 %}
               <MD5OfMessageAttributes>324758f82d026ac6ec5b31a3b192d1e3</MD5OfMessageAttributes>
             {% endif %}
+            {% if message.sequence_number %}
+              <SequenceNumber>{{ message.sequence_number }}</SequenceNumber>
+            {% endif %}
         </SendMessageBatchResultEntry>
     {% endfor %}
 </SendMessageBatchResult>
@@ -376,3 +475,24 @@ CHANGE_MESSAGE_VISIBILITY_RESPONSE = """<ChangeMessageVisibilityResponse>
         </RequestId>
     </ResponseMetadata>
 </ChangeMessageVisibilityResponse>"""
+
+CHANGE_MESSAGE_VISIBILITY_BATCH_RESPONSE = """<ChangeMessageVisibilityBatchResponse>
+    <ChangeMessageVisibilityBatchResult>
+        {% for message_id in successful %}
+            <ChangeMessageVisibilityBatchResultEntry>
+                <Id>{{ message_id }}</Id>
+            </ChangeMessageVisibilityBatchResultEntry>
+        {% endfor %}
+        {% for message_id, code, description in failed %}
+            <BatchResultErrorEntry>
+                <Id>{{ message_id }}</Id>
+                <Code>{{ code }}</Code>
+                <Message>{{ description }}</Message>
+                <SenderFault>true</SenderFault>
+            </BatchResultErrorEntry>
+        {% endfor %}
+    </ChangeMessageVisibilityBatchResult>
+    <ResponseMetadata>
+        <RequestId>ca9668f7-ab1b-4f7a-8859-f15747ab17a7</RequestId>
+    </ResponseMetadata>
+</ChangeMessageVisibilityBatchResponse>"""
@@ -1,15 +1,14 @@
 from __future__ import unicode_literals
 import datetime
-import random
-import string
 
+from moto.core.utils import get_random_string
 from .exceptions import MessageAttributesInvalid
 
 
 def generate_receipt_handle():
     # http://docs.aws.amazon.com/AWSSimpleQueueService/latest/SQSDeveloperGuide/ImportantIdentifiers.html#ImportantIdentifiers-receipt-handles
     length = 185
-    return ''.join(random.choice(string.ascii_lowercase) for x in range(length))
+    return get_random_string(length)
 
 
 def unix_time(dt=None):
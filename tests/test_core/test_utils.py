@@ -0,0 +1,26 @@
+from __future__ import unicode_literals
+import re
+
+import sure  # noqa
+
+from moto.core.utils import get_random_hex, get_random_message_id, get_random_string, seed_random_ids
+
+
+def test_random_id_formats():
+    re.match('^[0-9a-f]{5}$', get_random_hex(5)).should_not.be.none
+    re.match('^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$',
+             get_random_message_id()).should_not.be.none
+    re.match('^[A-Za-z0-9_-]{185}$', get_random_string(185)).should_not.be.none
+
+
+def test_seeded_random_ids_repeat():
+    try:
+        seed_random_ids(42)
+        first = [get_random_hex(), get_random_string(20), get_random_message_id()]
+        seed_random_ids(42)
+        second = [get_random_hex(), get_random_string(20), get_random_message_id()]
+    finally:
+        seed_random_ids(None)
+
+    first.should.equal(second)
+    get_random_hex().should_not.equal(first[0])
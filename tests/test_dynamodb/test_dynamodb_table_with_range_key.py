@@ -226,7 +226,7 @@ def test_delete_item():
     table.item_count.should.equal(1)
 
     response = item.delete()
-    response.should.equal({u'Attributes': [], u'ConsumedCapacityUnits': 0.5})
+    response.should.equal({u'Attributes': [], u'ConsumedCapacityUnits': 1})
     table.refresh()
     table.item_count.should.equal(0)
 
@@ -263,7 +263,7 @@ def test_delete_item_with_attribute_response():
             'SentBy': 'User A',
             'subject': 'Check this out!'
         },
-        'ConsumedCapacityUnits': 0.5
+        'ConsumedCapacityUnits': 1
     })
     table.refresh()
     table.item_count.should.equal(0)
@@ -336,6 +336,26 @@ def test_query():
     results.response['Items'].should.have.length_of(1)
 
 
+@py3_requires_boto_gte("2.33.0")
+@mock_dynamodb
+def test_query_pagination():
+    conn = boto.connect_dynamodb()
+    table = create_table(conn)
+
+    for subject in ['456', '123', '789']:
+        table.new_item(hash_key='the-key', range_key=subject, attrs={'Body': 'lolcat'}).put()
+
+    results = table.query(hash_key='the-key', request_limit=1)
+    [item['subject'] for item in results].should.equal(['123', '456', '789'])
+
+    results = conn.layer1.query('messages', {'S': 'the-key'}, limit=2)
+    results['Count'].should.equal(2)
+    results['LastEvaluatedKey'].should.equal({
+        'HashKeyElement': {'S': 'the-key'},
+        'RangeKeyElement': {'S': '456'},
+    })
+
+
 @py3_requires_boto_gte("2.33.0")
 @mock_dynamodb
 def test_query_with_undeclared_table():
@@ -416,6 +436,9 @@ def test_scan():
     results = table.scan(scan_filter={'PK': condition.BETWEEN(5, 8)})
     results.response['Items'].should.have.length_of(1)
 
+    results = table.scan(scan_filter={'PK': condition.GT(10)})
+    results.response['Items'].should.have.length_of(0)
+
 
 @py3_requires_boto_gte("2.33.0")
 @mock_dynamodb
@@ -183,7 +183,7 @@ def test_delete_item():
     table.item_count.should.equal(1)
 
     response = item.delete()
-    response.should.equal({u'Attributes': [], u'ConsumedCapacityUnits': 0.5})
+    response.should.equal({u'Attributes': [], u'ConsumedCapacityUnits': 1})
     table.refresh()
     table.item_count.should.equal(0)
 
@@ -218,7 +218,7 @@ def test_delete_item_with_attribute_response():
             u'ReceivedTime': u'12/9/2011 11:36:03 PM',
             u'SentBy': u'User A',
         },
-        u'ConsumedCapacityUnits': 0.5
+        u'ConsumedCapacityUnits': 1
     })
     table.refresh()
     table.item_count.should.equal(0)
@@ -380,7 +380,9 @@ def test_write_batch():
     ))
 
     batch_list.add_batch(table, puts=items)
-    conn.batch_write_item(batch_list)
+    response = conn.batch_write_item(batch_list)
+    response['Responses'].should.equal({'messages': {'ConsumedCapacityUnits': 2}})
+    response['UnprocessedItems'].should.equal({})
 
     table.refresh()
     table.item_count.should.equal(2)
@@ -393,6 +395,22 @@ def test_write_batch():
     table.item_count.should.equal(1)
 
 
+@py3_requires_boto_gte("2.33.0")
+@mock_dynamodb
+def test_consumed_capacity_follows_item_size():
+    conn = boto.connect_dynamodb()
+    table = create_table(conn)
+
+    item = table.new_item(hash_key='the-key', attrs={'Body': 'x' * 3000})
+    item.put()['ConsumedCapacityUnits'].should.equal(3)
+
+    response = conn.layer1.get_item('messages', {'HashKeyElement': {'S': 'the-key'}})
+    response['ConsumedCapacityUnits'].should.equal(0.5)
+    response = conn.layer1.get_item('messages', {'HashKeyElement': {'S': 'the-key'}},
+                                    consistent_read=True)
+    response['ConsumedCapacityUnits'].should.equal(1)
+
+
 @py3_requires_boto_gte("2.33.0")
 @mock_dynamodb
 def test_batch_read():
@@ -1,13 +1,15 @@
 from __future__ import unicode_literals, print_function
 
+import json
 import six
 import boto
 import sure  # noqa
 import requests
 from moto import mock_dynamodb2
 from moto.dynamodb2 import dynamodb_backend2
+from moto.dynamodb2.models import dynamo_json_dump
 from boto.exception import JSONResponseError
-from tests.helpers import requires_boto_gte
+from tests.helpers import requires_boto_gte, py3_requires_boto_gte
 import tests.backport_assert_raises
 from nose.tools import assert_raises
 try:
@@ -54,6 +56,28 @@ def test_list_tables_layer_1():
     res.should.equal(expected)
 
 
+@py3_requires_boto_gte("2.33.0")
+@requires_boto_gte("2.9")
+@mock_dynamodb2
+def test_list_tables_pages_in_name_order():
+    for name in ["table_c", "table_a", "table_d", "table_b"]:
+        dynamodb_backend2.create_table(name, schema=[
+            {u'KeyType': u'HASH', u'AttributeName': u'name'}
+        ])
+    conn = boto.dynamodb2.connect_to_region(
+        'us-west-2',
+        aws_access_key_id="ak",
+        aws_secret_access_key="sk")
+
+    res = conn.list_tables(limit=2)
+    res.should.equal({"TableNames": ["table_a", "table_b"], "LastEvaluatedTableName": "table_b"})
+
+    # Paging resumes after the start name even if that table is gone
+    conn.delete_table("table_b")
+    res = conn.list_tables(exclusive_start_table_name="table_b")
+    res.should.equal({"TableNames": ["table_c", "table_d"]})
+
+
 @requires_boto_gte("2.9")
 @mock_dynamodb2
 def test_describe_missing_table():
@@ -71,3 +95,116 @@ def test_sts_handler():
     res = requests.post("https://sts.amazonaws.com/", data={"GetSessionToken": ""})
     res.ok.should.be.ok
     res.text.should.contain("SecretAccessKey")
+
+
+@py3_requires_boto_gte("2.33.0")
+@requires_boto_gte("2.9")
+@mock_dynamodb2
+def test_items_share_attribute_names():
+    table = dynamodb_backend2.create_table("test_shapes", schema=[
+        {u'KeyType': u'HASH', u'AttributeName': u'name'}
+    ])
+    first = table.put_item({'name': {'S': 'one'}, 'count': {'N': '1'}})
+    second = table.put_item({'name': {'S': 'two'}, 'count': {'N': '2'}})
+    # A name built at runtime, as names parsed from a request are
+    table.put_item({''.join(['na', 'me']): {'S': 'three'}})
+
+    len(table.attribute_names).should.equal(2)
+    first.attrs.shape.should.be(second.attrs.shape)
+    hasattr(first.attrs, '__dict__').should.equal(False)
+    # The shapes of the first and third items share the interned name
+    names = [name for shape in table.attribute_names.shapes.values()
+             for name in shape.names if name == 'name']
+    names[0].should.be(names[1])
+    first.hash_key.should.be(first.attrs['name'])
+    dict(second.attrs).should.equal({
+        'name': second.hash_key,
+        'count': second.attrs.get('count'),
+    })
+
+
+@py3_requires_boto_gte("2.33.0")
+@requires_boto_gte("2.9")
+@mock_dynamodb2
+def test_item_json_is_cached_until_written():
+    table = dynamodb_backend2.create_table("test_json", schema=[
+        {u'KeyType': u'HASH', u'AttributeName': u'name'}
+    ])
+    item = table.put_item({'name': {'S': 'one'}, 'tags': {'SS': ['a', 'b']}})
+    fragment = item.attrs.json_fragment
+
+    response = json.loads(dynamo_json_dump({"Items": [item.attrs, item.attrs], "Count": 2}))
+    response.should.equal({
+        "Items": [item.attrs.to_wire(), item.attrs.to_wire()],
+        "Count": 2,
+    })
+    item.attrs.json_fragment.should.be(fragment)
+
+    updated = table.put_item({'name': {'S': 'one'}, 'tags': {'SS': ['c']}})
+    json.loads(dynamo_json_dump({"Item": updated.attrs})).should.equal({
+        "Item": {'name': {'S': 'one'}, 'tags': {'SS': ['c']}},
+    })
+
+    # Values that look like anything the encoder uses internally stay as they are
+    lookalike = table.put_item({'name': {'S': '__moto_dynamodb_json_fragment__'}})
+    json.loads(dynamo_json_dump({"Items": [lookalike.attrs], "Value": "__moto_dynamodb_json_fragment__"})).should.equal({
+        "Items": [{'name': {'S': '__moto_dynamodb_json_fragment__'}}],
+        "Value": "__moto_dynamodb_json_fragment__",
+    })
+
+
+def create_throttled_table(name, read_units, write_units):
+    dynamodb_backend2.create_table(name, schema=[
+        {u'KeyType': u'HASH', u'AttributeName': u'name'}
+    ], throughput={'ReadCapacityUnits': read_units, 'WriteCapacityUnits': write_units})
+    dynamodb_backend2.enable_throughput_simulation(burst_seconds=0)
+    conn = boto.dynamodb2.connect_to_region(
+        'us-west-2',
+        aws_access_key_id="ak",
+        aws_secret_access_key="sk")
+    # Fail on the first throttle instead of backing off
+    conn.NumberRetries = 1
+    return conn
+
+
+@py3_requires_boto_gte("2.33.0")
+@requires_boto_gte("2.9")
+@mock_dynamodb2
+def test_throughput_simulation_throttles_requests():
+    from boto.dynamodb2.exceptions import ProvisionedThroughputExceededException
+    conn = create_throttled_table("throttled", read_units=1, write_units=1)
+
+    conn.put_item("throttled", {'name': {'S': 'first'}})
+    with assert_raises(ProvisionedThroughputExceededException):
+        conn.put_item("throttled", {'name': {'S': 'second'}})
+
+    conn.get_item("throttled", {'name': {'S': 'first'}}, consistent_read=True)
+    with assert_raises(ProvisionedThroughputExceededException):
+        conn.get_item("throttled", {'name': {'S': 'first'}}, consistent_read=True)
+
+    metrics = dynamodb_backend2.get_table_metrics("throttled")
+    metrics['ConsumedWriteCapacityUnits'].should.equal(1)
+    metrics['ThrottledWriteRequests'].should.equal(1)
+    metrics['ConsumedReadCapacityUnits'].should.equal(1)
+    metrics['ThrottledReadRequests'].should.equal(1)
+
+
+@py3_requires_boto_gte("2.33.0")
+@requires_boto_gte("2.9")
+@mock_dynamodb2
+def test_throughput_simulation_returns_unprocessed_items():
+    conn = create_throttled_table("throttled", read_units=1, write_units=2)
+
+    response = conn.batch_write_item({
+        'throttled': [
+            {'PutRequest': {'Item': {'name': {'S': name}}}}
+            for name in ['one', 'two', 'three']
+        ]
+    })
+
+    response['ConsumedCapacity'].should.equal([
+        {'TableName': 'throttled', 'CapacityUnits': 2}
+    ])
+    response['UnprocessedItems'].should.equal({
+        'throttled': [{'PutRequest': {'Item': {'name': {'S': 'three'}}}}]
+    })
@@ -0,0 +1,90 @@
+from __future__ import unicode_literals
+import json
+
+import boto
+import sure  # noqa
+from moto import mock_dynamodb2
+from moto.dynamodb2 import dynamodb_backend2
+from moto.dynamodb2.exceptions import TrimmedDataAccess
+from tests.helpers import requires_boto_gte, py3_requires_boto_gte
+import tests.backport_assert_raises
+from nose.tools import assert_raises
+try:
+    import boto.dynamodb2
+    from boto.dynamodb2.table import Table
+except ImportError:
+    print("This boto version is not supported")
+
+
+def create_table_with_stream(conn, view_type):
+    conn.make_request('CreateTable', json.dumps({
+        'TableName': 'messages',
+        'KeySchema': [{'AttributeName': 'id', 'KeyType': 'HASH'}],
+        'AttributeDefinitions': [{'AttributeName': 'id', 'AttributeType': 'S'}],
+        'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5},
+        'StreamSpecification': {'StreamEnabled': True, 'StreamViewType': view_type},
+    }))
+    return Table('messages', connection=conn)
+
+
+@py3_requires_boto_gte("2.33.0")
+@requires_boto_gte("2.9")
+@mock_dynamodb2
+def test_get_records_reads_changes_incrementally():
+    conn = boto.dynamodb2.connect_to_region(
+        'us-west-2',
+        aws_access_key_id="ak",
+        aws_secret_access_key="sk")
+    table = create_table_with_stream(conn, 'NEW_AND_OLD_IMAGES')
+
+    stream_arn = conn.describe_table('messages')['Table']['LatestStreamArn']
+    streams = conn.make_request('ListStreams', json.dumps({'TableName': 'messages'}))['Streams']
+    [stream['StreamArn'] for stream in streams].should.equal([stream_arn])
+    shard_id = conn.make_request('DescribeStream', json.dumps({
+        'StreamArn': stream_arn,
+    }))['StreamDescription']['Shards'][0]['ShardId']
+
+    table.put_item(data={'id': 'a', 'body': 'first'})
+    table.put_item(data={'id': 'a', 'body': 'second'}, overwrite=True)
+    table.delete_item(id='a')
+
+    shard_iterator = conn.make_request('GetShardIterator', json.dumps({
+        'StreamArn': stream_arn,
+        'ShardId': shard_id,
+        'ShardIteratorType': 'TRIM_HORIZON',
+    }))['ShardIterator']
+
+    response = conn.make_request('GetRecords', json.dumps({'ShardIterator': shard_iterator, 'Limit': 2}))
+    [record['eventName'] for record in response['Records']].should.equal(['INSERT', 'MODIFY'])
+    modify = response['Records'][1]['dynamodb']
+    modify['Keys'].should.equal({'id': {'S': 'a'}})
+    modify['OldImage'].should.equal({'id': {'S': 'a'}, 'body': {'S': 'first'}})
+    modify['NewImage'].should.equal({'id': {'S': 'a'}, 'body': {'S': 'second'}})
+
+    response = conn.make_request('GetRecords', json.dumps({'ShardIterator': response['NextShardIterator']}))
+    [record['eventName'] for record in response['Records']].should.equal(['REMOVE'])
+    response['Records'][0]['dynamodb'].shouldnt.contain('NewImage')
+
+    response = conn.make_request('GetRecords', json.dumps({'ShardIterator': response['NextShardIterator']}))
+    response['Records'].should.equal([])
+
+
+@py3_requires_boto_gte("2.33.0")
+@requires_boto_gte("2.9")
+@mock_dynamodb2
+def test_stream_trims_oldest_records():
+    table = dynamodb_backend2.create_table("stream_table", schema=[
+        {u'KeyType': u'HASH', u'AttributeName': u'id'}
+    ])
+    table.update_stream({'StreamEnabled': True, 'StreamViewType': 'KEYS_ONLY'}, max_records=3)
+    oldest = table.stream.shard_iterator('TRIM_HORIZON')
+
+    for number in range(5):
+        table.put_item({'id': {'S': str(number)}})
+
+    with assert_raises(TrimmedDataAccess):
+        dynamodb_backend2.get_records(oldest)
+
+    stream, records, _ = dynamodb_backend2.get_records(table.stream.shard_iterator('TRIM_HORIZON'))
+    [record.keys['id']['S'] for record in records].should.equal(['2', '3', '4'])
+    records[0].to_json(stream.view_type)['dynamodb'].shouldnt.contain('NewImage')
@@ -11,6 +11,7 @@ try:
     from boto.dynamodb2.fields import RangeKey
     from boto.dynamodb2.table import Table
     from boto.dynamodb2.table import Item
+    from boto.dynamodb2.types import NUMBER
     from boto.dynamodb2.exceptions import ValidationException
 except ImportError:
     pass
@@ -292,6 +293,57 @@ def test_query():
     sum(1 for _ in results).should.equal(1)
 
 
+@requires_boto_gte("2.9")
+@py3_requires_boto_gte("2.33.0")
+@mock_dynamodb2
+def test_query_with_numeric_range_key():
+    table = Table.create('messages', schema=[
+        HashKey('forum_name'),
+        RangeKey('version', data_type=NUMBER),
+    ])
+
+    for version in [9, 10, 100, 2]:
+        table.put_item(data={
+            'forum_name': 'the-key',
+            'version': version,
+        })
+
+    results = table.query(forum_name__eq='the-key', version__gt=5)
+    [item['version'] for item in results].should.equal([9, 10, 100])
+
+    results = table.query(forum_name__eq='the-key', version__between=[2, 10])
+    [item['version'] for item in results].should.equal([2, 9, 10])
+
+
+@requires_boto_gte("2.9")
+@py3_requires_boto_gte("2.33.0")
+@mock_dynamodb2
+def test_query_and_scan_pagination():
+    table = create_table()
+    for subject in ['4', '1', '5', '3', '2']:
+        table.put_item(data={'forum_name': 'the-key', 'subject': subject})
+    table.put_item(data={'forum_name': 'other-key', 'subject': '1'})
+
+    results = table.query(forum_name__eq='the-key', subject__gt='1', max_page_size=2)
+    [item['subject'] for item in results].should.equal(['2', '3', '4', '5'])
+
+    results = table.query(forum_name__eq='the-key', subject__gt='1', max_page_size=2, reverse=True)
+    [item['subject'] for item in results].should.equal(['5', '4', '3', '2'])
+
+    page = table.connection.query('messages', key_conditions={
+        'forum_name': {'ComparisonOperator': 'EQ', 'AttributeValueList': [{'S': 'the-key'}]},
+    }, limit=2, scan_index_forward=False)
+    page['Count'].should.equal(2)
+    page['LastEvaluatedKey'].should.equal({'forum_name': {'S': 'the-key'}, 'subject': {'S': '2'}})
+
+    results = table.scan(max_page_size=4)
+    sum(1 for _ in results).should.equal(6)
+
+    page = table.connection.scan('messages', limit=4)
+    page['ScannedCount'].should.equal(4)
+    page.should.contain('LastEvaluatedKey')
+
+
 @requires_boto_gte("2.9")
 @py3_requires_boto_gte("2.33.0")
 @mock_dynamodb2
@@ -323,7 +375,7 @@ def test_scan():
 
     item['forum_name'] = 'the-key'
     item['subject'] = '123'
-    item.save()
+    item.save(overwrite=True)
 
     item_data = {
         'Body': 'http://url_to_lolcat.gif',
@@ -360,6 +412,12 @@ def test_scan():
     results = table.scan(PK__between=[5, 8])
     sum(1 for _ in results).should.equal(1)
 
+    results = table.scan(PK__gt=10)
+    sum(1 for _ in results).should.equal(0)
+
+    results = table.scan(PK__in=[7, 10])
+    sum(1 for _ in results).should.equal(1)
+
 
 @requires_boto_gte("2.9")
 @py3_requires_boto_gte("2.33.0")
@@ -410,6 +468,36 @@ def test_write_batch():
     table.count().should.equal(1)
 
 
+@requires_boto_gte("2.9")
+@py3_requires_boto_gte("2.33.0")
+@mock_dynamodb2
+def test_write_batch_consumed_capacity():
+    create_table()
+    conn = boto.dynamodb2.layer1.DynamoDBConnection()
+    response = conn.batch_write_item({
+        'messages': [
+            {'PutRequest': {'Item': {
+                'forum_name': {'S': 'the-key'},
+                'subject': {'S': '123'},
+                'Body': {'S': 'x' * 2000},
+            }}},
+            {'PutRequest': {'Item': {
+                'forum_name': {'S': 'the-key'},
+                'subject': {'S': '456'},
+            }}},
+            {'DeleteRequest': {'Key': {
+                'forum_name': {'S': 'the-key'},
+                'subject': {'S': '789'},
+            }}},
+        ]
+    })
+
+    response['ConsumedCapacity'].should.equal([
+        {'TableName': 'messages', 'CapacityUnits': 4}
+    ])
+    response['UnprocessedItems'].should.equal({})
+
+
 @requires_boto_gte("2.9")
 @py3_requires_boto_gte("2.33.0")
 @mock_dynamodb2
@@ -1,4 +1,5 @@
 from __future__ import unicode_literals
+import json
 import six
 import boto
 import sure  # noqa
@@ -6,7 +7,10 @@ from freezegun import freeze_time
 from boto.exception import JSONResponseError
 from moto import mock_dynamodb2
 from tests.helpers import requires_boto_gte, py3_requires_boto_gte
+import tests.backport_assert_raises
+from nose.tools import assert_raises
 try:
+    from boto.dynamodb2.exceptions import ConditionalCheckFailedException
     from boto.dynamodb2.fields import HashKey
     from boto.dynamodb2.table import Table
     from boto.dynamodb2.table import Item
@@ -281,6 +285,28 @@ def test_scan():
     sum(1 for _ in results).should.equal(1)
 
 
+@requires_boto_gte("2.9")
+@py3_requires_boto_gte("2.33.0")
+@mock_dynamodb2
+def test_scan_begins_with_on_numbers():
+    table = create_table()
+    Item(table, {'forum_name': 'the-key', 'PK': 7}).save()
+    conn = table.connection
+
+    # A number attribute has no prefix, so a string operand never matches it
+    results = conn.scan('messages', scan_filter={
+        'PK': {'AttributeValueList': [{'S': '7'}], 'ComparisonOperator': 'BEGINS_WITH'},
+    })
+    results['Count'].should.equal(0)
+
+    with assert_raises(JSONResponseError) as err:
+        conn.scan('messages', scan_filter={
+            'PK': {'AttributeValueList': [{'N': '7'}], 'ComparisonOperator': 'BEGINS_WITH'},
+        })
+    err.exception.status.should.equal(400)
+    err.exception.error_code.should.equal('ValidationException')
+
+
 @requires_boto_gte("2.9")
 @py3_requires_boto_gte("2.33.0")
 @mock_dynamodb2
@@ -401,3 +427,172 @@ def test_get_special_item():
     table.put_item(data=data)
     returned_item = table.get_item(**{'date-joined': 127549192})
     dict(returned_item).should.equal(data)
+
+
+@requires_boto_gte("2.9")
+@py3_requires_boto_gte("2.33.0")
+@mock_dynamodb2
+def test_update_item_partial_save():
+    table = create_table()
+    item = Item(table, {
+        'forum_name': 'LOLCat Forum',
+        'SentBy': 'User A',
+        'Body': 'http://url_to_lolcat.gif',
+    })
+    item.save()
+
+    item['SentBy'] = 'User B'
+    del item['Body']
+    item.partial_save().should.equal(True)
+
+    dict(table.get_item(forum_name='LOLCat Forum')).should.equal({
+        'forum_name': 'LOLCat Forum',
+        'SentBy': 'User B',
+    })
+
+
+@requires_boto_gte("2.9")
+@py3_requires_boto_gte("2.33.0")
+@mock_dynamodb2
+def test_update_item_with_expression():
+    create_table()
+    conn = boto.dynamodb2.layer1.DynamoDBConnection()
+    conn.put_item('messages', {
+        'forum_name': {'S': 'LOLCat Forum'},
+        'views': {'N': '9'},
+        'tags': {'SS': ['cats', 'funny']},
+        'Body': {'S': 'http://url_to_lolcat.gif'},
+    })
+
+    response = conn.make_request('UpdateItem', json.dumps({
+        'TableName': 'messages',
+        'Key': {'forum_name': {'S': 'LOLCat Forum'}},
+        'UpdateExpression': 'SET #s = :sender, views = views + :one ADD tags :tag REMOVE Body',
+        'ExpressionAttributeNames': {'#s': 'SentBy'},
+        'ExpressionAttributeValues': {
+            ':sender': {'S': 'User B'},
+            ':one': {'N': '1'},
+            ':tag': {'SS': ['cute']},
+        },
+        'ReturnValues': 'UPDATED_NEW',
+    }))
+    response['Attributes'].should.equal({
+        'SentBy': {'S': 'User B'},
+        'views': {'N': '10'},
+        'tags': {'SS': ['cats', 'funny', 'cute']},
+    })
+
+    item = conn.get_item('messages', {'forum_name': {'S': 'LOLCat Forum'}})['Item']
+    item.should.equal({
+        'forum_name': {'S': 'LOLCat Forum'},
+        'SentBy': {'S': 'User B'},
+        'views': {'N': '10'},
+        'tags': {'SS': ['cats', 'funny', 'cute']},
+    })
+
+
+@requires_boto_gte("2.9")
+@py3_requires_boto_gte("2.33.0")
+@mock_dynamodb2
+def test_update_item_with_condition_expression():
+    from boto.dynamodb2.exceptions import ConditionalCheckFailedException
+    create_table()
+    conn = boto.dynamodb2.layer1.DynamoDBConnection()
+    update = {
+        'TableName': 'messages',
+        'Key': {'forum_name': {'S': 'LOLCat Forum'}},
+        'UpdateExpression': 'SET views = if_not_exists(views, :zero) + :one',
+        'ConditionExpression': 'attribute_not_exists(views) OR views < :limit',
+        'ExpressionAttributeValues': {
+            ':zero': {'N': '0'},
+            ':one': {'N': '1'},
+            ':limit': {'N': '2'},
+        },
+    }
+
+    conn.make_request('UpdateItem', json.dumps(update))
+    conn.make_request('UpdateItem', json.dumps(update))
+    conn.make_request.when.called_with(
+        'UpdateItem', json.dumps(update)
+    ).should.throw(ConditionalCheckFailedException)
+
+    item = conn.get_item('messages', {'forum_name': {'S': 'LOLCat Forum'}})['Item']
+    item['views'].should.equal({'N': '2'})
+
+
+@requires_boto_gte("2.9")
+@py3_requires_boto_gte("2.33.0")
+@mock_dynamodb2
+def test_update_item_with_missing_operand():
+    create_table()
+    conn = boto.dynamodb2.layer1.DynamoDBConnection()
+    conn.put_item('messages', {'forum_name': {'S': 'LOLCat Forum'}})
+
+    for expression in ['SET views = views + :one', 'SET tags = list_append(tags, :tags)',
+                       'SET copy = missing', 'ADD views missing']:
+        update = {
+            'TableName': 'messages',
+            'Key': {'forum_name': {'S': 'LOLCat Forum'}},
+            'UpdateExpression': expression,
+            'ExpressionAttributeValues': {':one': {'N': '1'}, ':tags': {'L': [{'S': 'a'}]}},
+        }
+        with assert_raises(JSONResponseError) as cm:
+            conn.make_request('UpdateItem', json.dumps(update))
+        cm.exception.status.should.equal(400)
+        cm.exception.error_code.should.equal('ValidationException')
+
+
+@requires_boto_gte("2.9")
+@py3_requires_boto_gte("2.33.0")
+@mock_dynamodb2
+def test_delete_item_with_expected():
+    table = create_table()
+    table.put_item(data={'forum_name': 'LOLCat Forum', 'balance': 5})
+
+    table.delete_item(forum_name='LOLCat Forum', expected={'balance__eq': 0}).should.equal(False)
+    table.count().should.equal(1)
+
+    table.delete_item(forum_name='LOLCat Forum', expected={'balance__gt': 0}).should.equal(True)
+    table.count().should.equal(0)
+
+
+@requires_boto_gte("2.9")
+@py3_requires_boto_gte("2.33.0")
+@mock_dynamodb2
+def test_put_item_with_expected():
+    table = create_table()
+    table.put_item(data={'forum_name': 'LOLCat Forum', 'balance': 5})
+
+    # A new Item expects its attributes not to exist yet
+    with assert_raises(ConditionalCheckFailedException):
+        Item(table, {'forum_name': 'LOLCat Forum', 'balance': 1}).save()
+    int(table.get_item(forum_name='LOLCat Forum')['balance']).should.equal(5)
+
+    item = table.get_item(forum_name='LOLCat Forum')
+    item['balance'] = 7
+    item.save().should.equal(True)
+    int(table.get_item(forum_name='LOLCat Forum')['balance']).should.equal(7)
+
+
+@requires_boto_gte("2.9")
+@py3_requires_boto_gte("2.33.0")
+@mock_dynamodb2
+def test_get_item_with_projection_expression():
+    create_table()
+    conn = boto.dynamodb2.layer1.DynamoDBConnection()
+    conn.put_item('messages', {
+        'forum_name': {'S': 'LOLCat Forum'},
+        'SentBy': {'S': 'User A'},
+        'meta': {'M': {'views': {'N': '3'}, 'likes': {'N': '4'}}},
+    })
+
+    response = conn.make_request('GetItem', json.dumps({
+        'TableName': 'messages',
+        'Key': {'forum_name': {'S': 'LOLCat Forum'}},
+        'ProjectionExpression': '#f, meta.views',
+        'ExpressionAttributeNames': {'#f': 'forum_name'},
+    }))
+    response['Item'].should.equal({
+        'forum_name': {'S': 'LOLCat Forum'},
+        'meta': {'M': {'views': {'N': '3'}}},
+    })
@@ -28,6 +28,20 @@ def test_eip_allocate_classic():
     standard.should_not.be.within(conn.get_all_addresses())
 
 
+@mock_ec2
+def test_eip_allocate_unique_addresses():
+    """Released EIP addresses are handed out again"""
+    conn = boto.connect_ec2('the_key', 'the_secret')
+
+    addresses = [conn.allocate_address() for _ in range(3)]
+    public_ips = set(address.public_ip for address in addresses)
+    public_ips.should.have.length_of(3)
+
+    released = addresses[1].public_ip
+    addresses[1].release()
+    conn.allocate_address().public_ip.should.equal(released)
+
+
 @mock_ec2
 def test_eip_allocate_vpc():
     """Allocate/release VPC EIP"""
@@ -22,7 +22,8 @@ def test_elastic_network_interfaces():
     all_enis.should.have.length_of(1)
     eni = all_enis[0]
     eni.groups.should.have.length_of(0)
-    eni.private_ip_addresses.should.have.length_of(0)
+    eni.private_ip_addresses.should.have.length_of(1)
+    eni.private_ip_addresses[0].private_ip_address.should.equal("10.0.0.4")
 
     conn.delete_network_interface(eni.id)
 
@@ -143,3 +144,40 @@ def test_elastic_network_interfaces_filtering():
     # Unsupported filter
     conn.get_all_network_interfaces.when.called_with(filters={'not-implemented-filter': 'foobar'}).should.throw(NotImplementedError)
 
+
+
+@mock_ec2
+def test_elastic_network_interfaces_draw_addresses_from_subnet():
+    conn = boto.connect_vpc('the_key', 'the_secret')
+    vpc = conn.create_vpc("10.0.0.0/16")
+    subnet = conn.create_subnet(vpc.id, "10.0.0.0/28")
+
+    # A /28 has 16 addresses, of which AWS keeps the first four and the last
+    enis = [conn.create_network_interface(subnet.id) for _ in range(11)]
+    addresses = [eni.private_ip_address for eni in conn.get_all_network_interfaces()]
+    sorted(addresses).should.equal(sorted("10.0.0.{0}".format(host) for host in range(4, 15)))
+
+    with assert_raises(EC2ResponseError) as cm:
+        conn.create_network_interface(subnet.id)
+    cm.exception.code.should.equal('InsufficientFreeAddressesInSubnet')
+
+    conn.delete_network_interface(enis[0].id)
+    eni = conn.create_network_interface(subnet.id)
+    eni.private_ip_address.should.equal("10.0.0.4")
+
+
+@mock_ec2
+def test_elastic_network_interfaces_with_private_ip_in_use():
+    conn = boto.connect_vpc('the_key', 'the_secret')
+    vpc = conn.create_vpc("10.0.0.0/16")
+    subnet = conn.create_subnet(vpc.id, "10.0.0.0/24")
+    conn.create_network_interface(subnet.id, "10.0.0.10")
+
+    with assert_raises(EC2ResponseError) as cm:
+        conn.create_network_interface(subnet.id, "10.0.0.10")
+    cm.exception.code.should.equal('InvalidIPAddress.InUse')
+
+    # The address asked for is skipped when addresses are handed out
+    addresses = [conn.create_network_interface(subnet.id).private_ip_address for _ in range(7)]
+    addresses.should_not.contain("10.0.0.10")
+    addresses[-1].should.equal("10.0.0.11")
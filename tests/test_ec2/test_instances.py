@@ -89,6 +89,51 @@ def test_get_instances_by_id():
     cm.exception.request_id.should_not.be.none
 
 
+@mock_ec2
+def test_run_instances_launches_max_count():
+    conn = boto.connect_ec2()
+    reservation = conn.run_instances('ami-1234abcd', min_count=2, max_count=50, instance_type='t1.micro')
+    reservation.instances.should.have.length_of(50)
+    set(instance.id for instance in reservation.instances).should.have.length_of(50)
+    set(instance.instance_type for instance in reservation.instances).should.equal(set(['t1.micro']))
+
+    reservation = conn.run_instances('ami-1234abcd', min_count=3)
+    reservation.instances.should.have.length_of(3)
+
+
+@mock_ec2
+def test_terminate_instances_returns_addresses_to_subnet():
+    conn = boto.connect_vpc('the_key', 'the_secret')
+    vpc = conn.create_vpc("10.0.0.0/16")
+    subnet = conn.create_subnet(vpc.id, "10.0.0.0/28")
+    eni = conn.create_network_interface(subnet.id)
+
+    # A /28 has 11 usable addresses; launch far more instances than that
+    for _ in range(20):
+        instance = conn.run_instances('ami-1234abcd', subnet_id=subnet.id).instances[0]
+        conn.terminate_instances([instance.id])
+
+    # The ENI created on its own is kept, the ones RunInstances created are not
+    [nic.id for nic in conn.get_all_network_interfaces()].should.equal([eni.id])
+    instances = conn.run_instances('ami-1234abcd', subnet_id=subnet.id, min_count=10).instances
+    instances.should.have.length_of(10)
+
+
+@mock_ec2
+def test_stop_instances_reports_unknown_id():
+    conn = boto.connect_ec2()
+    reservation = conn.run_instances('ami-1234abcd', min_count=2)
+    instance1, instance2 = reservation.instances
+
+    with assert_raises(EC2ResponseError) as cm:
+        conn.stop_instances([instance1.id, "i-1234abcd", instance2.id])
+    cm.exception.code.should.equal('InvalidInstanceID.NotFound')
+    cm.exception.message.should.contain("i-1234abcd")
+
+    stopped = conn.stop_instances([instance2.id, instance1.id])
+    [instance.id for instance in stopped].should.equal([instance2.id, instance1.id])
+
+
 @mock_ec2
 def test_get_instances_filtering_by_state():
     conn = boto.connect_ec2()
@@ -135,6 +180,18 @@ def test_get_instances_filtering_by_instance_id():
     reservations = conn.get_all_instances(filters={'instance-id': 'non-existing-id'})
     reservations.should.have.length_of(0)
 
+
+@mock_ec2
+def test_get_instances_by_id_keeps_reservation_order():
+    conn = boto.connect_ec2()
+    instance_ids = [conn.run_instances('ami-1234abcd').instances[0].id for _ in range(30)]
+    expected = [reservation.id for reservation in conn.get_all_instances()]
+
+    reservations = conn.get_all_instances(instance_ids=list(reversed(instance_ids)))
+    [reservation.id for reservation in reservations].should.equal(expected)
+    reservations = conn.get_all_instances(filters={'instance-id': instance_ids})
+    [reservation.id for reservation in reservations].should.equal(expected)
+
 @mock_ec2
 def test_get_instances_filtering_by_tag():
     conn = boto.connect_ec2()
@@ -464,3 +521,26 @@ def test_describe_instance_status_with_instance_filter():
     cm.exception.code.should.equal('InvalidInstanceID.NotFound')
     cm.exception.status.should.equal(400)
     cm.exception.request_id.should_not.be.none
+
+
+@mock_ec2
+def test_get_all_reservations_pages_through_instances():
+    conn = boto.connect_ec2()
+    conn.run_instances('ami-1234abcd', min_count=3)
+    conn.run_instances('ami-1234abcd', min_count=2)
+
+    instance_ids = []
+    reservations = conn.get_all_reservations(max_results=2)
+    pages = 1
+    while True:
+        instance_ids.extend(instance.id for reservation in reservations for instance in reservation.instances)
+        if not reservations.next_token:
+            break
+        reservations = conn.get_all_reservations(max_results=2, next_token=reservations.next_token)
+        pages += 1
+
+    pages.should.equal(3)
+    instance_ids.should.have.length_of(5)
+    set(instance_ids).should.have.length_of(5)
+
+    conn.get_all_reservations.when.called_with(next_token='not a token').should.throw(EC2ResponseError)
@@ -8,6 +8,7 @@ from boto.exception import EC2ResponseError
 import sure  # noqa
 
 from moto import mock_ec2
+from moto.ec2.models import ec2_backend
 from tests.helpers import requires_boto_gte
 
 
@@ -152,6 +153,37 @@ def test_routes_additional():
     cm.exception.request_id.should_not.be.none
 
 
+@mock_ec2
+def test_routes_resolve_longest_prefix_for_subnet():
+    conn = boto.connect_vpc('the_key', 'the_secret')
+    vpc = conn.create_vpc("10.0.0.0/16")
+    main_subnet = conn.create_subnet(vpc.id, "10.0.0.0/24")
+    custom_subnet = conn.create_subnet(vpc.id, "10.0.1.0/24")
+    main_route_table = conn.get_all_route_tables(filters={'association.main': 'true', 'vpc-id': vpc.id})[0]
+    custom_route_table = conn.create_route_table(vpc.id)
+    ec2_backend.create_subnet_association(custom_route_table.id, custom_subnet.id)
+
+    igw = conn.create_internet_gateway()
+    other_igw = conn.create_internet_gateway()
+    conn.create_route(main_route_table.id, "0.0.0.0/0", gateway_id=igw.id)
+    conn.create_route(custom_route_table.id, "192.168.0.0/16", gateway_id=igw.id)
+    conn.create_route(custom_route_table.id, "192.168.4.0/24", gateway_id=other_igw.id)
+
+    # Subnets without an association fall back to the main route table
+    ec2_backend.get_effective_route_table(main_subnet.id).id.should.equal(main_route_table.id)
+    ec2_backend.get_effective_routes(main_subnet.id).should.have.length_of(2)
+    ec2_backend.resolve_route(main_subnet.id, "10.0.1.7").local.should.be(True)
+    ec2_backend.resolve_route(main_subnet.id, "8.8.8.8").internet_gateway.id.should.equal(igw.id)
+
+    ec2_backend.get_effective_route_table(custom_subnet.id).id.should.equal(custom_route_table.id)
+    ec2_backend.resolve_route(custom_subnet.id, "192.168.4.1").internet_gateway.id.should.equal(other_igw.id)
+    ec2_backend.resolve_route(custom_subnet.id, "192.168.5.1").internet_gateway.id.should.equal(igw.id)
+    ec2_backend.resolve_route(custom_subnet.id, "8.8.8.8").should.be.none
+
+    conn.delete_route(custom_route_table.id, "192.168.4.0/24")
+    ec2_backend.resolve_route(custom_subnet.id, "192.168.4.1").internet_gateway.id.should.equal(igw.id)
+
+
 @mock_ec2
 def test_routes_replace():
     conn = boto.connect_vpc('the_key', 'the_secret')
@@ -8,6 +8,7 @@ from boto.exception import EC2ResponseError
 import sure  # noqa
 
 from moto import mock_ec2
+from moto.ec2.models import ec2_backend
 
 
 @mock_ec2
@@ -117,6 +118,25 @@ def test_delete_security_group_in_vpc():
     conn.delete_security_group(group_id=security_group1.id)
 
 
+@mock_ec2
+def test_security_group_name_reusable_after_delete():
+    conn = boto.connect_ec2('the_key', 'the_secret')
+    vpc_id = "vpc-12345"
+    security_group = conn.create_security_group('test1', 'test1', vpc_id)
+    other_vpc_group = conn.create_security_group('test1', 'test1', "vpc-67890")
+
+    with assert_raises(EC2ResponseError) as cm:
+        conn.create_security_group('test1', 'test1', vpc_id)
+    cm.exception.code.should.equal('InvalidGroup.Duplicate')
+
+    conn.delete_security_group(group_id=security_group.id)
+    recreated = conn.create_security_group('test1', 'test1', vpc_id)
+
+    group_ids = [group.id for group in conn.get_all_security_groups()]
+    set(group_ids).should.equal(set([recreated.id, other_vpc_group.id]))
+    conn.get_all_security_groups(group_ids=[security_group.id, recreated.id])[0].id.should.equal(recreated.id)
+
+
 @mock_ec2
 def test_authorize_ip_range_and_revoke():
     conn = boto.connect_ec2('the_key', 'the_secret')
@@ -143,6 +163,22 @@ def test_authorize_ip_range_and_revoke():
     security_group.rules.should.have.length_of(0)
 
 
+@mock_ec2
+def test_authorize_duplicate_rule():
+    conn = boto.connect_ec2('the_key', 'the_secret')
+    security_group = conn.create_security_group('test', 'test')
+    security_group.authorize(ip_protocol="tcp", from_port="22", to_port="22", cidr_ip="10.0.0.0/8")
+
+    with assert_raises(EC2ResponseError) as cm:
+        security_group.authorize(ip_protocol="6", from_port="22", to_port="22", cidr_ip="10.0.0.0/8")
+    cm.exception.code.should.equal('InvalidPermission.Duplicate')
+    cm.exception.status.should.equal(400)
+
+    # The same ports from another block are a new rule
+    security_group.authorize(ip_protocol="tcp", from_port="22", to_port="22", cidr_ip="10.1.0.0/16")
+    conn.get_all_security_groups()[0].rules.should.have.length_of(2)
+
+
 @mock_ec2
 def test_authorize_other_group_and_revoke():
     conn = boto.connect_ec2('the_key', 'the_secret')
@@ -221,3 +257,66 @@ def test_get_all_security_groups():
 
     resp = conn.get_all_security_groups()
     resp.should.have.length_of(2)
+
+
+@mock_ec2
+def test_get_security_groups_by_id_keeps_group_order():
+    conn = boto.connect_ec2()
+    group_ids = [conn.create_security_group(name='test{0}'.format(index), description='test').id
+                 for index in range(30)]
+    expected = [group.id for group in conn.get_all_security_groups()]
+
+    resp = conn.get_all_security_groups(group_ids=list(reversed(group_ids)))
+    [group.id for group in resp].should.equal(expected)
+
+
+@mock_ec2
+def test_get_all_security_groups_filtering_by_ip_permission():
+    conn = boto.connect_ec2()
+    sg1 = conn.create_security_group(name='test1', description='test1')
+    sg2 = conn.create_security_group(name='test2', description='test2')
+    sg1.authorize(ip_protocol="tcp", from_port="22", to_port="22", cidr_ip="10.0.0.0/8")
+    sg2.authorize(ip_protocol="tcp", from_port="80", to_port="80", src_group=sg1)
+
+    resp = conn.get_all_security_groups(filters={'ip-permission.cidr': ['10.0.0.0/8']})
+    [group.id for group in resp].should.equal([sg1.id])
+
+    resp = conn.get_all_security_groups(filters={'ip-permission.group-id': [sg1.id],
+                                                 'ip-permission.from-port': ['80']})
+    [group.id for group in resp].should.equal([sg2.id])
+
+    conn.get_all_security_groups.when.called_with(
+        filters={'not-implemented-filter': 'foobar'}).should.throw(NotImplementedError)
+
+
+@mock_ec2
+def test_security_group_reachability():
+    conn = boto.connect_vpc('the_key', 'the_secret')
+    vpc = conn.create_vpc("10.0.0.0/16")
+    subnet = conn.create_subnet(vpc.id, "10.0.0.0/24")
+    web = conn.create_security_group('web', 'web', vpc.id)
+    app = conn.create_security_group('app', 'app', vpc.id)
+    db = conn.create_security_group('db', 'db', vpc.id)
+
+    app.authorize(ip_protocol="tcp", from_port="8000", to_port="8080", src_group=web)
+    db.authorize(ip_protocol="tcp", from_port="5432", to_port="5432", cidr_ip="10.0.0.0/24")
+    db.authorize(ip_protocol="-1", from_port="-1", to_port="-1", cidr_ip="10.0.0.30/32")
+
+    web_instance = conn.run_instances('ami-1234abcd', subnet_id=subnet.id,
+                                      security_group_ids=[web.id]).instances[0]
+    app_instance = conn.run_instances('ami-1234abcd', subnet_id=subnet.id,
+                                      security_group_ids=[app.id]).instances[0]
+    db_eni = conn.create_network_interface(subnet.id, "10.0.0.20", groups=[db.id])
+    admin_eni = conn.create_network_interface(subnet.id, "10.0.0.30")
+
+    ec2_backend.can_reach(web_instance.id, app_instance.id, 8080).should.be(True)
+    ec2_backend.can_reach(web_instance.id, app_instance.id, 8081).should.be(False)
+    ec2_backend.can_reach(web_instance.id, app_instance.id, 8000, ip_protocol="udp").should.be(False)
+    ec2_backend.can_reach(app_instance.id, web_instance.id, 8080).should.be(False)
+
+    ec2_backend.can_reach(app_instance.id, db_eni.id, 5432).should.be(True)
+    ec2_backend.can_reach(app_instance.id, db_eni.id, 22).should.be(False)
+    ec2_backend.can_reach(admin_eni.id, db_eni.id, 22, ip_protocol="udp").should.be(True)
+
+    app.revoke(ip_protocol="tcp", from_port="8000", to_port="8080", src_group=web)
+    ec2_backend.can_reach(web_instance.id, app_instance.id, 8080).should.be(False)
@@ -102,3 +102,21 @@ def test_get_subnets_filtering():
 
     # Unsupported filter
     conn.get_all_subnets.when.called_with(filters={'not-implemented-filter': 'foobar'}).should.throw(NotImplementedError)
+
+
+@mock_ec2
+def test_get_subnets_filtering_with_wildcards_and_deletes():
+    conn = boto.connect_vpc('the_key', 'the_secret')
+    vpc = conn.create_vpc("10.0.0.0/16")
+    subnet1 = conn.create_subnet(vpc.id, "10.0.0.0/24")
+    subnet2 = conn.create_subnet(vpc.id, "10.0.1.0/24")
+    subnet2.add_tag("Name", "web-2")
+
+    subnets = conn.get_all_subnets(filters={'cidr': "10.0.?.0/24"})
+    set([subnet.id for subnet in subnets]).should.equal(set([subnet1.id, subnet2.id]))
+    subnets = conn.get_all_subnets(filters={'vpc-id': vpc.id, 'tag:Name': "web-*"})
+    [subnet.id for subnet in subnets].should.equal([subnet2.id])
+
+    conn.delete_subnet(subnet1.id)
+    subnets = conn.get_all_subnets(filters={'vpc-id': vpc.id})
+    [subnet.id for subnet in subnets].should.equal([subnet2.id])
@@ -253,3 +253,41 @@ def test_get_all_tags_value_filter():
 
     tags = conn.get_all_tags(filters={'value': '*value\*\?'})
     tags.should.have.length_of(1)
+
+
+@mock_ec2
+def test_tag_filters_follow_retagging():
+    conn = boto.connect_ec2('the_key', 'the_secret')
+    instance_a, instance_b = conn.run_instances('ami-1234abcd', min_count=2).instances
+    instance_a.add_tag("env", "prod")
+    instance_b.add_tag("env", "prod")
+    instance_b.add_tag("role", "prod")
+
+    instance_b.add_tag("env", "dev")
+    reservations = conn.get_all_instances(filters={'tag:env': 'prod'})
+    [instance.id for instance in reservations[0].instances].should.equal([instance_a.id])
+    tags = conn.get_all_tags(filters={'key': 'env', 'value': 'dev'})
+    [tag.res_id for tag in tags].should.equal([instance_b.id])
+
+    instance_b.remove_tag("role")
+    conn.get_all_tags(filters={'resource-id': instance_b.id}).should.have.length_of(1)
+    instance_a.remove_tag("env")
+    reservations = conn.get_all_instances(filters={'tag-value': 'prod'})
+    reservations.should.have.length_of(0)
+
+
+@mock_ec2
+def test_get_all_tags_pages_in_resource_order():
+    conn = boto.connect_ec2('the_key', 'the_secret')
+    instances = conn.run_instances('ami-1234abcd', min_count=3).instances
+    for instance in instances:
+        instance.add_tag("a key", "some value")
+
+    tags = conn.get_all_tags(max_results=2)
+    tags.should.have.length_of(2)
+    next_page = conn.get_list('DescribeTags', {'MaxResults': 2, 'NextToken': tags.next_token},
+                              [('item', boto.ec2.tag.Tag)])
+    next_page.should.have.length_of(1)
+    next_page.next_token.should.be.none
+    sorted([tag.res_id for tag in list(tags) + list(next_page)]).should.equal(
+        sorted([instance.id for instance in instances]))
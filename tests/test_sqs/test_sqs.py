@@ -5,9 +5,11 @@ from boto.sqs.message import RawMessage
 
 import requests
 import sure  # noqa
+import threading
 import time
 
 from moto import mock_sqs
+from moto.sqs import sqs_backend
 from tests.helpers import requires_boto_gte
 
 @mock_sqs
@@ -400,3 +402,216 @@ def test_change_message_visibility_on_visible_message():
     queue.count().should.equal(1)
 
     original_message.change_visibility.when.called_with(100).should.throw(SQSError)
+
+
+@mock_sqs
+def test_queue_attributes_count_messages_by_state():
+    conn = boto.connect_sqs('the_key', 'the_secret')
+    queue = conn.create_queue("test-queue", visibility_timeout=60)
+    queue.set_message_class(RawMessage)
+
+    queue.write(queue.new_message('ready message'))
+    queue.write(queue.new_message('received message'))
+    queue.write(queue.new_message('delayed message'), delay_seconds=60)
+
+    messages = conn.receive_message(queue, number_messages=1)
+    messages[0].get_body().should.equal('ready message')
+
+    attributes = queue.get_attributes()
+    attributes['ApproximateNumberOfMessages'].should.equal('1')
+    attributes['ApproximateNumberOfMessagesNotVisible'].should.equal('1')
+    attributes['ApproximateNumberOfMessagesDelayed'].should.equal('1')
+
+    messages[0].change_visibility(0)
+    queue.count().should.equal(2)
+    queue.get_attributes()['ApproximateNumberOfMessagesNotVisible'].should.equal('0')
+
+
+@mock_sqs
+def test_change_message_visibility_batch():
+    conn = boto.connect_sqs('the_key', 'the_secret')
+    queue = conn.create_queue("test-queue", visibility_timeout=60)
+    queue.set_message_class(RawMessage)
+
+    for index in range(3):
+        queue.write(queue.new_message('message {0}'.format(index)))
+    messages = conn.receive_message(queue, number_messages=2)
+
+    results = conn.change_message_visibility_batch(queue, [
+        (messages[0], 0),
+        (messages[1], 120),
+    ])
+    results.errors.should.equal([])
+    queue.count().should.equal(2)
+
+    # The first message is visible again, so it is no longer in flight
+    results = conn.change_message_visibility_batch(queue, [(messages[0], 30)])
+    results.errors[0]['error_code'].should.equal('MessageNotInflight')
+
+    queue.delete_message_batch([messages[1]])
+    queue.get_attributes()['ApproximateNumberOfMessagesNotVisible'].should.equal('0')
+
+
+@mock_sqs
+def test_receive_message_long_polling():
+    conn = boto.connect_sqs('the_key', 'the_secret')
+    queue = conn.create_queue("test-queue", visibility_timeout=60)
+    queue.set_message_class(RawMessage)
+
+    start = time.time()
+    conn.receive_message(queue, wait_time_seconds=1).should.have.length_of(0)
+    (time.time() - start).should.be.greater_than(0.9)
+
+    sender = threading.Timer(0.2, sqs_backend.send_message, args=("test-queue", "long polled"))
+    sender.start()
+    start = time.time()
+    messages = conn.receive_message(queue, wait_time_seconds=10)
+    sender.join()
+
+    messages[0].get_body().should.equal("long polled")
+    (time.time() - start).should.be.lower_than(5)
+
+
+@mock_sqs
+def test_fifo_queue_orders_message_groups():
+    conn = boto.connect_sqs('the_key', 'the_secret')
+    conn.get_status('CreateQueue', {
+        'QueueName': 'test-queue.fifo',
+        'Attribute.1.Name': 'FifoQueue',
+        'Attribute.1.Value': 'true',
+        'Attribute.2.Name': 'ContentBasedDeduplication',
+        'Attribute.2.Value': 'true',
+    })
+    queue = conn.get_queue('test-queue.fifo')
+    queue.set_message_class(RawMessage)
+    queue.get_attributes()['FifoQueue'].should.equal('true')
+
+    for group_id, body in [('a', 'a1'), ('b', 'b1'), ('a', 'a2'), ('b', 'b2'), ('a', 'a1')]:
+        sqs_backend.send_message('test-queue.fifo', body, group_id=group_id)
+    # The second a1 is dropped as a duplicate
+    queue.count().should.equal(4)
+
+    # A group is locked while it has messages in flight
+    first = conn.receive_message(queue, number_messages=1)
+    [message.get_body() for message in first].should.equal(['a1'])
+    messages = conn.receive_message(queue, number_messages=10)
+    [message.get_body() for message in messages].should.equal(['b1', 'b2'])
+    conn.receive_message(queue, number_messages=10).should.have.length_of(0)
+
+    first[0].delete()
+    messages = conn.receive_message(queue, number_messages=10)
+    [message.get_body() for message in messages].should.equal(['a2'])
+    messages[0].attributes['MessageGroupId'].should.equal('a')
+
+
+@mock_sqs
+def test_fifo_queue_requires_message_group():
+    conn = boto.connect_sqs('the_key', 'the_secret')
+    conn.get_status('CreateQueue', {
+        'QueueName': 'test-queue.fifo',
+        'Attribute.1.Name': 'FifoQueue',
+        'Attribute.1.Value': 'true',
+    })
+    queue = conn.get_queue('test-queue.fifo')
+
+    queue.write.when.called_with(queue.new_message('no group')).should.throw(SQSError)
+    conn.get_status.when.called_with('CreateQueue', {
+        'QueueName': 'not-fifo',
+        'Attribute.1.Name': 'FifoQueue',
+        'Attribute.1.Value': 'true',
+    }).should.throw(SQSError)
+    conn.get_status.when.called_with('CreateQueue', {
+        'QueueName': 'not-fifo.fifo',
+    }).should.throw(SQSError)
+
+
+@mock_sqs
+def test_create_queue_checks_attributes():
+    conn = boto.connect_sqs('the_key', 'the_secret')
+    conn.get_status('CreateQueue', {
+        'QueueName': 'test-queue',
+        'Attribute.1.Name': 'DelaySeconds',
+        'Attribute.1.Value': '5',
+    })
+    sqs_backend.get_queue('test-queue').delay_seconds.should.equal(5)
+
+    policy = '{"Version": "2012-10-17", "Statement": []}'
+    conn.get_status('CreateQueue', {
+        'QueueName': 'policy-queue',
+        'Attribute.1.Name': 'Policy',
+        'Attribute.1.Value': policy,
+        'Attribute.2.Name': 'KmsMasterKeyId',
+        'Attribute.2.Value': 'alias/aws/sqs',
+        'Attribute.3.Name': 'KmsDataKeyReusePeriodSeconds',
+        'Attribute.3.Value': '300',
+    })
+    queue = sqs_backend.get_queue('policy-queue')
+    queue.policy.should.equal(policy)
+    queue.kms_master_key_id.should.equal('alias/aws/sqs')
+    queue.kms_data_key_reuse_period_seconds.should.equal(300)
+
+    for name, value in [('DelaySeconds', 'soon'),
+                        ('ContentBasedDeduplication', 'true'),
+                        ('NotAnAttribute', '1')]:
+        conn.get_status.when.called_with('CreateQueue', {
+            'QueueName': 'invalid-queue',
+            'Attribute.1.Name': name,
+            'Attribute.1.Value': value,
+        }).should.throw(SQSError)
+    sqs_backend.get_queue('invalid-queue').should.be.none
+
+
+@mock_sqs
+def test_redrive_policy_moves_messages_to_dead_letter_queue():
+    conn = boto.connect_sqs('the_key', 'the_secret')
+    dead_letter_queue = conn.create_queue("dead-letter-queue")
+    dead_letter_queue.set_message_class(RawMessage)
+    queue = conn.create_queue("test-queue", visibility_timeout=60)
+    queue.set_message_class(RawMessage)
+    policy = '{"deadLetterTargetArn": "%s", "maxReceiveCount": 2}' % dead_letter_queue.arn
+    queue.set_attribute('RedrivePolicy', policy)
+    queue.get_attributes()['RedrivePolicy'].should.equal(policy)
+
+    queue.write(queue.new_message('poison message'))
+    for _ in range(2):
+        messages = conn.receive_message(queue)
+        messages[0].change_visibility(0)
+
+    conn.receive_message(queue).should.have.length_of(0)
+    queue.count().should.equal(0)
+    messages = conn.receive_message(dead_letter_queue)
+    messages[0].get_body().should.equal('poison message')
+
+    queue.set_attribute.when.called_with('RedrivePolicy', 'not json').should.throw(SQSError)
+
+
+@mock_sqs
+def test_messages_expire_after_retention_period():
+    conn = boto.connect_sqs('the_key', 'the_secret')
+    queue = conn.create_queue("test-queue", visibility_timeout=60)
+    queue.set_message_class(RawMessage)
+    queue.set_attribute('MessageRetentionPeriod', '1')
+
+    queue.write(queue.new_message('expiring message'))
+    queue.write(queue.new_message('received message'))
+    conn.receive_message(queue, number_messages=1)
+    queue.count().should.equal(1)
+
+    time.sleep(1.1)
+    queue.count().should.equal(0)
+    queue.get_attributes()['ApproximateNumberOfMessagesNotVisible'].should.equal('0')
+    conn.receive_message(queue).should.have.length_of(0)
+
+
+@mock_sqs
+def test_sending_expires_old_messages():
+    conn = boto.connect_sqs('the_key', 'the_secret')
+    queue = conn.create_queue("test-queue", visibility_timeout=60)
+    queue.set_message_class(RawMessage)
+    queue.set_attribute('MessageRetentionPeriod', '1')
+    queue.write(queue.new_message('expiring message'))
+
+    time.sleep(1.1)
+    queue.write(queue.new_message('new message'))
+    # Expired by the send, before anything reads the queue
+    [message.body for message in sqs_backend.get_queue('test-queue')._by_age].should.equal(['new message'])